@@ -11,7 +11,6 @@ import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
 from shark_tank.session_manager import SessionManager
-from shark_tank.database import DatabaseManager
 
 class SessionManagerCLI:
     """Command-line interface for session management"""
@@ -19,7 +18,16 @@ class SessionManagerCLI:
     def __init__(self):
         """Initialize the session manager CLI"""
         self.session_manager = SessionManager()
-        self.db_manager = DatabaseManager()
+        # SQLAlchemy is imported and the database connected only when an option needs it
+        self._db_manager = None
+    
+    @property
+    def db_manager(self):
+        """Database manager, connected on first use"""
+        if self._db_manager is None:
+            from shark_tank.database import DatabaseManager
+            self._db_manager = DatabaseManager()
+        return self._db_manager
     
     def show_menu(self):
         """Show the main menu"""
@@ -33,6 +41,7 @@ class SessionManagerCLI:
         print("5. View session statistics")
         print("6. Test database connection")
         print("7. Exit")
+        print("8. View pitch history (database)")
         print("="*60)
     
     def view_all_sessions(self):
@@ -125,7 +134,32 @@ class SessionManagerCLI:
             print(f"\n  Active Sessions:")
             for session in stats['sessions']:
                 print(f"    #{session['session_number']}: {session['pitch_text']}")
-    
+
+    def view_pitch_history(self):
+        """View stored pitch history from the database rollups"""
+        try:
+            analytics = self.db_manager.get_analytics()
+        except Exception as e:
+            print(f"\n⚠️ Warning: Could not read pitch history from database: {e}")
+            return
+
+        print(f"\n📊 Pitch History (database):")
+        print(f"  Total Pitch Sessions: {analytics['sessions']:,}")
+        print(f"  Total Questions Asked: {analytics['questions']:,}")
+        if analytics['sessions']:
+            print(f"  Average Ask: ${analytics['avg_ask_amount']:,.0f} for {analytics['avg_ask_equity']:.1f}% equity")
+
+        if analytics['days']:
+            print(f"\n  Sessions per Day (last 14 days):")
+            for day in analytics['days']:
+                print(f"    {day['day']}: {day['sessions']:,} sessions, "
+                      f"average ask ${day['avg_ask_amount']:,.0f} for {day['avg_ask_equity']:.1f}%")
+
+        if analytics['sharks']:
+            print(f"\n  Questions per Shark:")
+            for shark in analytics['sharks']:
+                print(f"    {shark['shark_name']}: {shark['questions']:,}")
+
     def test_database(self):
         """Test database connection"""
         print("\n🔍 Testing Database Connection...")
@@ -149,7 +183,7 @@ class SessionManagerCLI:
             self.show_menu()
             
             try:
-                choice = input("\nSelect an option (1-7): ").strip()
+                choice = input("\nSelect an option (1-8): ").strip()
                 
                 if choice == '1':
                     self.view_all_sessions()
@@ -166,8 +200,10 @@ class SessionManagerCLI:
                 elif choice == '7':
                     print("\n👋 Goodbye!")
                     break
+                elif choice == '8':
+                    self.view_pitch_history()
                 else:
-                    print("❌ Invalid option. Please select 1-7.")
+                    print("❌ Invalid option. Please select 1-8.")
                 
                 input("\nPress Enter to continue...")
                 
@@ -179,7 +215,8 @@ class SessionManagerCLI:
                 input("Press Enter to continue...")
         
         # Cleanup
-        self.db_manager.close()
+        if self._db_manager is not None:
+            self._db_manager.close()
 
 def main():
     """Main function"""
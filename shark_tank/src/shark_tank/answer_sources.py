@@ -0,0 +1,39 @@
+#!/usr/bin/env python
+"""
+Answer sources for Shark Tank application
+Where the founder's answers come from: the terminal or a script
+"""
+
+from typing import Iterable
+
+
+class AnswerSource:
+    """Supplies the founder's answer to each shark question"""
+
+    def ask(self, prompt: str) -> str:
+        """Return the founder's answer for a prompt"""
+        raise NotImplementedError
+
+
+class ConsoleAnswerSource(AnswerSource):
+    """Reads answers typed by the founder in the terminal"""
+
+    def ask(self, prompt: str) -> str:
+        return input(prompt)
+
+
+class ScriptedAnswerSource(AnswerSource):
+    """Replays a fixed list of answers, then answers 'exit' to end the Q&A"""
+
+    def __init__(self, answers: Iterable[str], final_answer: str = "exit"):
+        """Initialize with answers in the order the sharks ask"""
+        self.answers = list(answers)
+        self.final_answer = final_answer
+        self.position = 0
+
+    def ask(self, prompt: str) -> str:
+        if self.position < len(self.answers):
+            answer = self.answers[self.position]
+            self.position += 1
+            return answer
+        return self.final_answer
@@ -0,0 +1,276 @@
+#!/usr/bin/env python
+"""
+Async database module for Shark Tank application
+The DatabaseManager operations on SQLAlchemy's asyncio engine (aiosqlite
+locally, asyncpg in production), plus a bridge that runs them on a
+background event loop for the synchronous interactive loop
+"""
+
+import asyncio
+import os
+import threading
+from concurrent.futures import Future
+from concurrent.futures import wait as wait_futures
+from datetime import datetime
+from typing import Any, Coroutine, Dict, List, Optional
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import selectinload
+
+from .database import (ConversationSummaries, Offer, PitchSession, QAEntry, _env_bool,
+                       default_connection_string, ensure_schema_on, offer_rows, qa_rollup, session_rollup)
+from .profiling import get_tracer
+
+# Async driver used for each database when the URL names none or a sync one
+ASYNC_DRIVERS = {
+    'postgresql': 'asyncpg',
+    'sqlite': 'aiosqlite',
+}
+SYNC_DRIVERS = {'psycopg2', 'pysqlite'}
+
+
+def async_connection_string(connection_string: str) -> str:
+    """Switch a connection string to the async driver of its database"""
+    url = make_url(connection_string)
+    backend, _, driver = url.drivername.partition('+')
+    if backend in ASYNC_DRIVERS and (not driver or driver in SYNC_DRIVERS):
+        url = url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}")
+    return url.render_as_string(hide_password=False)
+
+
+def _create_async_engine(connection_string: str) -> AsyncEngine:
+    """Create an async engine with the same pool settings as the sync one"""
+    options = {
+        'pool_pre_ping': _env_bool('DB_POOL_PRE_PING', True),
+        'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', '1800')),
+    }
+    if make_url(connection_string).get_backend_name() != 'sqlite':
+        options['pool_size'] = int(os.getenv('DB_POOL_SIZE', '5'))
+        options['max_overflow'] = int(os.getenv('DB_MAX_OVERFLOW', '10'))
+    return create_async_engine(connection_string, **options)
+
+
+class AsyncDatabaseManager:
+    """Async counterpart of DatabaseManager
+
+    Its engine and pool belong to the event loop the manager is used on, so
+    create one manager per loop and close it before the loop ends.
+    """
+
+    def __init__(self, connection_string: Optional[str] = None):
+        """Initialize with a connection string; sync driver names are switched to async ones"""
+        if connection_string is None:
+            connection_string = default_connection_string()
+        self.connection_string = async_connection_string(connection_string)
+        self.engine = _create_async_engine(self.connection_string)
+        self.SessionLocal = async_sessionmaker(self.engine, expire_on_commit=False)
+        self._schema_checked = False
+        self._schema_lock = asyncio.Lock()
+        self._summaries = ConversationSummaries()
+
+    async def ensure_schema(self):
+        """Create or upgrade the tables once, before the first query"""
+        if self._schema_checked:
+            return
+        async with self._schema_lock:
+            if not self._schema_checked:
+                async with self.engine.begin() as conn:
+                    await conn.run_sync(ensure_schema_on)
+                self._schema_checked = True
+
+    async def create_pitch_session(self, session_id: str, pitch_text: str,
+                                   amount_invested: int, percentage_equity: int) -> PitchSession:
+        """Create a new pitch session"""
+        await self.ensure_schema()
+        async with self.SessionLocal() as session:
+            try:
+                with get_tracer().span('db_write', op='create_pitch_session', session_id=session_id):
+                    now = datetime.utcnow()
+                    pitch_session = PitchSession(
+                        session_id=session_id,
+                        pitch_text=pitch_text,
+                        amount_invested=amount_invested,
+                        percentage_equity=percentage_equity,
+                        created_at=now,
+                        updated_at=now
+                    )
+                    session.add(pitch_session)
+                    await session.execute(session_rollup(self.engine.dialect.name, [{
+                        'created_at': now, 'amount_invested': amount_invested,
+                        'percentage_equity': percentage_equity
+                    }]))
+                    await session.commit()
+                return pitch_session
+            except SQLAlchemyError as e:
+                await session.rollback()
+                raise Exception(f"Failed to create pitch session: {e}")
+
+    async def add_qa_entry(self, pitch_session_id: int, shark_name: str,
+                           question: str, answer: str, round_number: int = 1) -> QAEntry:
+        """Add a new Q&A entry"""
+        await self.ensure_schema()
+        async with self.SessionLocal() as session:
+            try:
+                with get_tracer().span('db_write', op='add_qa_entry', shark=shark_name, round=round_number,
+                                       pitch_session_id=pitch_session_id):
+                    qa_entry = QAEntry(
+                        pitch_session_id=pitch_session_id,
+                        shark_name=shark_name,
+                        question=question,
+                        answer=answer,
+                        round_number=round_number,
+                        created_at=datetime.utcnow()
+                    )
+                    session.add(qa_entry)
+                    await session.execute(qa_rollup(self.engine.dialect.name, [
+                        {'created_at': qa_entry.created_at, 'shark_name': shark_name}
+                    ]))
+                    await session.commit()
+                return qa_entry
+            except SQLAlchemyError as e:
+                await session.rollback()
+                raise Exception(f"Failed to add QA entry: {e}")
+
+    async def record_outcome(self, pitch_session_id: int, offers: Dict[str, Any],
+                             recap: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Store the sharks' verdicts as parsed offers, and the recap, for a pitch session"""
+        await self.ensure_schema()
+        rows = offer_rows(pitch_session_id, offers)
+        try:
+            with get_tracer().span('db_write', op='record_outcome', pitch_session_id=pitch_session_id):
+                async with self.engine.begin() as conn:
+                    await conn.execute(delete(Offer.__table__).where(Offer.pitch_session_id == pitch_session_id))
+                    if rows:
+                        await conn.execute(insert(Offer.__table__), rows)
+                    if recap is not None:
+                        await conn.execute(
+                            update(PitchSession.__table__)
+                            .where(PitchSession.id == pitch_session_id)
+                            .values(recap=recap, updated_at=datetime.utcnow())
+                        )
+            return rows
+        except SQLAlchemyError as e:
+            raise Exception(f"Failed to store offers: {e}")
+
+    async def get_complete_conversation(self, session_id: str) -> Optional[Dict]:
+        """Get complete conversation data for a session, as dicts"""
+        await self.ensure_schema()
+        async with self.SessionLocal() as session:
+            pitch_session = (await session.execute(
+                select(PitchSession)
+                .options(selectinload(PitchSession.qa_entries), selectinload(PitchSession.offers))
+                .where(PitchSession.session_id == session_id)
+            )).scalar_one_or_none()
+            if not pitch_session:
+                return None
+
+            pitch = pitch_session.to_dict()
+            qa_history = [qa.to_dict() for qa in pitch_session.qa_entries]
+            offers = [offer.to_dict() for offer in pitch_session.offers]
+
+        return {
+            'pitch_session': pitch,
+            'qa_history': qa_history,
+            'offers': offers,
+            'conversation_summary': self._summaries.summarize(pitch, qa_history)
+        }
+
+    async def close(self):
+        """Dispose the engine's connection pool"""
+        await self.engine.dispose()
+
+
+class AsyncDatabaseBridge:
+    """Runs an AsyncDatabaseManager on a background event loop
+
+    Offers the DatabaseManager methods the interactive loop uses. Q&A writes
+    return at once and are awaited on flush(); reads wait for their result.
+    """
+
+    def __init__(self, connection_string: Optional[str] = None):
+        """Start the event loop thread and the async manager on it"""
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name='shark-async-db', daemon=True)
+        self._thread.start()
+        self.manager: AsyncDatabaseManager = self._call(self._create_manager(connection_string))
+        self.connection_string = self.manager.connection_string
+        self._pending: List[Future] = []
+        self._lock = threading.Lock()
+        # Queued writes run one at a time, in the order they were queued
+        self._write_lock = asyncio.Lock()
+        self._closed = False
+
+    @staticmethod
+    async def _create_manager(connection_string: Optional[str]) -> AsyncDatabaseManager:
+        """Create the manager on the loop so its pool belongs to that loop"""
+        manager = AsyncDatabaseManager(connection_string)
+        await manager.ensure_schema()
+        return manager
+
+    def submit(self, coro: Coroutine) -> Future:
+        """Schedule a coroutine on the background loop"""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def _call(self, coro: Coroutine, timeout: Optional[float] = None) -> Any:
+        """Run a coroutine on the background loop and wait for its result"""
+        return self.submit(coro).result(timeout)
+
+    async def _in_order(self, coro: Coroutine) -> Any:
+        """Run a queued write after the ones queued before it"""
+        async with self._write_lock:
+            return await coro
+
+    def create_pitch_session(self, session_id: str, pitch_text: str,
+                             amount_invested: int, percentage_equity: int) -> PitchSession:
+        """Create a new pitch session (waits for its ID)"""
+        return self._call(self.manager.create_pitch_session(
+            session_id, pitch_text, amount_invested, percentage_equity
+        ))
+
+    def queue_qa_entry(self, pitch_session_id: int, shark_name: str,
+                       question: str, answer: str, round_number: int = 1):
+        """Start writing a Q&A entry without waiting for it"""
+        future = self.submit(self._in_order(self.manager.add_qa_entry(
+            pitch_session_id, shark_name, question, answer, round_number
+        )))
+        with self._lock:
+            self._pending.append(future)
+
+    def flush(self, timeout: Optional[float] = None):
+        """Wait for every queued write; raises if any failed"""
+        with self._lock:
+            pending, self._pending = self._pending, []
+        done, not_done = wait_futures(pending, timeout=timeout)
+        if not_done:
+            with self._lock:
+                self._pending.extend(not_done)
+            raise Exception("Timed out flushing queued database writes")
+        errors = [str(future.exception()) for future in done if future.exception() is not None]
+        if errors:
+            raise Exception("; ".join(errors))
+
+    def record_outcome(self, pitch_session_id: int, offers: Dict[str, Any],
+                       recap: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Store the verdicts and recap after the queued writes (waits for it)"""
+        return self._call(self._in_order(self.manager.record_outcome(pitch_session_id, offers, recap)))
+
+    def get_complete_conversation(self, session_id: str) -> Optional[Dict]:
+        """Get complete conversation data for a session"""
+        return self._call(self.manager.get_complete_conversation(session_id))
+
+    def close(self):
+        """Finish queued writes, dispose the pool and stop the loop"""
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self.flush(timeout=30)
+        except Exception as e:
+            print(f"⚠️ Warning: Failed to store Q&A in database: {e}")
+        self._call(self.manager.close())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        self._loop.close()
@@ -0,0 +1,213 @@
+#!/usr/bin/env python
+"""
+Headless batch simulation for Shark Tank application
+Runs many pitches with scripted founder answers across a process pool and
+streams the outcomes to a JSON-lines file
+"""
+
+import argparse
+import contextlib
+import csv
+import io
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, Iterator, List, Optional
+
+# Set in each worker process by _init_worker
+_worker_llm = None
+
+
+def _parse_answers(value: Any) -> List[str]:
+    """Accept answers as a list, a JSON array string, or a '|'-separated string"""
+    if value is None or value == '':
+        return []
+    if isinstance(value, list):
+        return [str(answer) for answer in value]
+    value = str(value).strip()
+    if value.startswith('['):
+        return [str(answer) for answer in json.loads(value)]
+    return [answer.strip() for answer in value.split('|') if answer.strip()]
+
+
+def _to_record(raw: Dict[str, Any], line_number: int) -> Dict[str, Any]:
+    """Normalize one input row into a pitch record"""
+    pitch_text = (raw.get('pitch_text') or raw.get('pitch') or '').strip()
+    if not pitch_text:
+        raise ValueError(f"Row {line_number}: pitch_text is required")
+    return {
+        'id': raw.get('id') or str(line_number),
+        'pitch_text': pitch_text,
+        'amount_invested': int(str(raw.get('amount_invested') or 100000).replace('$', '').replace(',', '')),
+        'percentage_equity': int(str(raw.get('percentage_equity') or 10).replace('%', '')),
+        'answers': _parse_answers(raw.get('answers'))
+    }
+
+
+def load_pitches(path: str) -> Iterator[Dict[str, Any]]:
+    """Read pitch records from a .jsonl or .csv file
+
+    Each record has pitch_text, optional amount_invested and
+    percentage_equity, and answers: the founder's answers in the order the
+    sharks ask. When the answers run out the founder says 'exit'.
+    """
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        if path.lower().endswith('.csv'):
+            for line_number, row in enumerate(csv.DictReader(f), 1):
+                yield _to_record(row, line_number)
+        else:
+            for line_number, line in enumerate(f, 1):
+                if line.strip():
+                    yield _to_record(json.loads(line), line_number)
+
+
+def prepare_database() -> Optional[str]:
+    """Create or upgrade the database schema once, before any worker starts
+
+    Returns the connection string it checked, or None if the database could
+    not be reached (the workers then carry on without it, as a session does).
+    """
+    from .database import DatabaseManager
+    try:
+        manager = DatabaseManager()
+    except Exception as e:
+        print(f"⚠️ Warning: Could not prepare the database: {e}", file=sys.stderr)
+        return None
+    manager.close()
+    return manager.connection_string
+
+
+def _init_worker(connection_string: Optional[str], llm: Any = None):
+    """Set up a pool worker: skip the schema check the parent did, and use llm if given"""
+    global _worker_llm
+    if connection_string is not None:
+        from .database import mark_schema_checked
+        mark_schema_checked(connection_string)
+    _worker_llm = llm
+
+
+def run_pitch(record: Dict[str, Any], quiet: bool = True) -> Dict[str, Any]:
+    """Run one scripted session; used as the process pool's work function"""
+    # Batch sessions are throwaway; keep them out of the shared session store
+    os.environ.setdefault('SHARK_TANK_SESSION_BACKEND', 'memory')
+
+    # Imported here so the parent process never loads crewai
+    from .answer_sources import ScriptedAnswerSource
+    from .crew import SharkTank
+
+    inputs = {
+        'pitch_text': record['pitch_text'],
+        'amount_invested': record['amount_invested'],
+        'percentage_equity': record['percentage_equity'],
+        'session_id': None,
+        'refresh_mode': False
+    }
+    started = time.perf_counter()
+    output = io.StringIO() if quiet else sys.stdout
+    try:
+        with contextlib.redirect_stdout(output):
+            # Each worker process shares one DB engine across its sessions
+            with SharkTank() as tank:
+                if _worker_llm is not None:
+                    tank.registry.set_llm(_worker_llm)
+                result = tank.interactive_round(inputs, answer_source=ScriptedAnswerSource(record['answers']))
+        result['id'] = record['id']
+        result['status'] = 'ok'
+        return result
+    except Exception as e:
+        return {
+            'id': record['id'],
+            'status': 'error',
+            'error': str(e),
+            'timings': {'session': [time.perf_counter() - started]}
+        }
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of a list of samples"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(fraction * len(ordered)))
+    return ordered[rank - 1]
+
+
+def run_batch(input_path: str, output_path: str, workers: Optional[int] = None,
+              quiet: bool = True, llm: Any = None) -> Dict[str, Any]:
+    """Run every pitch in input_path in parallel and write one JSON line per session
+
+    llm, if given, replaces every agent's model in the workers (the
+    benchmarks pass a stub). Returns throughput (sessions per minute) and
+    p50/p95 latency per phase.
+    """
+    workers = workers or os.cpu_count() or 1
+    records = list(load_pitches(input_path))
+    phase_samples: Dict[str, List[float]] = {}
+    completed = 0
+    failed = 0
+    started = time.perf_counter()
+    # Workers would otherwise all create the tables of a new database at once
+    connection_string = prepare_database()
+
+    with open(output_path, 'w', encoding='utf-8') as out, \
+            ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                initargs=(connection_string, llm)) as pool:
+        futures = [pool.submit(run_pitch, record, quiet) for record in records]
+        for future in as_completed(futures):
+            result = future.result()
+            out.write(json.dumps(result, ensure_ascii=False, default=str) + "\n")
+            out.flush()
+
+            completed += 1
+            if result['status'] != 'ok':
+                failed += 1
+            for phase, samples in result.get('timings', {}).items():
+                phase_samples.setdefault(phase, []).extend(samples)
+
+            print(f"  [{completed}/{len(records)}] {result['id']}: {result['status']}", file=sys.stderr)
+
+    elapsed = time.perf_counter() - started
+    return {
+        'sessions': completed,
+        'failed': failed,
+        'workers': workers,
+        'elapsed_seconds': elapsed,
+        'sessions_per_minute': completed / elapsed * 60 if elapsed else 0.0,
+        'phases': {
+            phase: {
+                'count': len(samples),
+                'p50': percentile(samples, 0.50),
+                'p95': percentile(samples, 0.95)
+            }
+            for phase, samples in phase_samples.items()
+        }
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    """Command-line entry point for headless batch runs"""
+    parser = argparse.ArgumentParser(description="Run Shark Tank pitches without a human at the keyboard")
+    parser.add_argument('input', help="Pitches as .jsonl or .csv (pitch_text, amount_invested, "
+                                      "percentage_equity, answers)")
+    parser.add_argument('-o', '--output', default='batch_results.jsonl', help="JSON-lines output file")
+    parser.add_argument('-w', '--workers', type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument('--verbose', action='store_true', help="Show the agents' console output")
+    args = parser.parse_args(argv)
+
+    print(f"🦈 Running batch simulation from {args.input}...")
+    summary = run_batch(args.input, args.output, workers=args.workers, quiet=not args.verbose)
+
+    print(f"\n✅ {summary['sessions']} sessions ({summary['failed']} failed) in "
+          f"{summary['elapsed_seconds']:.1f}s with {summary['workers']} workers")
+    print(f"📈 Throughput: {summary['sessions_per_minute']:.1f} sessions/minute")
+    print("⏱️ Latency per phase:")
+    for phase, stats in summary['phases'].items():
+        print(f"  {phase}: p50 {stats['p50']:.2f}s, p95 {stats['p95']:.2f}s ({stats['count']} samples)")
+    print(f"💾 Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
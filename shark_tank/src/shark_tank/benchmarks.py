@@ -0,0 +1,1823 @@
+#!/usr/bin/env python
+"""
+Benchmarks for Shark Tank application
+Measures the overhead the simulation adds on top of the LLM calls themselves,
+with the agents' model replaced by a deterministic stub
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+from crewai import Agent, Task
+from sqlalchemy import func, insert, select
+
+from .answer_sources import ScriptedAnswerSource
+from .cache import ResponseCache
+from .config_loader import ConfigLoader, ConfigWatcher
+from .database import DatabaseManager, Offer, PitchSession, QAEntry, offer_rows
+from .context_builder import estimate_tokens
+from .offers import parse_offer
+from .profiling import get_tracer, write_profile
+from .prompts import layout_from_env
+from .registry import AgentRegistry, render_inputs
+from .session_manager import SessionManager
+from .session_store import InMemorySessionBackend, SessionBackend, SQLiteSessionBackend
+from .streaming import StreamingConsole
+from .stub_llm import StubLLM
+from .retention import RetentionJob
+from .transfer import export_sessions, import_sessions
+
+
+def _load_raw_configs():
+    """Load agents.yaml and tasks.yaml as plain dicts"""
+    snapshot = ConfigLoader().load()
+    return snapshot.agents, snapshot.tasks
+
+
+def bench_turn_overhead(turns: int = 60) -> Dict[str, float]:
+    """Compare per-turn agent/task setup cost with and without the registry
+
+    "before" builds a fresh Agent and Task from the YAML config for every shark
+    turn, "after" fetches them from an AgentRegistry. No LLM calls are made.
+    """
+    agents_config, tasks_config = _load_raw_configs()
+    task_names = [name for name in tasks_config if name.endswith('_qna')]
+
+    started = time.perf_counter()
+    for turn in range(turns):
+        task_name = task_names[turn % len(task_names)]
+        task_config = dict(tasks_config[task_name])
+        agent = Agent(config=agents_config[task_config.pop('agent')], verbose=True)
+        Task(config=task_config, agent=agent)
+    before = (time.perf_counter() - started) / turns
+
+    registry = AgentRegistry(agents_config, tasks_config)
+    started = time.perf_counter()
+    for turn in range(turns):
+        task_name = task_names[turn % len(task_names)]
+        registry.agent(registry.agent_name_for(task_name))
+        registry.task(task_name)
+    after = (time.perf_counter() - started) / turns
+
+    return {
+        'turns': turns,
+        'before_ms_per_turn': before * 1000,
+        'after_ms_per_turn': after * 1000,
+        'objects_built_after': registry.built_count()
+    }
+
+
+def bench_config_load(repeats: int = 20) -> Dict[str, Any]:
+    """Config load cost cold, from the snapshot cache and unchanged in-process,
+    and what a hot reload of one edited agent rebuilds
+
+    Raises AssertionError if the reload rebuilds anything but the edited
+    agent and its tasks, or a call started before the reload is disturbed.
+    """
+    source_dir = os.path.join(os.path.dirname(__file__), 'config')
+    with tempfile.TemporaryDirectory() as tmp:
+        config_dir = os.path.join(tmp, 'config')
+        shutil.copytree(source_dir, config_dir)
+
+        def timed(make_loader) -> float:
+            started = time.perf_counter()
+            for _ in range(repeats):
+                make_loader().load()
+            return (time.perf_counter() - started) / repeats * 1e3
+
+        parse_ms = timed(lambda: ConfigLoader(config_dir, snapshot_dir='off'))
+        snapshots = os.path.join(tmp, 'snapshots')
+        ConfigLoader(config_dir, snapshot_dir=snapshots).load()
+        cached_ms = timed(lambda: ConfigLoader(config_dir, snapshot_dir=snapshots))
+        loader = ConfigLoader(config_dir, snapshot_dir=snapshots)
+        loader.load()
+        unchanged_ms = timed(lambda: loader)
+
+        snapshot = loader.load()
+        registry = AgentRegistry(snapshot.agents, snapshot.tasks)
+        registry.set_llm(StubLLM())
+        registry.apply_snapshot(snapshot)
+        for task_name in snapshot.tasks:
+            registry.task(task_name)
+        agents_before = dict(registry._agents)
+        tasks_before = dict(registry._tasks)
+
+        # Hold a copy of the edited agent as a call in progress would
+        edited = 'shark_mark_cuban'
+        in_flight, idle = registry._checkout(edited)
+
+        # The watcher takes the current snapshot as its baseline, so it is created before the edit
+        rebuilt: Dict[str, Any] = {}
+        watcher = ConfigWatcher(
+            loader, lambda previous, current: rebuilt.update(zip(('agents', 'tasks'), registry.apply_snapshot(current))),
+            interval=0
+        )
+
+        path = os.path.join(config_dir, 'agents.yaml')
+        with open(path, 'r', encoding='utf-8') as f:
+            text = f.read()
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text.replace('Mark Cuban - The Tech-Savvy Disruptor', 'Mark Cuban - The Disruptor'))
+        os.utime(path, ns=(time.time_ns() + 10**9,) * 2)
+        started = time.perf_counter()
+        assert watcher.check()
+        reload_ms = (time.perf_counter() - started) * 1e3
+
+        assert rebuilt['agents'] == {edited}, rebuilt
+        assert rebuilt['tasks'] == {f"{edited}_qna", f"{edited}_verdict"}, rebuilt
+        assert registry.agent(edited).role == 'Mark Cuban - The Disruptor'
+        assert in_flight[0] is agents_before[edited] and in_flight[0].role != registry.agent(edited).role
+        idle.put(in_flight)
+        for name, agent in agents_before.items():
+            assert (registry.agent(name) is agent) == (name != edited), name
+        for name, task in tasks_before.items():
+            assert (registry.task(name) is task) == (name not in rebuilt['tasks']), name
+
+    return {
+        'parse_ms': parse_ms,
+        'snapshot_cache_ms': cached_ms,
+        'unchanged_ms': unchanged_ms,
+        'reload_ms': reload_ms,
+        'reload_rebuilt_agents': len(rebuilt['agents']),
+        'reload_rebuilt_tasks': len(rebuilt['tasks'])
+    }
+
+
+def bench_session_backend(backend: SessionBackend, sessions: int = 100_000,
+                          lookups: int = 10_000) -> Dict[str, float]:
+    """Fill a session backend and time creation, lookups and stats
+
+    Raises AssertionError if a lookup or a counter returns the wrong answer.
+    """
+    manager = SessionManager(backend=backend)
+    pitch = {'pitch_text': 'Benchmark pitch', 'amount_invested': 100000, 'percentage_equity': 10}
+
+    started = time.perf_counter()
+    session_ids = [manager.create_session(dict(pitch)) for _ in range(sessions)]
+    create = time.perf_counter() - started
+    for session_id in session_ids[::100]:
+        manager.add_qa_round(session_id, 'Mark Cuban', 'Why now?', 'Because.')
+
+    rng = random.Random(0)
+    numbers = [rng.randint(1, sessions) for _ in range(lookups)]
+    started = time.perf_counter()
+    for number in numbers:
+        session = manager.get_session_by_number(number)
+        assert session is not None and session['session_number'] == number
+    by_number = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for number in numbers:
+        assert manager.get_session(session_ids[number - 1]) is not None
+    by_id = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for _ in range(1000):
+        stats = manager.get_session_stats(include_sessions=False)
+    stats_time = time.perf_counter() - started
+    assert stats['total_active_sessions'] == sessions
+    assert stats['total_qa_rounds'] == len(session_ids[::100])
+    assert stats['next_session_number'] == sessions + 1
+
+    backend.close()
+    return {
+        'sessions': sessions,
+        'create_us': create / sessions * 1e6,
+        'get_by_number_us': by_number / lookups * 1e6,
+        'get_by_id_us': by_id / lookups * 1e6,
+        'stats_us': stats_time / 1000 * 1e6
+    }
+
+
+def _fill_conversations(manager: DatabaseManager, first_session: int, sessions: int, qa_per_session: int):
+    """Bulk insert pitch sessions with qa_per_session Q&A entries each"""
+    base_time = datetime(2025, 1, 1)
+    chunk = 1000
+    with manager.engine.begin() as conn:
+        for start in range(first_session, first_session + sessions, chunk):
+            numbers = range(start, min(start + chunk, first_session + sessions))
+            conn.execute(insert(PitchSession.__table__), [
+                {
+                    'id': number,
+                    'session_id': f"bench-{number}",
+                    'pitch_text': f"Benchmark pitch {number}",
+                    'amount_invested': 100000,
+                    'percentage_equity': 10,
+                    'created_at': base_time + timedelta(seconds=number),
+                    'updated_at': base_time + timedelta(seconds=number)
+                }
+                for number in numbers
+            ])
+            conn.execute(insert(QAEntry.__table__), [
+                {
+                    'pitch_session_id': number,
+                    'shark_name': 'Mark Cuban',
+                    'question': f"Question {turn} for pitch {number}?",
+                    'answer': f"Answer {turn}.",
+                    'round_number': turn // 6 + 1,
+                    'created_at': base_time + timedelta(seconds=number, milliseconds=turn)
+                }
+                for number in numbers
+                for turn in range(qa_per_session)
+            ])
+
+
+# Tables as created before schema versioning, with no schema_version table
+BASELINE_SCHEMA = (
+    "CREATE TABLE pitch_sessions (id INTEGER NOT NULL PRIMARY KEY, session_id VARCHAR(100) NOT NULL UNIQUE, "
+    "pitch_text TEXT NOT NULL, amount_invested INTEGER NOT NULL, percentage_equity INTEGER NOT NULL, "
+    "created_at DATETIME, updated_at DATETIME)",
+    "CREATE TABLE qa_entries (id INTEGER NOT NULL PRIMARY KEY, "
+    "pitch_session_id INTEGER NOT NULL REFERENCES pitch_sessions (id), shark_name VARCHAR(100) NOT NULL, "
+    "question TEXT NOT NULL, answer TEXT NOT NULL, round_number INTEGER, created_at DATETIME)",
+    "INSERT INTO pitch_sessions VALUES (1, 'baseline-1', 'Baseline pitch', 100000, 10, "
+    "'2024-12-31 12:00:00', '2024-12-31 12:00:00')",
+    "INSERT INTO qa_entries VALUES (1, 1, 'Mark Cuban', 'Baseline question?', 'Baseline answer.', 1, "
+    "'2024-12-31 12:00:01')",
+)
+
+
+def check_schema_upgrade() -> Dict[str, float]:
+    """Open a database created by the original, unversioned schema and use it
+
+    Raises AssertionError if the upgrade loses the stored session or leaves
+    out a column the current models read.
+    """
+    import sqlite3
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'baseline.db')
+        with contextlib.closing(sqlite3.connect(path)) as conn:
+            for statement in BASELINE_SCHEMA:
+                conn.execute(statement)
+            conn.commit()
+
+        started = time.perf_counter()
+        manager = DatabaseManager(f"sqlite:///{path}")
+        upgrade_ms = (time.perf_counter() - started) * 1000
+        try:
+            pitch = manager.create_pitch_session('upgraded-1', 'Pitch after upgrade', 50000, 5)
+            manager.add_qa_entry(pitch.id, 'Lori Greiner', 'Question?', 'Answer.')
+            manager.record_outcome(pitch.id, {'Lori Greiner': 'Yes: $50,000 for 5% equity.'}, 'Recap.')
+            upgraded = manager.get_complete_conversation('upgraded-1')
+            baseline = manager.get_complete_conversation('baseline-1')
+            analytics = manager.get_analytics()
+        finally:
+            manager.close()
+
+    assert upgraded['pitch_session']['recap'] == 'Recap.', upgraded['pitch_session']
+    assert len(upgraded['offers']) == 1 and upgraded['offers'][0]['invest'], upgraded['offers']
+    assert [qa['question'] for qa in baseline['qa_history']] == ['Baseline question?'], baseline
+    assert analytics['sessions'] == 2 and analytics['questions'] == 2, analytics
+    return {'upgrade_ms': upgrade_ms}
+
+
+def bench_conversation_fetch(row_counts: Sequence[int] = (10_000, 100_000, 1_000_000),
+                             qa_per_session: int = 20, samples: int = 200) -> List[Dict[str, float]]:
+    """Time conversation and history page fetches as the qa_entries table grows
+
+    Uses a throwaway SQLite file; with the composite index both fetches should
+    stay flat from thousands to millions of Q&A rows.
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = DatabaseManager(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        rng = random.Random(0)
+        sessions = 0
+        try:
+            for rows in row_counts:
+                target_sessions = rows // qa_per_session
+                _fill_conversations(manager, sessions + 1, target_sessions - sessions, qa_per_session)
+                sessions = target_sessions
+
+                picks = [rng.randint(1, sessions) for _ in range(samples)]
+                started = time.perf_counter()
+                for number in picks:
+                    conversation = manager.get_complete_conversation(f"bench-{number}")
+                    assert len(conversation['qa_history']) == qa_per_session
+                conversation_time = time.perf_counter() - started
+
+                started = time.perf_counter()
+                for number in picks:
+                    page = manager.get_qa_page(number, limit=qa_per_session // 2)
+                    page = manager.get_qa_page(number, limit=qa_per_session // 2, after=page['next_cursor'])
+                    assert len(page['entries']) == qa_per_session // 2 and page['next_cursor'] is None
+                page_time = time.perf_counter() - started
+
+                results.append({
+                    'qa_rows': sessions * qa_per_session,
+                    'conversation_ms': conversation_time / samples * 1000,
+                    'history_page_ms': page_time / (samples * 2) * 1000
+                })
+        finally:
+            manager.close()
+    return results
+
+
+@contextlib.contextmanager
+def _environment(**values: str) -> Iterator[None]:
+    """Set environment variables for the duration of a block"""
+    previous = {name: os.environ.get(name) for name in values}
+    os.environ.update(values)
+    try:
+        yield
+    finally:
+        for name, value in previous.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+def bench_interactive_round(sessions: int = 3, latency: float = 0.05,
+                            output_chars: int = 400, db_async: bool = False) -> Dict[str, Any]:
+    """Run whole scripted sessions against the stub LLM
+
+    Each session answers every shark once, then exits to the verdicts. Uses
+    a throwaway SQLite database (through the async engine with db_async),
+    in-memory sessions and no response cache. Raises AssertionError if a
+    session's Q&A is not all stored.
+    """
+    from .crew import SharkTank
+
+    answers = [f"Scripted answer {turn}" for turn in range(6)]
+    session_times: List[float] = []
+    phases: Dict[str, List[float]] = {}
+    llm = StubLLM(latency=latency, output_chars=output_chars)
+    qa_counts: Dict[str, int] = {}
+
+    with tempfile.TemporaryDirectory() as tmp, _environment(
+        DB_CONNECTION_STRING=f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+        DB_ASYNC='true' if db_async else 'false',
+        SHARK_TANK_SESSION_BACKEND='memory',
+        SHARK_TANK_CACHE='off',
+        SHARK_TANK_STREAM='false'
+    ):
+        for number in range(sessions):
+            inputs = {
+                'pitch_text': f"Benchmark pitch {number}: a subscription box for houseplants",
+                'amount_invested': 100000,
+                'percentage_equity': 10,
+                'session_id': None,
+                'refresh_mode': False
+            }
+            with contextlib.redirect_stdout(io.StringIO()):
+                tank = SharkTank()
+                tank.registry.set_cache(None)
+                tank.registry.set_llm(llm)
+                started = time.perf_counter()
+                result = tank.interactive_round(inputs, answer_source=ScriptedAnswerSource(answers))
+                tank.close()
+            session_times.append(time.perf_counter() - started)
+            qa_counts[result['session_id']] = len(result['qa_rounds'])
+            for phase, samples in result['timings'].items():
+                phases.setdefault(phase, []).extend(samples)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            manager = DatabaseManager()
+            try:
+                stored = {session_id: len(manager.get_complete_conversation(session_id)['qa_history'])
+                          for session_id in qa_counts}
+            finally:
+                manager.close()
+
+    assert stored == qa_counts, f"Stored Q&A {stored} does not match the sessions' {qa_counts}"
+    return {
+        'sessions': sessions,
+        'db_async': db_async,
+        'llm_latency': latency,
+        'llm_output_chars': output_chars,
+        'llm_calls': llm.calls,
+        'session_mean_s': statistics.mean(session_times),
+        'session_max_s': max(session_times),
+        'phase_mean_s': {phase: statistics.mean(samples) for phase, samples in phases.items()}
+    }
+
+
+def check_async_database(qa_entries: int = 6) -> Dict[str, Any]:
+    """Round trip through AsyncDatabaseManager on aiosqlite
+
+    Creates a pitch session, adds Q&A entries and offers and reads the
+    whole conversation back. Raises AssertionError if anything is missing.
+    """
+    import asyncio
+
+    from .async_database import AsyncDatabaseManager
+
+    async def round_trip(connection_string: str) -> Dict[str, float]:
+        manager = AsyncDatabaseManager(connection_string)
+        try:
+            started = time.perf_counter()
+            pitch = await manager.create_pitch_session("async-round-trip", "Benchmark pitch", 100000, 10)
+            for number in range(qa_entries):
+                await manager.add_qa_entry(pitch.id, 'Barbara Corcoran', f"Question {number}?",
+                                           f"Answer {number}.", number // 3 + 1)
+            await manager.record_outcome(pitch.id, {'Barbara Corcoran': "I'm in: $100,000 for 10% equity."})
+            written = time.perf_counter() - started
+
+            started = time.perf_counter()
+            conversation = await manager.get_complete_conversation("async-round-trip")
+            fetched = time.perf_counter() - started
+        finally:
+            await manager.close()
+
+        assert conversation is not None, "The pitch session was not stored"
+        assert [qa['question'] for qa in conversation['qa_history']] == [
+            f"Question {number}?" for number in range(qa_entries)
+        ], "Q&A entries are missing or out of order"
+        assert len(conversation['offers']) == 1, "The offer was not stored"
+        return {'write_ms': written * 1e3, 'fetch_ms': fetched * 1e3}
+
+    with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(io.StringIO()):
+        timings = asyncio.run(round_trip(f"sqlite:///{os.path.join(tmp, 'async.db')}"))
+    return {'qa_entries': qa_entries, **timings}
+
+
+# One sample of the Prometheus text format: name{labels} value
+PROMETHEUS_SAMPLE = re.compile(r'^([a-z_]+)\{((?:[a-z_]+="(?:[^"\\]|\\.)*",?)*)\} (\S+)$')
+
+
+def bench_profiling(latency: float = 0.05, output_chars: int = 400,
+                    noop_spans: int = 200_000) -> Dict[str, Any]:
+    """Run a stub round with tracing on and parse both exports, then time spans with tracing off
+
+    Raises AssertionError if the JSON-lines trace or the Prometheus metrics
+    do not parse, or if they disagree on how many spans were recorded.
+    """
+    tracer = get_tracer()
+    enabled, spans = tracer.enabled, tracer.spans
+    tracer.enabled, tracer.spans = True, []
+    try:
+        started = time.perf_counter()
+        bench_interactive_round(sessions=1, latency=latency, output_chars=output_chars)
+        traced_s = time.perf_counter() - started
+        with tempfile.TemporaryDirectory() as tmp:
+            trace_path, metrics_path = write_profile(os.path.join(tmp, 'profile'))
+            with open(trace_path, 'r', encoding='utf-8') as f:
+                records = [json.loads(line) for line in f]
+            with open(metrics_path, 'r', encoding='utf-8') as f:
+                metric_lines = [line.rstrip("\n") for line in f if not line.startswith('#')]
+    finally:
+        tracer.enabled, tracer.spans = enabled, spans
+
+    span_counts: Dict[str, int] = {}
+    for record in records:
+        assert {'span', 'start', 'duration'} <= record.keys(), f"Incomplete trace record {record}"
+        span_counts[record['span']] = span_counts.get(record['span'], 0) + 1
+    metric_counts: Dict[str, int] = {}
+    for line in metric_lines:
+        match = PROMETHEUS_SAMPLE.match(line)
+        assert match, f"Unparseable Prometheus line {line!r}"
+        float(match.group(3))
+        if match.group(1) == 'shark_tank_span_seconds_count':
+            span_name = re.search(r'span="([^"]*)"', match.group(2)).group(1)
+            metric_counts[span_name] = metric_counts.get(span_name, 0) + int(match.group(3))
+    for name in ('session', 'pitch', 'question', 'answer', 'db_write'):
+        assert name in span_counts, f"No {name} span in the trace"
+    assert metric_counts == span_counts, f"Metrics count {metric_counts}, trace has {span_counts}"
+
+    # Cost of an instrumented block while profiling is off, over an empty loop
+    tracer.enabled = False
+    started = time.perf_counter()
+    for _ in range(noop_spans):
+        pass
+    empty_s = time.perf_counter() - started
+    started = time.perf_counter()
+    for _ in range(noop_spans):
+        with tracer.span('db_write', op='benchmark'):
+            pass
+    noop_s = time.perf_counter() - started
+    tracer.enabled = enabled
+
+    return {
+        'traced_session_s': traced_s,
+        'spans': len(records),
+        'span_names': len(span_counts),
+        'metric_lines': len(metric_lines),
+        'noop_span_ns': max(0.0, noop_s - empty_s) / noop_spans * 1e9
+    }
+
+
+def bench_batch(sessions: int = 8, workers: int = 4, latency: float = 0.05,
+                output_chars: int = 400) -> Dict[str, Any]:
+    """Run a batch of scripted pitches across a process pool into a new database
+
+    Raises AssertionError if a session fails (the workers once raced to
+    create the tables of a new database) or its Q&A is not all stored.
+    """
+    from .batch import run_batch
+
+    with tempfile.TemporaryDirectory() as tmp:
+        input_path = os.path.join(tmp, 'pitches.jsonl')
+        output_path = os.path.join(tmp, 'results.jsonl')
+        with open(input_path, 'w', encoding='utf-8') as f:
+            for number in range(sessions):
+                f.write(json.dumps({
+                    'id': f"pitch-{number}",
+                    'pitch_text': f"Batch pitch {number}: a subscription box for houseplants",
+                    'answers': [f"Scripted answer {turn}" for turn in range(6)]
+                }) + "\n")
+
+        database_path = os.path.join(tmp, 'batch.db')
+        with _environment(
+            DB_CONNECTION_STRING=f"sqlite:///{database_path}",
+            SHARK_TANK_SESSION_BACKEND='memory',
+            SHARK_TANK_CACHE='off',
+            SHARK_TANK_STREAM='false'
+        ), contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            summary = run_batch(input_path, output_path, workers=workers,
+                                llm=StubLLM(latency=latency, output_chars=output_chars))
+
+        with open(output_path, 'r', encoding='utf-8') as f:
+            results = [json.loads(line) for line in f]
+        errors = [f"{result['id']}: {result['error']}" for result in results if result['status'] != 'ok']
+        assert not errors, f"Batch sessions failed: {errors}"
+        manager = DatabaseManager(f"sqlite:///{database_path}")
+        try:
+            with manager.engine.connect() as conn:
+                stored_sessions = conn.execute(select(func.count()).select_from(PitchSession)).scalar()
+                stored_qa = conn.execute(select(func.count()).select_from(QAEntry)).scalar()
+        finally:
+            manager.close()
+        expected_qa = sum(len(result['qa_rounds']) for result in results)
+        assert stored_sessions == sessions, f"{stored_sessions} of {sessions} batch sessions stored"
+        assert stored_qa == expected_qa, f"{stored_qa} of {expected_qa} batch Q&A entries stored"
+
+    return {
+        'sessions': summary['sessions'],
+        'workers': workers,
+        'elapsed_s': summary['elapsed_seconds'],
+        'sessions_per_minute': summary['sessions_per_minute'],
+        'qa_entries': stored_qa
+    }
+
+
+def check_streaming_handlers(consoles: int = 50) -> Dict[str, int]:
+    """Streaming consoles share one pair of event bus handlers and stop receiving events when closed
+
+    Raises AssertionError if creating consoles adds handlers to crewai's
+    event bus each time, or a closed console still buffers chunks.
+    """
+    from crewai.events import LLMStreamChunkEvent, crewai_event_bus
+
+    def chunk_handlers() -> int:
+        return len(crewai_event_bus._handlers.get(LLMStreamChunkEvent, []))
+
+    StreamingConsole(enabled=True, out=io.StringIO()).close()
+    before = chunk_handlers()
+    created = [StreamingConsole(enabled=True, out=io.StringIO()) for _ in range(consoles)]
+    for console in created[:-1]:
+        console.close()
+    added = chunk_handlers() - before
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        crewai_event_bus.emit(None, LLMStreamChunkEvent(task_name='streaming_check', chunk="Final Answer: hi"))
+    created[-1].close()
+
+    assert added == 0, f"{consoles} consoles added {added} event bus handlers"
+    assert 'streaming_check' in created[-1]._streams, "The open console missed the chunk"
+    assert not any(console._streams for console in created[:-1]), "A closed console still receives chunks"
+    return {'consoles': consoles, 'handlers_added': added}
+
+
+def check_cache_keys() -> Dict[str, int]:
+    """Cache keys tell apart agents that differ only in goal or backstory
+
+    Raises AssertionError if two personas share a key, or if a session
+    identifier changes it.
+    """
+    agents, tasks = _load_raw_configs()
+    task_config = next(iter(tasks.values()))
+    inputs = {'pitch_text': "Benchmark pitch", 'session_id': "a"}
+    keys = {
+        name: ResponseCache.make_key(config, task_config, 'stub', inputs)
+        for name, config in agents.items()
+    }
+    agent_config = next(iter(agents.values()))
+    variants = [
+        dict(agent_config, goal=f"{agent_config.get('goal', '')} Only invest in hardware."),
+        dict(agent_config, backstory=f"{agent_config.get('backstory', '')} Made a fortune in retail.")
+    ]
+    variant_keys = {ResponseCache.make_key(config, task_config, 'stub', inputs) for config in variants}
+
+    assert len(set(keys.values())) == len(keys), "Two agents share a cache key"
+    assert not variant_keys & set(keys.values()) and len(variant_keys) == 2, \
+        "A goal or backstory change kept the cache key"
+    assert ResponseCache.make_key(agent_config, task_config, 'stub', dict(inputs, session_id="b")) \
+        == keys[next(iter(agents))], "The session ID changed the cache key"
+    return {'agents': len(keys), 'distinct_keys': len(set(keys.values())) + len(variant_keys)}
+
+
+def bench_scheduler(latency: float = 0.0, output_chars: int = 400, rounds: int = 3) -> Dict[str, Any]:
+    """LLM calls per session with the adaptive Q&A scheduler against asking everyone
+
+    The stub makes Kevin O'Leary and Barbara Corcoran say "I'm out" in
+    their first question; the founder gives the same answer to every
+    question. Raises AssertionError if an engaged shark is asked anything
+    different from what the plain loop asks it. (Their verdicts can still
+    differ, since the conversation they read no longer holds the dropped
+    sharks' later turns.)
+    """
+    from .crew import SharkTank
+
+    out_sharks = ("Kevin O'Leary", "Barbara Corcoran")
+    signals = {"Channel Kevin O": "For that reason, I'm out.", "Channel Barbara Corcoran": "I'm out."}
+    answers = ["We sell 2,000 units a month at a 40% margin."] * (6 * rounds)
+    runs = {}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in ('off', 'adaptive'):
+            llm = StubLLM(latency=latency, output_chars=output_chars, signals=signals)
+            with _environment(
+                DB_CONNECTION_STRING=f"sqlite:///{os.path.join(tmp, f'{mode}.db')}",
+                SHARK_TANK_SESSION_BACKEND='memory',
+                SHARK_TANK_CACHE='off',
+                SHARK_TANK_STREAM='false',
+                SHARK_TANK_SCHEDULER=mode,
+                SHARK_TANK_MAX_SHARK_ROUNDS=str(rounds)
+            ), contextlib.redirect_stdout(io.StringIO()):
+                tank = SharkTank()
+                tank.registry.set_cache(None)
+                tank.registry.set_llm(llm)
+                inputs = {
+                    'pitch_text': "Benchmark pitch: a subscription box for houseplants",
+                    'amount_invested': 100000,
+                    'percentage_equity': 10,
+                    'session_id': None,
+                    'refresh_mode': False
+                }
+                started = time.perf_counter()
+                result = tank.interactive_round(inputs, answer_source=ScriptedAnswerSource(answers))
+                elapsed = time.perf_counter() - started
+                tank.close()
+            runs[mode] = (llm.calls, elapsed, result)
+
+    def turns(result, shark_name):
+        return [(qa['question'], qa['answer']) for qa in result['qa_rounds'] if qa['shark_name'] == shark_name]
+
+    plain, adaptive = runs['off'][2], runs['adaptive'][2]
+    for shark_name in adaptive['offers']:
+        if shark_name in out_sharks:
+            assert adaptive['offers'][shark_name].startswith("No (out in round 1"), adaptive['offers'][shark_name]
+        else:
+            assert turns(adaptive, shark_name) == turns(plain, shark_name), f"{shark_name} was asked differently"
+
+    return {
+        'rounds_per_shark': rounds,
+        'llm_calls_all_sharks': runs['off'][0],
+        'llm_calls_adaptive': runs['adaptive'][0],
+        'llm_calls_saved_pct': (1 - runs['adaptive'][0] / runs['off'][0]) * 100,
+        'session_s_all_sharks': runs['off'][1],
+        'session_s_adaptive': runs['adaptive'][1],
+        'scheduler': adaptive['scheduler']
+    }
+
+
+def bench_prompts(latency: float = 0.0, output_chars: int = 400, rounds: int = 2) -> Dict[str, Any]:
+    """Prompt tokens per session with crewai's prompt layout against the shared-prefix one
+
+    Every shark asks in every round and the founder gives a long answer
+    each time. Also counts the tokens the verdict and recap prompts used to
+    spend on the pitch and answers, which were sent besides the transcript
+    that already holds them. Raises AssertionError if the shared layout
+    shares less of its prompts than crewai's.
+    """
+    from .crew import SHARKS, SharkTank
+
+    pitch_text = ("Benchmark pitch: a subscription box for houseplants. " * 40).strip()
+    answers = [f"Answer {number}: we sell 2,000 units a month at a 40% margin, "
+               "mostly through our own store, and we reorder every six weeks." for number in range(6 * rounds)]
+    runs = {}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for layout in ('crewai', 'shared'):
+            llm = StubLLM(latency=latency, output_chars=output_chars)
+            with _environment(
+                DB_CONNECTION_STRING=f"sqlite:///{os.path.join(tmp, f'{layout}.db')}",
+                SHARK_TANK_SESSION_BACKEND='memory',
+                SHARK_TANK_CACHE='off',
+                SHARK_TANK_STREAM='false',
+                SHARK_TANK_SCHEDULER='adaptive',
+                SHARK_TANK_MAX_SHARK_ROUNDS=str(rounds)
+            ), contextlib.redirect_stdout(io.StringIO()):
+                tank = SharkTank()
+                tank.registry.set_cache(None)
+                tank.registry.set_llm(llm)
+                tank.registry.set_prompt_layout(layout)
+                inputs = {
+                    'pitch_text': pitch_text,
+                    'amount_invested': 100000,
+                    'percentage_equity': 10,
+                    'session_id': None,
+                    'refresh_mode': False
+                }
+                result = tank.interactive_round(inputs, answer_source=ScriptedAnswerSource(answers))
+                tank.registry.set_prompt_layout(layout_from_env())
+                tank.close()
+            runs[layout] = result['prompts']
+
+    # What each verdict and the recap also received before: the pitch inputs
+    # and every shark's last answer as '<shark>_answer'
+    last_answers = {}
+    for qa in result['qa_rounds']:
+        last_answers[f"{qa['shark_name'].lower().replace(' ', '_')}_answer"] = qa['answer']
+    duplicated = estimate_tokens(render_inputs({'pitch_text': pitch_text, 'refresh_mode': False, **last_answers}))
+    duplicate_tokens_removed = duplicated * (len(SHARKS) + 1)
+
+    crewai, shared = runs['crewai'], runs['shared']
+    assert crewai['calls'] == shared['calls'], "The layouts made a different number of calls"
+    assert shared['prefix_tokens'] > crewai['prefix_tokens'], "The shared layout shares less than crewai's"
+    return {
+        'calls': shared['calls'],
+        'prompt_tokens_crewai': crewai['prompt_tokens'],
+        'prompt_tokens_shared': shared['prompt_tokens'],
+        'prefix_tokens_crewai': crewai['prefix_tokens'],
+        'prefix_tokens_shared': shared['prefix_tokens'],
+        'cached_tokens_crewai': crewai['cached_tokens'],
+        'cached_tokens_shared': shared['cached_tokens'],
+        'duplicate_tokens_removed': duplicate_tokens_removed,
+        'tokens_saved_per_session': shared['cached_tokens'] + duplicate_tokens_removed,
+        'by_kind': shared['by_kind']
+    }
+
+
+# A finished Q&A the verdict A/B runs on: (shark, question, answer)
+AB_EXCHANGES = [
+    ("Mark Cuban", "How many paying subscribers do you have, and what does it cost to get one?",
+     "4,800 subscribers; we pay about $18 to acquire each and they stay 14 months on average."),
+    ("Lori Greiner", "Could this work in retail, or only as a subscription?",
+     "We piloted a starter kit in 40 garden centres and sold through in five weeks."),
+    ("Barbara Corcoran", "Who runs the business day to day?",
+     "My co-founder runs operations and I run growth; we have six full-time staff."),
+    ("Robert Herjavec", "What stops a big retailer from copying you?",
+     "Our supplier contracts with 30 growers and the plant-care app our customers use weekly."),
+    ("Kevin O'Leary", "What were last year's sales and profit?",
+     "$1.1M in sales and $140,000 of profit, after paying ourselves."),
+    ("Daymond John", "What does your brand stand for?",
+     "Plants that arrive healthy and stay alive, with a guarantee to back it."),
+]
+
+
+def ab_verdict_modes(tank, inputs: Dict[str, Any], exchanges: Sequence = AB_EXCHANGES) -> Dict[str, Any]:
+    """Give the verdicts on one conversation per shark and with the panel, and compare
+
+    Runs with whatever LLM the tank's agents use. Reports each path's
+    latency, LLM calls and tokens, the panel's fallbacks and how many
+    sharks reach the same decision (offer or no offer) both ways.
+    """
+    from .crew import SHARKS
+    from .offers import verdict_decision
+
+    sessions = tank.session_manager
+    session_id = sessions.create_session(inputs)
+    for shark_name, question, answer in exchanges:
+        sessions.add_qa_round(session_id, shark_name, question, answer)
+    verdict_inputs = tank.verdict_inputs(inputs, sessions.get_session_summary(session_id), session_id)
+    shark_names = [shark_name for shark_name, _ in SHARKS]
+    ledger = tank.registry.prompts
+
+    def per_shark(tag: str, names: List[str]) -> Dict[str, str]:
+        verdicts = tank.verdict_executor.start([
+            (shark_name, lambda shark_name=shark_name: tank.give_verdict(shark_name, verdict_inputs, tag))
+            for shark_name in names
+        ])
+        try:
+            return {shark_name: verdicts.result(shark_name) for shark_name in names}
+        finally:
+            verdicts.close()
+
+    started = time.perf_counter()
+    single = per_shark(f"{session_id}:per_shark", shark_names)
+    single_s = time.perf_counter() - started
+    single_tokens = ledger.pop(f"{session_id}:per_shark")
+
+    started = time.perf_counter()
+    panel = tank.panel_verdicts(shark_names, verdict_inputs, f"{session_id}:panel")
+    fallbacks = [shark_name for shark_name in shark_names if shark_name not in panel]
+    panel.update(per_shark(f"{session_id}:panel", fallbacks))
+    panel_s = time.perf_counter() - started
+    panel_tokens = ledger.pop(f"{session_id}:panel")
+    sessions.cleanup_session(session_id)
+
+    disagreements = [
+        shark_name for shark_name in shark_names
+        if verdict_decision(single[shark_name]) != verdict_decision(panel[shark_name])
+    ]
+    return {
+        'per_shark': {
+            'latency_s': single_s,
+            'llm_calls': single_tokens['calls'],
+            'prompt_tokens': single_tokens['prompt_tokens'],
+            'output_tokens': single_tokens['output_tokens'],
+            'offers': sum(verdict_decision(verdict) for verdict in single.values())
+        },
+        'panel': {
+            'latency_s': panel_s,
+            'llm_calls': panel_tokens['calls'],
+            'prompt_tokens': panel_tokens['prompt_tokens'],
+            'output_tokens': panel_tokens['output_tokens'],
+            'offers': sum(verdict_decision(verdict) for verdict in panel.values()),
+            'fallbacks': len(fallbacks)
+        },
+        'agreement_pct': (1 - len(disagreements) / len(shark_names)) * 100,
+        'disagreements': disagreements
+    }
+
+
+def _stub_panel(investing: Sequence[str], broken: Sequence[str]) -> Callable[[str], str]:
+    """Stub response to a panel prompt: the investing agents offer, the broken ones are invalid"""
+    def respond(prompt: str) -> str:
+        verdicts = []
+        for agent_name in dict.fromkeys(re.findall(r"- (shark_[a-z_]+): ", prompt)):
+            if agent_name in broken:
+                # An offer without its terms fails validation
+                verdicts.append({'shark': agent_name, 'invest': True, 'reason': "I like it."})
+            elif agent_name in investing:
+                verdicts.append({'shark': agent_name, 'invest': True, 'amount': 100000, 'equity': 10,
+                                 'reason': "The numbers work and the team can execute."})
+            else:
+                verdicts.append({'shark': agent_name, 'invest': False,
+                                 'reason': "It is too early for me, so I'm out."})
+        return json.dumps({'verdicts': verdicts})
+    return respond
+
+
+def bench_verdict_modes(latency: float = 0.05, output_chars: int = 400) -> Dict[str, Any]:
+    """A/B of per-shark and panel verdicts on the stub LLM
+
+    The stub makes Mark Cuban and Lori Greiner offer on both paths and
+    returns an invalid panel entry for Daymond John, who falls back to his
+    own call. Raises AssertionError if the panel disagrees with the
+    per-shark path or does not fall back.
+    """
+    from .crew import SharkTank
+
+    offer = "I'm in: $100,000 for 10% equity."
+    llm = StubLLM(
+        latency=latency, output_chars=output_chars,
+        signals={"You are Mark Cuban": offer, "You are Lori Greiner": offer},
+        responders={"You are The Shark Tank Panel": _stub_panel(
+            investing=('shark_mark_cuban', 'shark_lori_greiner'), broken=('shark_daymond_john',)
+        )}
+    )
+    with tempfile.TemporaryDirectory() as tmp, _environment(
+        DB_CONNECTION_STRING=f"sqlite:///{os.path.join(tmp, 'verdicts.db')}",
+        SHARK_TANK_SESSION_BACKEND='memory',
+        SHARK_TANK_CACHE='off',
+        SHARK_TANK_STREAM='false'
+    ), contextlib.redirect_stdout(io.StringIO()):
+        tank = SharkTank()
+        tank.registry.set_cache(None)
+        tank.registry.set_llm(llm)
+        inputs = {'pitch_text': "Benchmark pitch: a subscription box for houseplants",
+                  'amount_invested': 100000, 'percentage_equity': 10}
+        result = ab_verdict_modes(tank, inputs)
+        tank.close()
+
+    assert result['agreement_pct'] == 100, f"Verdicts differ for {result['disagreements']}"
+    assert result['panel']['fallbacks'] == 1, "Daymond John's invalid entry did not fall back"
+    return result
+
+
+def bench_service(founders: int = 200, latency: float = 0.05, output_chars: int = 400,
+                  workers: int = 64) -> Dict[str, Any]:
+    """Serve many concurrent founders through the ASGI app against the stub LLM
+
+    Every founder creates a session, answers each shark once and asks for
+    the verdicts. CPU time is the whole process's, so sessions per CPU
+    second is roughly how many sessions one core serves per second.
+    """
+    import asyncio
+
+    import httpx
+
+    from .service import ServiceApp, SharkTankService
+
+    llm = StubLLM(latency=latency, output_chars=output_chars)
+    session_times: List[float] = []
+
+    async def founder(client, number: int):
+        started = time.perf_counter()
+        response = await client.post('/sessions', json={
+            'pitch_text': f"Service pitch {number}: a subscription box for houseplants"
+        })
+        response.raise_for_status()
+        session_id = response.json()['session_id']
+        for turn in range(6):
+            (await client.get(f'/sessions/{session_id}/question')).raise_for_status()
+            (await client.post(f'/sessions/{session_id}/answer',
+                               json={'answer': f"Scripted answer {turn}"})).raise_for_status()
+        (await client.post(f'/sessions/{session_id}/verdicts')).raise_for_status()
+        session_times.append(time.perf_counter() - started)
+
+    async def serve(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://service', timeout=None) as client:
+            await asyncio.gather(*(founder(client, number) for number in range(founders)))
+
+    with tempfile.TemporaryDirectory() as tmp, _environment(
+        DB_CONNECTION_STRING=f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+        SHARK_TANK_SESSION_BACKEND='memory',
+        SHARK_TANK_CACHE='off',
+        SHARK_TANK_STREAM='false'
+    ), contextlib.redirect_stdout(io.StringIO()):
+        service = SharkTankService(workers=workers)
+        service.tank.registry.set_cache(None)
+        service.tank.registry.set_llm(llm)
+        cpu_started = time.process_time()
+        started = time.perf_counter()
+        try:
+            asyncio.run(serve(ServiceApp(service)))
+        finally:
+            elapsed = time.perf_counter() - started
+            cpu_seconds = time.process_time() - cpu_started
+            service.close()
+
+    return {
+        'founders': founders,
+        'workers': workers,
+        'llm_latency': latency,
+        'llm_calls': llm.calls,
+        'elapsed_s': elapsed,
+        'cpu_s': cpu_seconds,
+        'sessions_per_s': founders / elapsed,
+        'sessions_per_cpu_s': founders / cpu_seconds if cpu_seconds else 0.0,
+        'session_mean_s': statistics.mean(session_times),
+        'session_max_s': max(session_times)
+    }
+
+
+def check_service_errors(latency: float = 0.0, output_chars: int = 400) -> Dict[str, Any]:
+    """A failed question is retried on the next request and its error is not sent to the client
+
+    The first question the service generates raises. Raises AssertionError
+    if the 500 response exposes the exception or the retry fails too.
+    """
+    import asyncio
+
+    import httpx
+
+    from .service import ServiceApp, SharkTankService
+
+    secret = "database password in the error"
+    failures: List[str] = []
+
+    async def exchange(app) -> List[Any]:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://service', timeout=None) as client:
+            response = await client.post('/sessions', json={
+                'pitch_text': "Service pitch: a subscription box for houseplants"
+            })
+            response.raise_for_status()
+            session_id = response.json()['session_id']
+            failed = await client.get(f'/sessions/{session_id}/question')
+            retried = await client.get(f'/sessions/{session_id}/question')
+            return [failed, retried]
+
+    with tempfile.TemporaryDirectory() as tmp, _environment(
+        DB_CONNECTION_STRING=f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+        SHARK_TANK_SESSION_BACKEND='memory',
+        SHARK_TANK_CACHE='off',
+        SHARK_TANK_STREAM='false'
+    ), contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        service = SharkTankService(workers=4)
+        service.tank.registry.set_cache(None)
+        service.tank.registry.set_llm(StubLLM(latency=latency, output_chars=output_chars))
+        ask_question = service.tank.ask_question
+
+        def flaky_ask_question(*args, **kwargs):
+            if not failures:
+                failures.append(args[0])
+                raise RuntimeError(secret)
+            return ask_question(*args, **kwargs)
+
+        service.tank.ask_question = flaky_ask_question
+        try:
+            failed, retried = asyncio.run(exchange(ServiceApp(service)))
+        finally:
+            service.close()
+
+    assert failed.status_code == 500, f"Failed question returned {failed.status_code}"
+    assert secret not in failed.text, "The 500 response exposes the exception"
+    assert retried.status_code == 200, f"Retried question returned {retried.status_code}: {retried.text}"
+    return {'failed_status': failed.status_code, 'retried_status': retried.status_code,
+            'shark_name': retried.json()['shark_name']}
+
+
+def bench_database_throughput(rows: int = 5000, qa_per_session: int = 20) -> Dict[str, float]:
+    """Q&A insert throughput (one by one and write-behind) and conversation fetches on SQLite"""
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = DatabaseManager(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        try:
+            sessions = max(1, rows // qa_per_session)
+            pitch_ids = [
+                manager.create_pitch_session(f"throughput-{number}", "Benchmark pitch", 100000, 10).id
+                for number in range(sessions)
+            ]
+
+            started = time.perf_counter()
+            for row in range(rows):
+                manager.add_qa_entry(pitch_ids[row % sessions], 'Mark Cuban', f"Question {row}?", "Answer.",
+                                     row // sessions + 1)
+            single = time.perf_counter() - started
+
+            started = time.perf_counter()
+            for row in range(rows):
+                manager.queue_qa_entry(pitch_ids[row % sessions], 'Lori Greiner', f"Question {row}?", "Answer.",
+                                       row // sessions + 1)
+            manager.flush()
+            queued = time.perf_counter() - started
+
+            started = time.perf_counter()
+            for number in range(sessions):
+                conversation = manager.get_complete_conversation(f"throughput-{number}")
+                assert len(conversation['qa_history']) == 2 * qa_per_session
+            fetch = time.perf_counter() - started
+        finally:
+            manager.close()
+
+    return {
+        'rows': rows,
+        'insert_rows_per_s': rows / single,
+        'write_behind_rows_per_s': rows / queued,
+        'fetch_conversations_per_s': sessions / fetch
+    }
+
+
+def check_write_behind_failures(rows: int = 20, max_retries: int = 2) -> Dict[str, Any]:
+    """A row the database rejects is set aside after the retries instead of blocking the queue
+
+    A trigger rejects one of the queued Q&A rows. Raises AssertionError if
+    the other rows, or rows queued afterwards, are not written.
+    """
+    from .write_behind import WriteBehindQueue
+
+    with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(io.StringIO()):
+        manager = DatabaseManager(f"sqlite:///{os.path.join(tmp, 'write_behind.db')}")
+        try:
+            with manager.engine.begin() as conn:
+                conn.exec_driver_sql(
+                    "CREATE TRIGGER reject_poison BEFORE INSERT ON qa_entries "
+                    "WHEN NEW.question = 'poison' BEGIN SELECT RAISE(ABORT, 'poison row'); END"
+                )
+            pitch_id = manager.create_pitch_session("write-behind", "Benchmark pitch", 100000, 10).id
+            write_queue = WriteBehindQueue(manager.engine, flush_interval=60, max_retries=max_retries)
+            for row in range(rows):
+                question = 'poison' if row == rows // 2 else f"Question {row}?"
+                write_queue.put_qa_entry(pitch_id, 'Mark Cuban', question, "Answer.")
+
+            attempts = 0
+            while not write_queue.dead_letters and attempts <= max_retries:
+                write_queue.flush(timeout=10)
+                attempts += 1
+            errors = write_queue.take_errors()
+            write_queue.put_qa_entry(pitch_id, 'Mark Cuban', "Question after?", "Answer.")
+            write_queue.close(timeout=10)
+            stored = len(manager.get_qa_history(pitch_id))
+        finally:
+            manager.close()
+
+    assert attempts == max_retries + 1, f"Gave up after {attempts} attempts instead of {max_retries + 1}"
+    assert [row['question'] for row in write_queue.dead_letters] == ['poison'], "The poison row was not set aside"
+    assert stored == rows, f"{stored} rows stored instead of {rows - 1} good ones and the one queued after"
+    assert len(errors) == max_retries + 2, f"Unexpected errors: {errors}"
+    return {'attempts': attempts, 'rows_stored': stored, 'dead_letters': len(write_queue.dead_letters)}
+
+
+# Verdicts as sharks word them, with the offer each should parse to
+OFFER_SAMPLES = [
+    ("Yes: $100,000 for 20% equity. Great margins.",
+     {'invest': True, 'amount': 100_000, 'equity': 20.0, 'royalty': None, 'valuation': 500_000}),
+    ("I'm in. I'll offer $250k for 25% of the company.",
+     {'invest': True, 'amount': 250_000, 'equity': 25.0, 'valuation': 1_000_000}),
+    ("I'll give you $1.5 million for 10% equity and a 5% royalty until I recoup.",
+     {'invest': True, 'amount': 1_500_000, 'equity': 10.0, 'royalty': 5.0, 'valuation': 15_000_000}),
+    ("My offer: $200,000 as a loan at 8% interest plus 5% equity.",
+     {'invest': True, 'amount': 200_000, 'equity': 5.0, 'royalty': None, 'valuation': 4_000_000}),
+    ("I'll invest $80,000 for a $2 per unit royalty until I get my money back.",
+     {'invest': True, 'amount': 80_000, 'equity': None, 'valuation': None}),
+    ("No. The $500,000 valuation is way too high for me.",
+     {'invest': False, 'amount': None, 'equity': None, 'valuation': None}),
+    ("I'm not going to make you an offer. For those reasons, I'm out.",
+     {'invest': False, 'amount': None}),
+    ("Verdict: pass. Your 30% margins won't survive retail.", {'invest': False, 'equity': None}),
+]
+
+
+def bench_offer_queries(sessions: int = 20_000, sharks: Sequence[str] = ('Mark Cuban', 'Kevin O\'Leary',
+                                                                           'Lori Greiner')) -> Dict[str, Any]:
+    """Deal rate per shark and median valuation from the offers table vs re-parsing the raw verdicts
+
+    Checks the parser on OFFER_SAMPLES first, then fills a throwaway SQLite
+    file with one verdict per shark per session and times both ways of
+    answering the questions; they must agree.
+    """
+    for text, expected in OFFER_SAMPLES:
+        parsed = parse_offer(text)
+        wrong = {key: parsed[key] for key, value in expected.items() if parsed[key] != value}
+        assert not wrong, f"{text!r} parsed to {wrong}, expected {expected}"
+
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = DatabaseManager(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        try:
+            _fill_conversations(manager, 1, sessions, 1)
+            with manager.engine.begin() as conn:
+                for start in range(1, sessions + 1, 1000):
+                    rows = []
+                    for number in range(start, min(start + 1000, sessions + 1)):
+                        rows.extend(offer_rows(number, {
+                            shark_name: (f"Yes: ${rng.randrange(5, 200) * 5000:,} for "
+                                         f"{rng.randrange(5, 50)}% equity. I like it."
+                                         if rng.random() < 0.3 else "No. I'm out.")
+                            for shark_name in sharks
+                        }))
+                    conn.execute(insert(Offer.__table__), rows)
+
+            started = time.perf_counter()
+            scanned: Dict[str, List[int]] = {shark_name: [0, 0] for shark_name in sharks}
+            valuations = []
+            with manager.engine.connect() as conn:
+                for shark_name, raw_text in conn.execute(
+                    Offer.__table__.select().with_only_columns(Offer.shark_name, Offer.raw_text)
+                ):
+                    offer = parse_offer(raw_text)
+                    scanned[shark_name][0] += 1
+                    if offer['invest']:
+                        scanned[shark_name][1] += 1
+                        valuations.append(offer['valuation'])
+            scan_median = statistics.median(valuations)
+            scan_time = time.perf_counter() - started
+
+            started = time.perf_counter()
+            deal_rates = manager.deal_rate_by_shark()
+            valuation = manager.valuation_stats()
+            query_time = time.perf_counter() - started
+
+            assert {row['shark_name']: [row['verdicts'], row['deals']] for row in deal_rates} == scanned
+            assert valuation['deals'] == len(valuations) and valuation['median_valuation'] == scan_median
+        finally:
+            manager.close()
+
+    return {
+        'offers': sessions * len(sharks),
+        'deals': valuation['deals'],
+        'median_valuation': valuation['median_valuation'],
+        'parse_scan_ms': scan_time * 1000,
+        'indexed_query_ms': query_time * 1000,
+        'speedup': scan_time / query_time
+    }
+
+
+def bench_analytics(session_counts: Sequence[int] = (100_000, 1_000_000), qa_per_session: int = 2,
+                    samples: int = 20) -> List[Dict[str, float]]:
+    """Statistics from the rollup tables against aggregating pitch_sessions and qa_entries
+
+    History is bulk inserted around the rollups and then backfilled into them,
+    the way an upgraded database is; the rollup read should stay flat as the
+    history grows while the raw aggregates scale with it.
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = DatabaseManager(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        stored = 0
+        try:
+            for target in session_counts:
+                _fill_conversations(manager, stored + 1, target - stored, qa_per_session)
+                stored = target
+
+                started = time.perf_counter()
+                manager.rebuild_analytics()
+                backfill_time = time.perf_counter() - started
+
+                # Writes after the backfill go through the incremental path
+                pitch = manager.create_pitch_session(f"analytics-{target}", "Benchmark pitch", 250000, 20)
+                manager.add_qa_entry(pitch.id, 'Lori Greiner', "Question?", "Answer.")
+                manager.queue_qa_entry(pitch.id, 'Daymond John', "Question?", "Answer.")
+                manager.flush()
+                stored += 1
+
+                started = time.perf_counter()
+                for _ in range(samples):
+                    analytics = manager.get_analytics()
+                rollup_time = (time.perf_counter() - started) / samples
+
+                started = time.perf_counter()
+                with manager.engine.connect() as conn:
+                    totals = conn.execute(select(
+                        func.count(), func.avg(PitchSession.amount_invested), func.avg(PitchSession.percentage_equity)
+                    )).one()
+                    questions = dict(conn.execute(
+                        select(QAEntry.shark_name, func.count()).group_by(QAEntry.shark_name)
+                    ).all())
+                scan_time = time.perf_counter() - started
+
+                assert analytics['sessions'] == totals[0] == stored
+                assert abs(analytics['avg_ask_amount'] - totals[1]) < 1e-6
+                assert {shark['shark_name']: shark['questions'] for shark in analytics['sharks']} == questions
+
+                results.append({
+                    'sessions': analytics['sessions'],
+                    'backfill_s': backfill_time,
+                    'rollup_ms': rollup_time * 1000,
+                    'scan_ms': scan_time * 1000
+                })
+        finally:
+            manager.close()
+    return results
+
+
+def bench_transfer(session_counts: Sequence[int] = (20_000, 100_000), qa_per_session: int = 6,
+                   batch_size: int = 1000) -> List[Dict[str, float]]:
+    """Export to JSON lines and import into an empty database, by table size
+
+    Throughput is timed on its own; a second pass under tracemalloc records
+    the peak memory of each step, which should not grow with the table.
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        source = DatabaseManager(f"sqlite:///{os.path.join(tmp, 'source.db')}")
+        stored = 0
+        try:
+            for target in session_counts:
+                _fill_conversations(source, stored + 1, target - stored, qa_per_session)
+                stored = target
+                path = os.path.join(tmp, f"sessions_{target}.jsonl")
+
+                peaks = {}
+                for traced in (False, True):
+                    target_db = os.path.join(tmp, f"target_{target}_{traced}.db")
+                    destination = DatabaseManager(f"sqlite:///{target_db}")
+                    try:
+                        if traced:
+                            tracemalloc.start()
+                        exported = export_sessions(source.engine, path, batch_size=batch_size)
+                        if traced:
+                            peaks['export_peak_kb'] = tracemalloc.get_traced_memory()[1] / 1024
+                            tracemalloc.reset_peak()
+                        imported = import_sessions(destination.engine, path, batch_size=batch_size)
+                        if traced:
+                            peaks['import_peak_kb'] = tracemalloc.get_traced_memory()[1] / 1024
+                            tracemalloc.stop()
+                        else:
+                            throughput = {'export_rows_per_s': exported['rows_per_s'],
+                                          'import_rows_per_s': imported['rows_per_s']}
+                    finally:
+                        destination.close()
+                    assert exported['rows'] == imported['rows'] == target * (qa_per_session + 1)
+
+                results.append({'sessions': target, 'rows': exported['rows'], **throughput, **peaks})
+        finally:
+            source.close()
+    return results
+
+
+def _writer_latency(connection_string: str, ready, stop, latencies):
+    """Create pitch sessions one at a time until stop is set, sending each write's time to latencies"""
+    manager = DatabaseManager(connection_string)
+    ready.set()
+    number = 0
+    try:
+        while not stop.is_set():
+            number += 1
+            started = time.perf_counter()
+            manager.create_pitch_session(f"live-{number}", "Live pitch", 50000, 5)
+            latencies.put(time.perf_counter() - started)
+            time.sleep(0.005)
+    finally:
+        manager.close()
+        latencies.put(None)
+
+
+def bench_retention(sessions: int = 100_000, qa_per_session: int = 4, expired_share: float = 0.5,
+                    batch_size: int = 1000) -> Dict[str, Any]:
+    """Purge the oldest sessions while another process keeps writing
+
+    The batched purge is compared with deleting the same rows in one
+    statement; the writer's worst latency shows how long it was held up.
+    The writer is a separate process, as the application is in production,
+    so it does not compete with the purge for the GIL.
+    """
+    import multiprocessing
+
+    results = {}
+    expired_sessions = int(sessions * expired_share)
+    # _fill_conversations creates session n at n seconds past its base time
+    now = datetime(2025, 1, 1) + timedelta(seconds=expired_sessions + 1, days=30)
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in ('batched', 'single_delete'):
+            connection_string = f"sqlite:///{os.path.join(tmp, f'{mode}.db')}"
+            manager = DatabaseManager(connection_string)
+            try:
+                _fill_conversations(manager, 1, sessions, qa_per_session)
+                # Readers block writers in SQLite's default journal; in WAL mode, as on
+                # PostgreSQL, the writer only ever waits for the purge's deletes
+                with manager.engine.connect() as conn:
+                    conn.exec_driver_sql("PRAGMA journal_mode=WAL")
+                context = multiprocessing.get_context('spawn')
+                ready, stop, queue = context.Event(), context.Event(), context.Queue()
+                writer = context.Process(target=_writer_latency, args=(connection_string, ready, stop, queue))
+                writer.start()
+                ready.wait()
+                time.sleep(0.2)
+                try:
+                    if mode == 'batched':
+                        job = RetentionJob(manager.engine, {'pitch_sessions': 30}, batch_size=batch_size,
+                                           archive_dir=os.path.join(tmp, 'archive'))
+                        purge = job.run(now)
+                        stats = {'rows_per_s': purge['rows_per_s'], 'elapsed_s': purge['elapsed_s'],
+                                 'deleted_rows': purge['deleted_rows'], 'batches': purge['pitch_sessions']['batches'],
+                                 'max_batch_ms': purge['pitch_sessions']['max_batch_ms']}
+                    else:
+                        cutoff = now - timedelta(days=30)
+                        started = time.perf_counter()
+                        with manager.engine.begin() as conn:
+                            expired = select(PitchSession.id).where(PitchSession.created_at < cutoff)
+                            deleted = conn.execute(QAEntry.__table__.delete().where(
+                                QAEntry.pitch_session_id.in_(expired))).rowcount
+                            deleted += conn.execute(PitchSession.__table__.delete().where(
+                                PitchSession.created_at < cutoff)).rowcount
+                        elapsed = time.perf_counter() - started
+                        stats = {'rows_per_s': deleted / elapsed, 'elapsed_s': elapsed, 'deleted_rows': deleted}
+                    time.sleep(0.2)
+                finally:
+                    stop.set()
+                    latencies = list(iter(queue.get, None))
+                    writer.join()
+                latencies.sort()
+                results[mode] = {**stats, 'writes': len(latencies),
+                                 'write_p50_ms': latencies[len(latencies) // 2] * 1000,
+                                 'write_max_ms': latencies[-1] * 1000}
+                assert stats['deleted_rows'] == expired_sessions * (qa_per_session + 1)
+            finally:
+                manager.close()
+    return results
+
+
+def bench_session_manager(sizes: Sequence[int] = (10_000, 100_000)) -> Dict[str, Dict[str, float]]:
+    """SessionManager create/lookup/stats cost on both backends at each size"""
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            results[f"memory_{size}"] = bench_session_backend(InMemorySessionBackend(), sessions=size)
+            backend = SQLiteSessionBackend(os.path.join(tmp, f"sessions_{size}.sqlite3"))
+            results[f"sqlite_{size}"] = bench_session_backend(backend, sessions=size)
+    return results
+
+
+def stress_session_manager(backend: SessionBackend, threads: int = 32, sessions: int = 2000,
+                           answers_per_session: int = 12) -> Dict[str, Any]:
+    """Hammer one SessionManager from a thread pool and check nothing was lost
+
+    Sessions are created concurrently, every session then gets its answers
+    from many threads at once, and some sessions are refreshed by several
+    threads at once. The interpreter switches threads as often as it can
+    to surface races. Raises AssertionError on a duplicate session number, a
+    lost or misnumbered Q&A round, a wrong counter or a double refresh.
+    """
+    manager = SessionManager(backend=backend)
+    pitch = {'pitch_text': 'Stress pitch', 'amount_invested': 100000, 'percentage_equity': 10}
+    first_number = manager.session_counter
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            started = time.perf_counter()
+            session_ids = list(pool.map(lambda _: manager.create_session(dict(pitch)), range(sessions)))
+            create = time.perf_counter() - started
+
+            answers = [(session_id, turn) for session_id in session_ids for turn in range(answers_per_session)]
+            random.Random(0).shuffle(answers)
+            started = time.perf_counter()
+            list(pool.map(
+                lambda job: manager.add_qa_round(job[0], 'Mark Cuban', f"Question {job[1]}", f"Answer {job[1]}"),
+                answers
+            ))
+            append = time.perf_counter() - started
+
+            def refresh(session_id: str) -> Optional[str]:
+                try:
+                    return manager.refresh_session(session_id)
+                except ValueError:
+                    return None
+
+            refreshed = session_ids[::10]
+            attempts = [session_id for session_id in refreshed for _ in range(4)]
+            started = time.perf_counter()
+            new_ids = [new_id for new_id in pool.map(refresh, attempts) if new_id is not None]
+            refresh_time = time.perf_counter() - started
+    finally:
+        sys.setswitchinterval(switch_interval)
+
+    refreshed_ids = set(refreshed)
+    numbers = [manager.get_session(session_id)['session_number']
+               for session_id in session_ids if session_id not in refreshed_ids]
+    numbers += [manager.get_session(session_id)['session_number'] for session_id in new_ids]
+    duplicate_numbers = len(numbers) - len(set(numbers))
+    assert duplicate_numbers == 0, f"{duplicate_numbers} duplicate session numbers"
+    assert manager.session_counter == first_number + sessions + len(refreshed)
+
+    lost_updates = 0
+    for session_id in session_ids:
+        session = manager.get_session(session_id)
+        if session is None:
+            continue
+        rounds = [qa['round_number'] for qa in session['qa_rounds']]
+        lost_updates += answers_per_session - len(rounds)
+        assert sorted(rounds) == list(range(1, answers_per_session + 1)), f"Misnumbered rounds in {session_id}"
+        assert session['current_round'] == answers_per_session + 1
+    assert lost_updates == 0, f"{lost_updates} lost Q&A rounds"
+    assert len(new_ids) == len(refreshed), f"{len(new_ids)} refreshes succeeded for {len(refreshed)} sessions"
+    assert manager.backend.count() == sessions
+    assert manager.backend.total_qa_rounds() == (sessions - len(refreshed)) * answers_per_session
+
+    backend.close()
+    return {
+        'threads': threads,
+        'sessions': sessions,
+        'qa_rounds': len(answers),
+        'create_per_s': sessions / create,
+        'add_qa_round_per_s': len(answers) / append,
+        'refresh_per_s': len(attempts) / refresh_time,
+        'duplicate_numbers': duplicate_numbers,
+        'lost_updates': lost_updates
+    }
+
+
+def bench_session_concurrency(sessions: int = 2000, threads: int = 32) -> Dict[str, Dict[str, Any]]:
+    """Concurrency stress check of SessionManager on both backends"""
+    with tempfile.TemporaryDirectory() as tmp:
+        return {
+            'memory': stress_session_manager(InMemorySessionBackend(), threads=threads, sessions=sessions),
+            'sqlite': stress_session_manager(
+                SQLiteSessionBackend(os.path.join(tmp, 'stress.sqlite3')), threads=threads, sessions=sessions
+            )
+        }
+
+
+# Modules that must not be imported before the first prompt of the CLIs. The
+# session utilities read their settings, so they may load dotenv.
+HEAVY_MODULES = ('crewai', 'litellm', 'sqlalchemy')
+
+_STARTUP_SCRIPT = """
+import json, runpy, sys
+heavy = {heavy!r}
+target = {target!r}
+if target == 'shark_tank':
+    import shark_tank.main as entry
+    loaded = [name for name in heavy if name in sys.modules]
+    try:
+        entry.run([])
+    except EOFError:
+        pass
+else:
+    try:
+        runpy.run_path(target, run_name='__main__')
+    except (EOFError, SystemExit):
+        pass
+    loaded = [name for name in heavy if name in sys.modules]
+sys.stderr.write('STARTUP ' + json.dumps(loaded) + '\\n')
+"""
+
+
+def bench_startup(budget_s: float = 0.5, stdin: str = '5\n\n7\n') -> Dict[str, Dict[str, Any]]:
+    """Time the CLIs from launch to their first prompt with `python -X importtime`
+
+    view_sessions.py runs to completion, manage_sessions.py shows its
+    statistics and exits, and shark_tank stops at its first prompt. Raises
+    AssertionError if one takes longer than budget_s or imports crewai,
+    LiteLLM or SQLAlchemy (or, for shark_tank, dotenv) before it needs them.
+    """
+    src_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    project_dir = os.path.dirname(src_dir)
+    targets = {
+        'shark_tank': 'shark_tank',
+        'view_sessions': os.path.join(project_dir, 'view_sessions.py'),
+        'manage_sessions': os.path.join(project_dir, 'manage_sessions.py')
+    }
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(
+            os.environ,
+            PYTHONPATH=src_dir,
+            SHARK_TANK_SESSION_DB=os.path.join(tmp, 'sessions.sqlite3')
+        )
+        for name, target in targets.items():
+            heavy = HEAVY_MODULES + (('dotenv',) if name == 'shark_tank' else ())
+            script = _STARTUP_SCRIPT.format(heavy=heavy, target=target)
+            started = time.perf_counter()
+            process = subprocess.run(
+                [sys.executable, '-X', 'importtime', '-c', script],
+                input=stdin if name == 'manage_sessions' else '', capture_output=True,
+                text=True, cwd=tmp, env=env, timeout=60
+            )
+            elapsed = time.perf_counter() - started
+            loaded = None
+            imports_us = 0
+            slowest = []
+            for line in process.stderr.splitlines():
+                if line.startswith('STARTUP '):
+                    loaded = json.loads(line[len('STARTUP '):])
+                elif line.startswith('import time:') and '|' in line:
+                    self_us, _, module = line[len('import time:'):].split('|')
+                    if self_us.strip().isdigit():
+                        imports_us += int(self_us)
+                        slowest.append((int(self_us), module.strip()))
+            assert loaded is not None, f"{name} failed to start:\n{process.stderr[-2000:]}"
+            results[name] = {
+                'startup_s': elapsed,
+                'import_s': imports_us / 1e6,
+                'modules_imported': len(slowest),
+                'heavy_modules': loaded,
+                'slowest_imports': [module for _, module in sorted(slowest, reverse=True)[:5]]
+            }
+
+    for name, stats in results.items():
+        assert not stats['heavy_modules'], f"{name} imported {', '.join(stats['heavy_modules'])} before its first prompt"
+        assert stats['startup_s'] < budget_s, f"{name} took {stats['startup_s']:.2f}s to start (budget {budget_s:g}s)"
+    return results
+
+
+def _git_commit() -> Optional[str]:
+    """Current commit of the checkout, if there is one"""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True, cwd=os.path.dirname(__file__)
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(quick: bool = False, latency: float = 0.05, output_chars: int = 400) -> Dict[str, Any]:
+    """Run every benchmark and return the results with run metadata"""
+    results: Dict[str, Any] = {}
+
+    print("⏱️ CLI startup...")
+    results['startup'] = bench_startup()
+
+    print("⏱️ Config load and hot reload...")
+    results['config'] = bench_config_load()
+
+    print("⏱️ Per-turn agent/task overhead...")
+    results['turn_overhead'] = bench_turn_overhead()
+
+    print("⏱️ interactive_round with the stub LLM...")
+    results['interactive_round'] = bench_interactive_round(
+        sessions=1 if quick else 3, latency=latency, output_chars=output_chars
+    )
+
+    print("⏱️ interactive_round on the async database engine...")
+    results['interactive_round_async'] = bench_interactive_round(
+        sessions=1, latency=latency, output_chars=output_chars, db_async=True
+    )
+
+    print("⏱️ Async database round trip...")
+    results['async_database'] = check_async_database()
+
+    print("⏱️ Tracing exports and disabled-span overhead...")
+    results['profiling'] = bench_profiling(latency=latency, output_chars=output_chars)
+
+    print("⏱️ Batch mode into a new database...")
+    results['batch'] = bench_batch(sessions=4 if quick else 8, latency=latency, output_chars=output_chars)
+
+    print("⏱️ Response cache keys...")
+    results['cache_keys'] = check_cache_keys()
+
+    print("⏱️ Streaming event handlers...")
+    results['streaming_handlers'] = check_streaming_handlers()
+
+    print("⏱️ Adaptive Q&A scheduler...")
+    results['scheduler'] = bench_scheduler(latency=latency, output_chars=output_chars)
+
+    print("⏱️ Prompt tokens and shared prefixes...")
+    results['prompts'] = bench_prompts(output_chars=output_chars)
+
+    print("⏱️ Per-shark and panel verdicts...")
+    results['verdict_modes'] = bench_verdict_modes(latency=latency, output_chars=output_chars)
+
+    print("⏱️ HTTP service with concurrent founders...")
+    results['service'] = bench_service(
+        founders=50 if quick else 200, latency=latency, output_chars=output_chars
+    )
+
+    print("⏱️ Service errors and question retries...")
+    results['service_errors'] = check_service_errors(output_chars=output_chars)
+
+    print("⏱️ Database throughput...")
+    results['database'] = bench_database_throughput(rows=1000 if quick else 5000)
+
+    print("⏱️ Write-behind with a rejected row...")
+    results['write_behind_failures'] = check_write_behind_failures()
+
+    print("⏱️ Upgrade of an unversioned database...")
+    results['schema_upgrade'] = check_schema_upgrade()
+
+    print("⏱️ Conversation fetch by table size...")
+    results['conversation_fetch'] = bench_conversation_fetch(
+        (10_000, 100_000) if quick else (10_000, 100_000, 1_000_000)
+    )
+
+    print("⏱️ Offer queries...")
+    results['offer_queries'] = bench_offer_queries(sessions=5000 if quick else 20_000)
+
+    print("⏱️ Analytics rollups by history size...")
+    results['analytics'] = bench_analytics((100_000,) if quick else (100_000, 1_000_000))
+
+    print("⏱️ Session export and import by table size...")
+    results['transfer'] = bench_transfer((20_000,) if quick else (20_000, 100_000))
+
+    print("⏱️ Retention purge under concurrent writes...")
+    results['retention'] = bench_retention(20_000 if quick else 100_000)
+
+    print("⏱️ SessionManager...")
+    results['session_manager'] = bench_session_manager((10_000,) if quick else (10_000, 100_000))
+
+    print("⏱️ SessionManager under a thread pool...")
+    results['session_concurrency'] = bench_session_concurrency(sessions=500 if quick else 2000)
+
+    return {
+        'commit': _git_commit(),
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'quick': quick,
+        'results': results
+    }
+
+
+def _flatten(value: Any, prefix: str = '') -> Dict[str, float]:
+    """Numeric leaves of nested results, keyed by their dotted path"""
+    if isinstance(value, dict):
+        items = value.items()
+    elif isinstance(value, list):
+        items = ((str(index), item) for index, item in enumerate(value))
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        return {prefix: float(value)}
+    else:
+        return {}
+    flat = {}
+    for key, item in items:
+        flat.update(_flatten(item, f"{prefix}.{key}" if prefix else str(key)))
+    return flat
+
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any]) -> List[str]:
+    """One line per metric present in both runs, with its relative change"""
+    before = _flatten(baseline.get('results', {}))
+    after = _flatten(current.get('results', {}))
+    lines = []
+    for key in sorted(before.keys() & after.keys()):
+        if before[key]:
+            change = (after[key] - before[key]) / before[key] * 100
+            lines.append(f"  {key}: {before[key]:.4g} -> {after[key]:.4g} ({change:+.1f}%)")
+    return lines
+
+
+def main(argv: Optional[List[str]] = None):
+    """Run the benchmark suite and save the results as JSON"""
+    parser = argparse.ArgumentParser(description="Shark Tank benchmark suite (no real LLM calls)")
+    parser.add_argument('-o', '--output', default='benchmark_results.json', help="Where to write the results")
+    parser.add_argument('--compare', help="Earlier results file to compare against")
+    parser.add_argument('--quick', action='store_true', help="Smaller sizes for a fast check")
+    parser.add_argument('--latency', type=float, default=0.05, help="Seconds per stub LLM call")
+    parser.add_argument('--output-chars', type=int, default=400, help="Characters per stub LLM answer")
+    parser.add_argument('--startup', action='store_true',
+                        help="Only check the CLIs' start-up time and imports, then exit")
+    parser.add_argument('--verdict-ab', action='store_true',
+                        help="Only compare per-shark and panel verdicts with the configured model "
+                             "(makes real LLM calls), then exit")
+    args = parser.parse_args(argv)
+
+    if args.verdict_ab:
+        from .crew import SharkTank
+        tank = SharkTank()
+        tank.registry.set_cache(None)
+        inputs = {'pitch_text': "A subscription box for houseplants, with a plant-care app and a health guarantee",
+                  'amount_invested': 150000, 'percentage_equity': 10}
+        print(json.dumps(ab_verdict_modes(tank, inputs), indent=2))
+        tank.close()
+        return
+
+    if args.startup:
+        try:
+            startup = bench_startup()
+        except AssertionError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        for name, stats in startup.items():
+            print(f"🚀 {name}: first prompt after {stats['startup_s']:.3f}s "
+                  f"({stats['import_s']:.3f}s importing {stats['modules_imported']} modules)")
+        return
+
+    report = run_suite(quick=args.quick, latency=args.latency, output_chars=args.output_chars)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+    results = report['results']
+    for name, stats in results['startup'].items():
+        print(f"🚀 {name}: first prompt after {stats['startup_s']:.3f}s")
+    config = results['config']
+    print(f"⚙️ Config: {config['parse_ms']:.2f} ms parsed, {config['snapshot_cache_ms']:.2f} ms from the snapshot "
+          f"cache, {config['unchanged_ms'] * 1e3:.1f} µs unchanged; reload rebuilt "
+          f"{config['reload_rebuilt_agents']} agent and {config['reload_rebuilt_tasks']} tasks")
+    round_results = results['interactive_round']
+    print(f"\n🦈 interactive_round: {round_results['session_mean_s']:.2f}s per session "
+          f"({round_results['llm_calls']} stub LLM calls at {args.latency:.3f}s)")
+    async_round = results['interactive_round_async']
+    async_database = results['async_database']
+    print(f"⚡ Async database: interactive_round {async_round['session_mean_s']:.2f}s per session; "
+          f"round trip wrote {async_database['qa_entries']} Q&A entries in {async_database['write_ms']:.1f} ms "
+          f"and read them back in {async_database['fetch_ms']:.1f} ms")
+    profiling = results['profiling']
+    print(f"🔬 Profiling: {profiling['spans']} spans of {profiling['span_names']} kinds exported and parsed; "
+          f"a span costs {profiling['noop_span_ns']:.0f} ns with profiling off")
+    batch = results['batch']
+    print(f"📦 Batch: {batch['sessions']} sessions into a new database with {batch['workers']} workers, "
+          f"{batch['sessions_per_minute']:.0f} sessions/minute, {batch['qa_entries']} Q&A entries stored")
+    print(f"🔑 Cache keys: {results['cache_keys']['distinct_keys']} distinct keys for "
+          f"{results['cache_keys']['agents']} agents and 2 edited personas")
+    streaming = results['streaming_handlers']
+    print(f"📡 Streaming: {streaming['consoles']} consoles added {streaming['handlers_added']} event bus handlers")
+    scheduler = results['scheduler']
+    print(f"🚪 Scheduler: {scheduler['llm_calls_adaptive']} LLM calls per session instead of "
+          f"{scheduler['llm_calls_all_sharks']} ({scheduler['llm_calls_saved_pct']:.0f}% fewer) "
+          f"with two sharks out")
+    prompts = results['prompts']
+    print(f"📏 Prompts: {prompts['tokens_saved_per_session']:,} tokens saved per session "
+          f"({prompts['cached_tokens_shared']:,} cacheable prefix, "
+          f"{prompts['duplicate_tokens_removed']:,} duplicated inputs removed)")
+    verdict_modes = results['verdict_modes']
+    print(f"🧑‍⚖️ Verdicts: panel {verdict_modes['panel']['llm_calls']} calls, "
+          f"{verdict_modes['panel']['prompt_tokens']:,} prompt tokens, {verdict_modes['panel']['latency_s']:.2f}s; "
+          f"per shark {verdict_modes['per_shark']['llm_calls']} calls, "
+          f"{verdict_modes['per_shark']['prompt_tokens']:,} prompt tokens, "
+          f"{verdict_modes['per_shark']['latency_s']:.2f}s; {verdict_modes['agreement_pct']:.0f}% agree")
+    service = results['service']
+    print(f"🌐 Service: {service['founders']} concurrent founders in {service['elapsed_s']:.2f}s, "
+          f"{service['sessions_per_s']:.1f} sessions/s, "
+          f"{service['sessions_per_cpu_s']:.1f} sessions per CPU-second")
+    print(f"🛟 A failed question returned a generic {results['service_errors']['failed_status']} and was "
+          f"retried for {results['service_errors']['shark_name']}")
+    database = results['database']
+    print(f"💾 Database: {database['insert_rows_per_s']:,.0f} rows/s one by one, "
+          f"{database['write_behind_rows_per_s']:,.0f} rows/s write-behind, "
+          f"{database['fetch_conversations_per_s']:,.0f} conversations/s fetched")
+    write_behind = results['write_behind_failures']
+    print(f"🪦 Write-behind: a rejected row was set aside after {write_behind['attempts']} attempts, "
+          f"{write_behind['rows_stored']} other rows stored")
+    print(f"🧱 Unversioned database upgraded and used in {results['schema_upgrade']['upgrade_ms']:.0f} ms")
+    for fetch in results['conversation_fetch']:
+        print(f"  {fetch['qa_rows']:>9,} Q&A rows: conversation {fetch['conversation_ms']:.2f} ms, "
+              f"history page {fetch['history_page_ms']:.2f} ms")
+    offer_queries = results['offer_queries']
+    print(f"🤝 Offers: deal rate and median valuation of {offer_queries['offers']:,} offers in "
+          f"{offer_queries['indexed_query_ms']:.1f} ms from the index, "
+          f"{offer_queries['parse_scan_ms']:.1f} ms re-parsing verdicts ({offer_queries['speedup']:.0f}x)")
+    for analytics in results['analytics']:
+        print(f"📊 Analytics over {analytics['sessions']:,} sessions: {analytics['rollup_ms']:.2f} ms from the "
+              f"rollups, {analytics['scan_ms']:.1f} ms aggregating the raw tables "
+              f"(one-off backfill {analytics['backfill_s']:.1f}s)")
+    for transfer in results['transfer']:
+        print(f"📦 Transfer of {transfer['rows']:,} rows: export {transfer['export_rows_per_s']:,.0f} rows/s "
+              f"(peak {transfer['export_peak_kb']:,.0f} KiB), import {transfer['import_rows_per_s']:,.0f} rows/s "
+              f"(peak {transfer['import_peak_kb']:,.0f} KiB)")
+    retention = results['retention']
+    print(f"🧹 Retention purge of {retention['batched']['deleted_rows']:,} rows: "
+          f"{retention['batched']['rows_per_s']:,.0f} rows/s in {retention['batched']['batches']} batches "
+          f"(longest {retention['batched']['max_batch_ms']:.0f} ms); concurrent writes waited at most "
+          f"{retention['batched']['write_max_ms']:.0f} ms, against "
+          f"{retention['single_delete']['write_max_ms']:.0f} ms behind a single DELETE")
+    for name, stats in results['session_manager'].items():
+        print(f"📝 Sessions {name}: create {stats['create_us']:.1f} µs, "
+              f"get_by_number {stats['get_by_number_us']:.1f} µs, stats {stats['stats_us']:.1f} µs")
+    for name, stats in results['session_concurrency'].items():
+        print(f"🧵 Sessions {name} x{stats['threads']} threads: {stats['add_qa_round_per_s']:,.0f} Q&A rounds/s, "
+              f"{stats['lost_updates']} lost updates, {stats['duplicate_numbers']} duplicate numbers")
+    print(f"\n💾 Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        print(f"\n📈 Compared with {args.compare} (commit {baseline.get('commit')}):")
+        for line in compare_results(baseline, report):
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+#!/usr/bin/env python
+"""
+Response cache for Shark Tank application
+Content-addressed cache of agent task outputs: a bounded in-memory LRU in
+front of a persistent SQLite store, so replayed pitches cost no LLM calls
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'shark_tank', 'responses.sqlite3')
+
+# Inputs that identify a session rather than decide what the agent says
+VOLATILE_INPUT_KEYS = {'session_id', 'refresh_mode'}
+SESSION_NUMBER_PATTERN = re.compile(r'Session #\d+')
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so formatting-only differences share a cache entry"""
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def normalize_inputs(inputs: Optional[Dict[str, Any]]) -> str:
+    """Render task inputs without session identifiers, in a stable key order"""
+    if not inputs:
+        return ""
+    parts = [
+        f"{key}: {SESSION_NUMBER_PATTERN.sub('Session', normalize_text(str(value)))}"
+        for key, value in sorted(inputs.items())
+        if key not in VOLATILE_INPUT_KEYS and value is not None
+    ]
+    return "\n".join(parts)
+
+
+class ResponseCache:
+    """In-memory LRU backed by an SQLite file, with TTL and size-based eviction"""
+
+    def __init__(self, path: Optional[str] = None, memory_entries: Optional[int] = None,
+                 disk_entries: Optional[int] = None, ttl: Optional[float] = None,
+                 skip_tasks: Optional[Iterable[str]] = None):
+        """Initialize cache
+
+        path is the SQLite file (None uses SHARK_TANK_CACHE_PATH or the user
+        cache dir, ':memory:' keeps nothing on disk), ttl is in seconds and
+        skip_tasks lists tasks.yaml names that are never cached.
+        """
+        if path is None:
+            path = os.getenv('SHARK_TANK_CACHE_PATH', DEFAULT_CACHE_PATH)
+        if memory_entries is None:
+            memory_entries = int(os.getenv('SHARK_TANK_CACHE_MEMORY_ENTRIES', '256'))
+        if disk_entries is None:
+            disk_entries = int(os.getenv('SHARK_TANK_CACHE_DISK_ENTRIES', '10000'))
+        if ttl is None:
+            ttl = float(os.getenv('SHARK_TANK_CACHE_TTL', str(7 * 24 * 3600)))
+        if skip_tasks is None:
+            skip_tasks = [
+                name.strip()
+                for name in os.getenv('SHARK_TANK_CACHE_SKIP_TASKS', 'founder_answers').split(',')
+                if name.strip()
+            ]
+
+        self.path = path
+        self.memory_entries = memory_entries
+        self.disk_entries = disk_entries
+        self.ttl = ttl
+        self.skip_tasks = set(skip_tasks)
+
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._puts_since_eviction = 0
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+            " created_at REAL NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_responses_last_used ON responses (last_used)")
+        self._conn.commit()
+
+    def is_cacheable(self, task_name: str) -> bool:
+        """Whether outputs of a task may be cached"""
+        return task_name not in self.skip_tasks
+
+    @staticmethod
+    def make_key(agent_config: Dict[str, Any], task_config: Dict[str, Any], model: str,
+                 inputs: Optional[Dict[str, Any]], layout: str = 'crewai') -> str:
+        """Hash everything that decides an agent's output into a cache key
+
+        The agent's persona (role, goal, backstory) and the task text come
+        from agents.yaml and tasks.yaml. layout is the registry's prompt
+        layout, which changes the prompt the model sees.
+        """
+        agent_part = {
+            key: normalize_text(str(value))
+            for key, value in sorted(agent_config.items())
+            if key in ('role', 'goal', 'backstory')
+        }
+        task_part = {
+            key: normalize_text(str(value))
+            for key, value in sorted(task_config.items())
+            if key in ('description', 'expected_output')
+        }
+        payload = json.dumps({
+            'agent': agent_part,
+            'task': task_part,
+            'model': model,
+            'layout': layout,
+            'inputs': normalize_inputs(inputs)
+        }, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Look a key up in memory, then on disk; expired entries are misses"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                value, created_at = entry
+                if now - created_at <= self.ttl:
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return value
+                del self._memory[key]
+
+            row = self._conn.execute(
+                "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and now - row[1] <= self.ttl:
+                self._conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+                self._conn.commit()
+                self._remember(key, row[0], row[1])
+                self.disk_hits += 1
+                return row[0]
+
+            self.misses += 1
+            return None
+
+    def put(self, key: str, value: str):
+        """Store a value in memory and on disk"""
+        now = time.time()
+        with self._lock:
+            self._remember(key, value, now)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created_at, last_used) VALUES (?, ?, ?, ?)",
+                (key, value, now, now)
+            )
+            self._conn.commit()
+
+            # Eviction scans the table, so only run it every few writes
+            self._puts_since_eviction += 1
+            if self._puts_since_eviction >= 50:
+                self._evict(now)
+
+    def _remember(self, key: str, value: str, created_at: float):
+        """Put an entry in the in-memory LRU, dropping the least recently used"""
+        self._memory[key] = (value, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _evict(self, now: float):
+        """Drop expired entries and the least recently used ones over the size limit"""
+        self._puts_since_eviction = 0
+        self._conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl,))
+        self._conn.execute(
+            "DELETE FROM responses WHERE key IN ("
+            " SELECT key FROM responses ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+            (self.disk_entries,)
+        )
+        self._conn.commit()
+
+    def stats(self) -> Dict[str, int]:
+        """Hit and miss counters"""
+        with self._lock:
+            return {
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses
+            }
+
+    def clear(self):
+        """Drop every cached response"""
+        with self._lock:
+            self._memory.clear()
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def close(self):
+        """Close the SQLite connection"""
+        with self._lock:
+            self._conn.close()
+
+
+def cache_from_env() -> Optional[ResponseCache]:
+    """Create the response cache when SHARK_TANK_CACHE turns it on (it is off by default)
+
+    Cached runs replay earlier questions and verdicts for an identical
+    pitch instead of asking the LLM again, so this is opt-in.
+    """
+    if os.getenv('SHARK_TANK_CACHE', 'off').strip().lower() not in ('1', 'true', 'yes', 'on'):
+        return None
+    return ResponseCache()
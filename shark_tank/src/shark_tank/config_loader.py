@@ -0,0 +1,271 @@
+#!/usr/bin/env python
+"""
+Config loader for Shark Tank application
+Validates agents.yaml and tasks.yaml once, keeps the result as a snapshot
+cached on disk by content hash, and watches the files in long-running
+processes so edits apply without a restart
+"""
+
+import copy
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from .env import load_env
+
+CONFIG_DIR = os.path.join(os.path.dirname(__file__), 'config')
+DEFAULT_SNAPSHOT_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'shark_tank', 'config')
+
+# Keys every agent and task must define
+REQUIRED_AGENT_KEYS = ('role', 'goal', 'backstory')
+REQUIRED_TASK_KEYS = ('description', 'expected_output', 'agent')
+
+
+class ConfigError(ValueError):
+    """agents.yaml or tasks.yaml is missing, unreadable or invalid"""
+
+
+class ConfigSnapshot:
+    """Validated contents of agents.yaml and tasks.yaml at one point in time
+
+    Treat agents and tasks as read-only; they are shared by every user of
+    the snapshot.
+    """
+
+    def __init__(self, agents: Dict[str, Dict], tasks: Dict[str, Dict], fingerprint: str):
+        self.agents = agents
+        self.tasks = tasks
+        self.fingerprint = fingerprint
+
+    def diff(self, other: "ConfigSnapshot") -> Tuple[Set[str], Set[str]]:
+        """Agents and tasks that differ in other, including added and removed ones
+
+        A task whose agent changed counts as changed too, since it is bound
+        to that agent.
+        """
+        agents = {
+            name for name in self.agents.keys() | other.agents.keys()
+            if self.agents.get(name) != other.agents.get(name)
+        }
+        tasks = {
+            name for name in self.tasks.keys() | other.tasks.keys()
+            if self.tasks.get(name) != other.tasks.get(name)
+            or (name in other.tasks and other.tasks[name]['agent'] in agents)
+        }
+        return agents, tasks
+
+
+def validate(agents: Any, tasks: Any, required_tasks: Iterable[str] = ()) -> List[str]:
+    """Every problem found in the parsed configs (empty when they are valid)"""
+    if not isinstance(agents, dict):
+        return ["agents.yaml must be a mapping of agent names"]
+    if not isinstance(tasks, dict):
+        return ["tasks.yaml must be a mapping of task names"]
+
+    problems = []
+    for name, agent in agents.items():
+        if not isinstance(agent, dict):
+            problems.append(f"agent '{name}' must be a mapping")
+            continue
+        for key in REQUIRED_AGENT_KEYS:
+            if not str(agent.get(key) or '').strip():
+                problems.append(f"agent '{name}' is missing '{key}'")
+    for name, task in tasks.items():
+        if not isinstance(task, dict):
+            problems.append(f"task '{name}' must be a mapping")
+            continue
+        for key in REQUIRED_TASK_KEYS:
+            if not str(task.get(key) or '').strip():
+                problems.append(f"task '{name}' is missing '{key}'")
+        if task.get('agent') and task['agent'] not in agents:
+            problems.append(f"task '{name}' uses unknown agent '{task['agent']}'")
+    for name in required_tasks:
+        if name not in tasks:
+            problems.append(f"task '{name}' is required")
+    return problems
+
+
+class ConfigLoader:
+    """Loads config snapshots, re-reading the YAML only when the files change"""
+
+    def __init__(self, config_dir: str = CONFIG_DIR, snapshot_dir: Optional[str] = None,
+                 required_tasks: Iterable[str] = ()):
+        """Initialize loader
+
+        snapshot_dir holds compiled snapshots keyed by the files' hash
+        (None uses SHARK_TANK_CONFIG_CACHE or the user cache dir, 'off'
+        keeps nothing on disk). required_tasks are tasks.yaml names the
+        application cannot run without.
+        """
+        load_env()
+        if snapshot_dir is None:
+            snapshot_dir = os.getenv('SHARK_TANK_CONFIG_CACHE', DEFAULT_SNAPSHOT_DIR)
+        self.paths = (os.path.join(config_dir, 'agents.yaml'), os.path.join(config_dir, 'tasks.yaml'))
+        self.snapshot_dir = None if snapshot_dir.strip().lower() == 'off' else snapshot_dir
+        self.required_tasks = tuple(required_tasks)
+        self._snapshot: Optional[ConfigSnapshot] = None
+        self._stamp: Optional[Tuple] = None
+        self._lock = threading.Lock()
+
+    def _file_stamp(self) -> Tuple:
+        """(mtime, size) of both files; cheap enough to check on every load"""
+        try:
+            return tuple((stat.st_mtime_ns, stat.st_size) for stat in map(os.stat, self.paths))
+        except OSError as e:
+            raise ConfigError(f"Cannot read config: {e}")
+
+    def load(self) -> ConfigSnapshot:
+        """Current snapshot; parses and validates the YAML only if the files changed
+
+        Raises ConfigError if the files are invalid.
+        """
+        stamp = self._file_stamp()
+        if stamp == self._stamp:
+            return self._snapshot
+        with self._lock:
+            stamp = self._file_stamp()
+            if stamp != self._stamp:
+                self._snapshot = self._compile()
+                self._stamp = stamp
+            return self._snapshot
+
+    def _compile(self) -> ConfigSnapshot:
+        """Snapshot of the files as they are now, from the disk cache when possible"""
+        contents = []
+        for path in self.paths:
+            with open(path, 'rb') as f:
+                contents.append(f.read())
+        digest = hashlib.sha256()
+        for content in contents:
+            digest.update(hashlib.sha256(content).digest())
+        # The same files always compile to the same snapshot, so the fingerprint
+        # only changes with the content (touching a file is not a change)
+        fingerprint = digest.hexdigest()
+        if self._snapshot is not None and self._snapshot.fingerprint == fingerprint:
+            return self._snapshot
+
+        cached = self._read_cached(fingerprint)
+        if cached is not None:
+            return cached
+
+        # yaml is only imported when a file has to be parsed
+        import yaml
+        loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+        try:
+            agents, tasks = (yaml.load(content.decode('utf-8'), Loader=loader) for content in contents)
+        except (yaml.YAMLError, UnicodeDecodeError) as e:
+            raise ConfigError(f"Cannot parse config: {e}")
+        problems = validate(agents, tasks, self.required_tasks)
+        if problems:
+            raise ConfigError("Invalid config: " + "; ".join(problems))
+
+        snapshot = ConfigSnapshot(agents, tasks, fingerprint)
+        self._write_cached(snapshot)
+        return snapshot
+
+    def _snapshot_path(self, fingerprint: str) -> str:
+        return os.path.join(self.snapshot_dir, f"{fingerprint}.json")
+
+    def _read_cached(self, fingerprint: str) -> Optional[ConfigSnapshot]:
+        if self.snapshot_dir is None:
+            return None
+        try:
+            with open(self._snapshot_path(fingerprint), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        # The required tasks may differ between callers, so check them again
+        if validate(data['agents'], data['tasks'], self.required_tasks):
+            return None
+        return ConfigSnapshot(data['agents'], data['tasks'], fingerprint)
+
+    def _write_cached(self, snapshot: ConfigSnapshot):
+        if self.snapshot_dir is None:
+            return
+        path = self._snapshot_path(snapshot.fingerprint)
+        try:
+            os.makedirs(self.snapshot_dir, exist_ok=True)
+            temp_path = f"{path}.{os.getpid()}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({'agents': snapshot.agents, 'tasks': snapshot.tasks}, f, ensure_ascii=False)
+            os.replace(temp_path, path)
+        except (OSError, TypeError, ValueError):
+            # A snapshot that cannot be cached is still valid
+            pass
+
+    def load_yaml(self, path) -> Dict[str, Dict]:
+        """Private copy of agents.yaml or tasks.yaml from the current snapshot"""
+        snapshot = self.load()
+        name = os.path.basename(str(path))
+        if name == 'agents.yaml':
+            return copy.deepcopy(snapshot.agents)
+        if name == 'tasks.yaml':
+            return copy.deepcopy(snapshot.tasks)
+        raise ConfigError(f"Unknown config file {path}")
+
+
+class ConfigWatcher:
+    """Polls the config files and hands every valid new snapshot to a callback
+
+    An invalid edit is reported and ignored, so the last good config stays
+    in use.
+    """
+
+    def __init__(self, loader: ConfigLoader, on_change: Callable[[ConfigSnapshot, ConfigSnapshot], None],
+                 interval: Optional[float] = None):
+        """Initialize watcher; interval is in seconds (SHARK_TANK_CONFIG_WATCH, 2 by default)"""
+        if interval is None:
+            interval = float(os.getenv('SHARK_TANK_CONFIG_WATCH', '2'))
+        self.loader = loader
+        self.on_change = on_change
+        self.interval = interval
+        self._current = loader.load()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "ConfigWatcher":
+        """Start polling in a daemon thread (an interval of 0 disables watching)"""
+        if self.interval > 0 and self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='shark-tank-config-watch', daemon=True)
+            self._thread.start()
+        return self
+
+    def check(self) -> bool:
+        """Look for a change now; returns whether a new snapshot was applied"""
+        try:
+            snapshot = self.loader.load()
+        except ConfigError as e:
+            print(f"⚠️ Warning: Keeping the previous config: {e}")
+            return False
+        if snapshot.fingerprint == self._current.fingerprint:
+            return False
+        previous, self._current = self._current, snapshot
+        self.on_change(previous, snapshot)
+        return True
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def stop(self):
+        """Stop polling"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 1)
+            self._thread = None
+
+
+_loader: Optional[ConfigLoader] = None
+_loader_lock = threading.Lock()
+
+
+def get_config_loader(required_tasks: Iterable[str] = ()) -> ConfigLoader:
+    """Process-wide loader for the package's config directory"""
+    global _loader
+    if _loader is None:
+        with _loader_lock:
+            if _loader is None:
+                _loader = ConfigLoader(required_tasks=required_tasks)
+    return _loader
@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+"""
+Conversation context builder for Shark Tank application
+Builds the transcript handed to the sharks incrementally, one Q&A at a time,
+and keeps it inside a token budget by condensing the oldest rounds
+"""
+
+import os
+from collections import deque
+from typing import Deque, List, Optional, Tuple
+
+# Rough size of a token in characters; good enough for budgeting prompts
+CHARS_PER_TOKEN = 4
+
+# Longest question/answer excerpt kept when a round is condensed
+CONDENSED_QUESTION_CHARS = 80
+CONDENSED_ANSWER_CHARS = 120
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate the number of LLM tokens in a piece of text"""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _excerpt(text: str, limit: int) -> str:
+    """A text collapsed onto one line and cut to a character limit"""
+    text = " ".join(str(text).split())
+    return text if len(text) <= limit else text[:limit - 1].rstrip() + "…"
+
+
+class ConversationContext:
+    """Pitch header plus Q&A transcript, kept within a token budget"""
+
+    def __init__(self, header_lines: List[str], token_budget: Optional[int] = None):
+        """Initialize with the pitch header lines
+
+        token_budget caps the rendered transcript (SHARK_TANK_CONTEXT_TOKENS,
+        3000 by default). Recent Q&A rounds are kept word for word; older ones
+        are condensed to one line each, and the oldest condensed lines are
+        dropped if even those do not fit.
+        """
+        if token_budget is None:
+            token_budget = int(os.getenv('SHARK_TANK_CONTEXT_TOKENS', '3000'))
+        self.token_budget = token_budget
+        self.header_lines = list(header_lines)
+
+        # Full Q&A entries, oldest first: (text, tokens, condensed text)
+        self._recent: Deque[Tuple[str, int, str]] = deque()
+        self._recent_tokens = 0
+        # Condensed one-line entries, oldest first: (text, tokens)
+        self._condensed: Deque[Tuple[str, int]] = deque()
+        self._condensed_tokens = 0
+        self._omitted = 0
+
+        self.total_entries = 0
+        self._rendered: Optional[str] = None
+
+    def set_header(self, header_lines: List[str]):
+        """Replace the pitch header, e.g. after the pitch data changes"""
+        if header_lines != self.header_lines:
+            self.header_lines = list(header_lines)
+            self._rendered = None
+            self._enforce_budget()
+
+    def add_qa(self, shark_name: str, round_number: int, question: str, answer: str):
+        """Append one Q&A exchange, condensing older ones if over budget"""
+        entry = f"\n{shark_name} (Round {round_number}):\nQ: {question}\nA: {answer}"
+        # The condensed form is built now, while the raw texts are at hand
+        condensed = (f"- {shark_name} (Round {round_number}): "
+                     f"Q: {_excerpt(question, CONDENSED_QUESTION_CHARS)} "
+                     f"A: {_excerpt(answer, CONDENSED_ANSWER_CHARS)}")
+        tokens = estimate_tokens(entry) + 1
+        self._recent.append((entry, tokens, condensed))
+        self._recent_tokens += tokens
+
+        self.total_entries += 1
+        self._rendered = None
+        self._enforce_budget()
+
+    def _enforce_budget(self):
+        """Condense the oldest full entries, then drop the oldest condensed ones"""
+        # Header plus the two section titles
+        budget = self.token_budget - estimate_tokens("\n".join(self.header_lines)) - 16
+
+        # The latest exchange is always kept word for word
+        while len(self._recent) > 1 and self._recent_tokens + self._condensed_tokens > budget:
+            _, tokens, condensed = self._recent.popleft()
+            self._recent_tokens -= tokens
+            condensed_tokens = estimate_tokens(condensed) + 1
+            self._condensed.append((condensed, condensed_tokens))
+            self._condensed_tokens += condensed_tokens
+
+        while self._condensed and self._recent_tokens + self._condensed_tokens > budget:
+            _, tokens = self._condensed.popleft()
+            self._condensed_tokens -= tokens
+            self._omitted += 1
+
+    def render(self) -> str:
+        """Rendered transcript; cached until the next change"""
+        if self._rendered is None:
+            parts = list(self.header_lines)
+            if self._condensed or self._omitted:
+                parts.append("\nEarlier Q&A (condensed):")
+                if self._omitted:
+                    parts.append(f"- ({self._omitted} earlier exchanges omitted)")
+                parts.extend(line for line, _ in self._condensed)
+            if self._recent:
+                parts.append("\nQ&A History:")
+                parts.extend(entry for entry, _, _ in self._recent)
+            self._rendered = "\n".join(parts)
+        return self._rendered
+
+    def token_count(self) -> int:
+        """Approximate tokens in the rendered transcript"""
+        return estimate_tokens(self.render())
@@ -1,11 +1,40 @@
 # src/shark_tank/crew.py
 
 import os
-import yaml
+import time
+from typing import Dict, List, Optional
+
 from crewai import Agent, Crew, Process, Task
 from crewai.project import CrewBase, agent, crew, task
+from .answer_sources import AnswerSource, ConsoleAnswerSource
+from .cache import cache_from_env
+from .config_loader import get_config_loader
 from .database import DatabaseManager
+from .env import load_env
+from .panel import PANEL_TASK, panel_personas, parse_panel_verdicts, verdict_mode_from_env
+from .profiling import get_tracer
+from .question_engine import QuestionEngine
+from .registry import get_registry
+from .scheduler import QAScheduler
 from .session_manager import SessionManager
+from .streaming import StreamingConsole
+from .verdicts import VerdictExecutor
+
+# Display name and agents.yaml name of every shark, in speaking order.
+# Their tasks are named '<agent>_qna' and '<agent>_verdict' in tasks.yaml.
+SHARKS = [
+    ("Mark Cuban", "shark_mark_cuban"),
+    ("Lori Greiner", "shark_lori_greiner"),
+    ("Barbara Corcoran", "shark_barbara_corcoran"),
+    ("Robert Herjavec", "shark_robert_herjavec"),
+    ("Kevin O'Leary", "shark_kevin_oleary"),
+    ("Daymond John", "shark_daymond_john"),
+]
+
+# Tasks the simulation cannot run without; a config edit that drops one is rejected
+REQUIRED_TASKS = ['pitch_task', 'moderator_summary'] + [
+    f"{agent_name}_{kind}" for _, agent_name in SHARKS for kind in ('qna', 'verdict')
+]
 
 @CrewBase
 class SharkTank:
@@ -16,118 +45,155 @@ class SharkTank:
 
     def __init__(self):
         """Initialize SharkTank with database and session management"""
-        # Initialize database manager
-        self.db_manager = DatabaseManager()
+        load_env()
+        
+        # Initialize database manager; with DB_ASYNC the writes run on an
+        # async engine in the background
+        if os.getenv('DB_ASYNC', 'false').strip().lower() in ('1', 'true', 'yes', 'on'):
+            from .async_database import AsyncDatabaseBridge
+            self.db_manager = AsyncDatabaseBridge()
+        else:
+            self.db_manager = DatabaseManager()
         
         # Initialize session manager
         self.session_manager = SessionManager()
         
+        # Initialize question engine (prefetches shark questions)
+        self.question_engine = QuestionEngine()
+        
+        # Initialize verdict executor (runs verdicts in parallel)
+        self.verdict_executor = VerdictExecutor()
+        # 'panel' asks for every shark's verdict in one call
+        self.verdict_mode = verdict_mode_from_env()
+        
         # Load configurations
         self._load_configs()
+        
+        # Cache agent responses so replayed pitches skip the LLM (one cache per process)
+        if self.registry.cache is None:
+            self.registry.set_cache(cache_from_env())
+        
+        # Initialize streaming console (prints tokens as they are generated)
+        self.console = StreamingConsole()
+        if self.console.enabled:
+            self.registry.set_streaming(True)
+
+    def close(self):
+        """Stop the question threads, streaming and the database once no more rounds will run"""
+        self.question_engine.shutdown()
+        self.console.close()
+        self.db_manager.close()
+
+    def __enter__(self) -> "SharkTank":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
 
     def _load_configs(self):
-        """Load configuration files safely with UTF-8"""
-        config_dir = os.path.join(os.path.dirname(__file__), 'config')
-        
-        # Load agents config
-        agents_path = os.path.join(config_dir, 'agents.yaml')
-        with open(agents_path, 'r', encoding='utf-8') as f:
-            self.agents_config = yaml.safe_load(f)
+        """Load the validated config snapshot (parsed only when the YAML changed)"""
+        self.config = get_config_loader(REQUIRED_TASKS).load()
+        self.agents_config = self.config.agents
+        self.tasks_config = self.config.tasks
         
-        # Load tasks config
-        tasks_path = os.path.join(config_dir, 'tasks.yaml')
-        with open(tasks_path, 'r', encoding='utf-8') as f:
-            self.tasks_config = yaml.safe_load(f)
+        # Agents and tasks are built once per process and shared by every SharkTank;
+        # after an edit only the agents and tasks that changed are rebuilt
+        self.registry = get_registry(self.agents_config, self.tasks_config)
+        self.registry.apply_snapshot(self.config)
 
     # --- Agents ---
     @agent
     def entrepreneur_user(self) -> Agent:
-        return Agent(config=self.agents_config['entrepreneur_user'], verbose=True)
+        return self.registry.agent('entrepreneur_user')
 
     @agent
     def shark_mark_cuban(self) -> Agent:
-        return Agent(config=self.agents_config['shark_mark_cuban'], verbose=True)
+        return self.registry.agent('shark_mark_cuban')
 
     @agent
     def shark_lori_greiner(self) -> Agent:
-        return Agent(config=self.agents_config['shark_lori_greiner'], verbose=True)
+        return self.registry.agent('shark_lori_greiner')
 
     @agent
     def shark_barbara_corcoran(self) -> Agent:
-        return Agent(config=self.agents_config['shark_barbara_corcoran'], verbose=True)
+        return self.registry.agent('shark_barbara_corcoran')
 
     @agent
     def shark_robert_herjavec(self) -> Agent:
-        return Agent(config=self.agents_config['shark_robert_herjavec'], verbose=True)
+        return self.registry.agent('shark_robert_herjavec')
 
     @agent
     def shark_kevin_oleary(self) -> Agent:
-        return Agent(config=self.agents_config['shark_kevin_oleary'], verbose=True)
+        return self.registry.agent('shark_kevin_oleary')
 
     @agent
     def shark_daymond_john(self) -> Agent:
-        return Agent(config=self.agents_config['shark_daymond_john'], verbose=True)
+        return self.registry.agent('shark_daymond_john')
 
     @agent
     def moderator(self) -> Agent:
-        return Agent(config=self.agents_config['moderator'], verbose=True)
+        return self.registry.agent('moderator')
+
+    @agent
+    def shark_panel(self) -> Agent:
+        return self.registry.agent('shark_panel')
 
     # --- Tasks ---
     @task
     def pitch_task(self) -> Task:
-        return Task(config=self.tasks_config['pitch_task'])
+        return self.registry.task('pitch_task')
 
     @task
     def shark_mark_cuban_question(self) -> Task:
-        return Task(config=self.tasks_config['shark_mark_cuban_qna'])
+        return self.registry.task('shark_mark_cuban_qna')
 
     @task
     def shark_lori_greiner_question(self) -> Task:
-        return Task(config=self.tasks_config['shark_lori_greiner_qna'])
+        return self.registry.task('shark_lori_greiner_qna')
 
     @task
     def shark_barbara_corcoran_question(self) -> Task:
-        return Task(config=self.tasks_config['shark_barbara_corcoran_qna'])
+        return self.registry.task('shark_barbara_corcoran_qna')
 
     @task
     def shark_robert_herjavec_question(self) -> Task:
-        return Task(config=self.tasks_config['shark_robert_herjavec_qna'])
+        return self.registry.task('shark_robert_herjavec_qna')
 
     @task
     def shark_kevin_oleary_question(self) -> Task:
-        return Task(config=self.tasks_config['shark_kevin_oleary_qna'])
+        return self.registry.task('shark_kevin_oleary_qna')
 
     @task
     def shark_daymond_john_question(self) -> Task:
-        return Task(config=self.tasks_config['shark_daymond_john_qna'])
+        return self.registry.task('shark_daymond_john_qna')
 
     @task
     def shark_mark_cuban_verdict(self) -> Task:
-        return Task(config=self.tasks_config['shark_mark_cuban_verdict'])
+        return self.registry.task('shark_mark_cuban_verdict')
 
     @task
     def shark_lori_greiner_verdict(self) -> Task:
-        return Task(config=self.tasks_config['shark_lori_greiner_verdict'])
+        return self.registry.task('shark_lori_greiner_verdict')
 
     @task
     def shark_barbara_corcoran_verdict(self) -> Task:
-        return Task(config=self.tasks_config['shark_barbara_corcoran_verdict'])
+        return self.registry.task('shark_barbara_corcoran_verdict')
 
     @task
     def shark_robert_herjavec_verdict(self) -> Task:
-        return Task(config=self.tasks_config['shark_robert_herjavec_verdict'])
+        return self.registry.task('shark_robert_herjavec_verdict')
 
     @task
     def shark_kevin_oleary_verdict(self) -> Task:
-        return Task(config=self.tasks_config['shark_kevin_oleary_verdict'])
+        return self.registry.task('shark_kevin_oleary_verdict')
 
     @task
     def shark_daymond_john_verdict(self) -> Task:
-        return Task(config=self.tasks_config['shark_daymond_john_verdict'])
+        return self.registry.task('shark_daymond_john_verdict')
 
     @task
     def moderator_summary(self) -> Task:
-        return Task(config=self.tasks_config['moderator_summary'])
+        return self.registry.task('moderator_summary')
 
     def show_session_help(self):
         """Show help for session management commands"""
@@ -175,7 +241,7 @@ class SharkTank:
             return current_session_id, False
         
         elif command == 'stats':
-            stats = self.session_manager.get_session_stats()
+            stats = self.session_manager.get_session_stats(include_sessions=False)
             print(f"\n📈 Session Statistics:")
             print(f"  Total active sessions: {stats['total_active_sessions']}")
             print(f"  Total Q&A rounds: {stats['total_qa_rounds']}")
@@ -189,8 +255,94 @@ class SharkTank:
         else:
             return current_session_id, False
 
+    # --- Steps shared by the terminal loop and the HTTP service ---
+    def run_pitch(self, inputs: Dict, session_id: str) -> str:
+        """Have the pitch agent present the founder's pitch"""
+        with get_tracer().span('pitch', session_id=session_id):
+            return self.registry.execute('pitch_task', inputs, session_id=session_id)
+
+    def ask_question(self, shark_name: str, pitch_result, question_round: int, session_id: str) -> str:
+        """Generate one shark's question for a round"""
+        agent_name = dict(SHARKS)[shark_name]
+        with get_tracer().span('question', shark=shark_name, round=question_round, session_id=session_id):
+            return self.registry.execute(
+                f"{agent_name}_qna",
+                {"pitch": pitch_result, "round": question_round},
+                session_id=session_id
+            )
+
+    def verdict_inputs(self, inputs: Dict, conversation_summary: Dict, session_id: str) -> Dict:
+        """Inputs every shark's verdict task reads
+
+        The summary already holds the pitch and every answer, so they are not
+        passed again. It comes first and the inputs are the same for every
+        shark, so the six verdict prompts share the transcript as a prefix.
+        """
+        return {
+            'conversation_summary': conversation_summary['conversation_summary'],
+            'total_qa_rounds': conversation_summary['total_qa_rounds'],
+            'amount_invested': inputs['amount_invested'],
+            'percentage_equity': inputs['percentage_equity'],
+            'session_id': session_id
+        }
+
+    def give_verdict(self, shark_name: str, verdict_inputs: Dict, session_id: str) -> str:
+        """Get one shark's verdict on the conversation"""
+        agent_name = dict(SHARKS)[shark_name]
+        with get_tracer().span('verdict', shark=shark_name, session_id=session_id):
+            return self.registry.execute(f"{agent_name}_verdict", verdict_inputs, session_id=session_id)
+
+    def uses_panel(self, shark_names: List[str]) -> bool:
+        """Whether these sharks' verdicts are asked of the panel first"""
+        return self.verdict_mode == 'panel' and len(shark_names) > 1 and PANEL_TASK in self.registry.tasks_config
+
+    def panel_verdicts(self, shark_names: List[str], verdict_inputs: Dict, session_id: str) -> Dict[str, str]:
+        """Verdicts of several sharks from one panel call
+
+        Sharks whose verdict is missing or invalid in the response are left
+        out, so they can be asked on their own; if the call fails, all are.
+        """
+        sharks = {shark_name: dict(SHARKS)[shark_name] for shark_name in shark_names}
+        inputs = {
+            **verdict_inputs,
+            'sharks': panel_personas(self.registry.agents_config, list(sharks.values()))
+        }
+        try:
+            with get_tracer().span('panel_verdict', sharks=len(sharks), session_id=session_id):
+                output = self.registry.execute(PANEL_TASK, inputs, session_id=session_id)
+        except Exception as e:
+            print(f"⚠️ Warning: Panel verdict failed, asking each shark instead: {e}")
+            return {}
+        return parse_panel_verdicts(output, sharks)
+
+    def run_recap(self, inputs: Dict, offers: Dict, conversation_summary: Dict, session_id: str) -> str:
+        """Have the moderator sum up the offers; records them in inputs"""
+        inputs["offers"] = offers
+        inputs["session_id"] = session_id
+        recap_inputs = {**self.verdict_inputs(inputs, conversation_summary, session_id), 'offers': offers}
+        with get_tracer().span('recap', session_id=session_id):
+            return self.registry.execute('moderator_summary', recap_inputs, session_id=session_id)
+
     # --- Interactive Q&A runner with database storage ---
-    def interactive_round(self, inputs):
+    def interactive_round(self, inputs, answer_source: Optional[AnswerSource] = None) -> Dict:
+        """Run pitch, Q&A, verdicts and recap; returns the outcome with per-phase timings
+
+        Founder answers come from answer_source (the terminal by default).
+        """
+        if answer_source is None:
+            answer_source = ConsoleAnswerSource()
+
+        # Seconds spent per phase; 'answer' is the founder's think time
+        timings: Dict[str, List[float]] = {}
+        session_started = time.perf_counter()
+
+        def record(phase: str, started: float):
+            timings.setdefault(phase, []).append(time.perf_counter() - started)
+
+        # Spans for --profile; no-ops unless profiling is enabled
+        tracer = get_tracer()
+        session_span = tracer.start_span('session')
+
         print("\n🚀 Starting Interactive Shark Tank Round...")
 
         # Handle session management based on user input
@@ -217,6 +369,7 @@ class SharkTank:
         session_info = self.session_manager.get_session(session_id)
         if session_info:
             print(f"📝 Session #{session_info['session_number']} - {session_id}")
+        session_span.set(session_id=session_id)
 
         # Store pitch in database
         try:
@@ -232,36 +385,56 @@ class SharkTank:
             print("Continuing with in-memory session only...")
 
         # Step 1: Pitch
-        pitch_result = self.entrepreneur_user().execute_task(
-            self.pitch_task(),
-            inputs
-        )
+        phase_started = time.perf_counter()
+        pitch_result = self.run_pitch(inputs, session_id)
+        record('pitch', phase_started)
         print(f"\n🎤 Pitch Result: {pitch_result}")
 
         # Show session management help
         self.show_session_help()
 
         # Step 2: Sharks ask & founder answers
-        qa_rounds = [
-            ("Mark Cuban", self.shark_mark_cuban_question, self.shark_mark_cuban),
-            ("Lori Greiner", self.shark_lori_greiner_question, self.shark_lori_greiner),
-            ("Barbara Corcoran", self.shark_barbara_corcoran_question, self.shark_barbara_corcoran),
-            ("Robert Herjavec", self.shark_robert_herjavec_question, self.shark_robert_herjavec),
-            ("Kevin O'Leary", self.shark_kevin_oleary_question, self.shark_kevin_oleary),
-            ("Daymond John", self.shark_daymond_john_question, self.shark_daymond_john),
-        ]
-
         answered_sharks = set()
         current_round = 1
 
+        shark_agents = dict(SHARKS)
+        # Sharks who drop out or reach their round cap stop being asked
+        scheduler = QAScheduler([shark_name for shark_name, _ in SHARKS])
+
         while True:
-            for shark_name, task_fn, agent_fn in qa_rounds:
-                question_text = agent_fn().execute_task(
-                    task_fn(),
-                    {"pitch": pitch_result}
+            round_sharks = scheduler.round_sharks()
+            if not round_sharks:
+                print("\n⏭️ Every shark is out or has asked all their questions. Moving to verdicts...")
+                break
+
+            # Questions only depend on the pitch and the round, so the question
+            # engine can generate them ahead of the founder
+            question_jobs = [
+                (
+                    shark_name,
+                    lambda shark_name=shark_name, question_round=current_round,
+                           question_session=session_id: self.ask_question(
+                        shark_name, pitch_result, question_round, question_session
+                    )
                 )
-                print(f"\n🦈 {shark_name} Shark asks: {question_text}")
-                human_answer = input("💬 Your answer (type 'help' for commands): ")
+                for shark_name in round_sharks
+            ]
+            round_questions = self.question_engine.iter_pending(question_jobs)
+            for shark_name, get_question in round_questions:
+                with self.console.show(
+                    f"{shark_agents[shark_name]}_qna", f"\n🦈 {shark_name} Shark asks: ", 'question'
+                ) as shown:
+                    phase_started = time.perf_counter()
+                    question_text = get_question()
+                    record('question', phase_started)
+                    shown.finish(question_text)
+                if not scheduler.observe_question(shark_name, question_text, current_round):
+                    print(f"\n🚪 {shark_name} is out and won't ask again.")
+                    continue
+                phase_started = time.perf_counter()
+                with tracer.span('answer', shark=shark_name, round=current_round, session_id=session_id):
+                    human_answer = answer_source.ask("💬 Your answer (type 'help' for commands): ")
+                record('answer', phase_started)
 
                 # Check for session management commands
                 if human_answer.strip().lower() in ['refresh', 'reset', 'sessions', 'stats', 'help']:
@@ -270,8 +443,10 @@ class SharkTank:
                     )
                     if should_continue:
                         # Update session_id and continue with new session
+                        self.registry.prompts.pop(session_id)
                         session_id = new_session_id
                         answered_sharks.clear()
+                        scheduler.reset()
                         current_round = 1
                         print(f"\n🔄 Continuing with new session: {session_id}")
                         continue
@@ -281,26 +456,26 @@ class SharkTank:
 
                 if human_answer.strip().lower() == "exit":
                     print("\n⏭️ Exiting Q&A early. Moving directly to verdicts...")
+                    round_questions.close()
                     break
 
                 # Store Q&A in session manager
                 self.session_manager.add_qa_round(session_id, shark_name, question_text, human_answer)
                 
-                # Store Q&A in database
+                # Queue Q&A for the database (written in batches in the background)
                 try:
                     if 'pitch_session' in locals():
-                        self.db_manager.add_qa_entry(
+                        self.db_manager.queue_qa_entry(
                             pitch_session_id=pitch_session.id,
                             shark_name=shark_name,
                             question=question_text,
                             answer=human_answer,
                             round_number=current_round
                         )
-                        print(f"💾 Q&A stored in database for {shark_name}")
+                        print(f"💾 Q&A queued for database for {shark_name}")
                 except Exception as e:
                     print(f"⚠️ Warning: Failed to store Q&A in database: {e}")
 
-                inputs[f"{shark_name.lower().replace(' ', '_')}_answer"] = human_answer
                 answered_sharks.add(shark_name)
 
             else:
@@ -308,50 +483,132 @@ class SharkTank:
                 continue
             break
 
+        # Make sure every answer of the round has reached the database
+        try:
+            self.db_manager.flush()
+        except Exception as e:
+            print(f"⚠️ Warning: Failed to store Q&A in database: {e}")
+
+        latency = self.question_engine.latency_stats()
+        if latency['count']:
+            print(f"\n⏱️ Time-to-next-question: avg {latency['avg']:.2f}s, "
+                  f"max {latency['max']:.2f}s over {latency['count']} questions")
+        schedule = scheduler.stats()
+        if schedule['questions_skipped'] or schedule['verdicts_skipped']:
+            print(f"🦈 {schedule['sharks_out']} sharks out; skipped {schedule['questions_skipped']} questions "
+                  f"and {schedule['verdicts_skipped']} verdict calls")
+
         # Step 3: Verdicts
         offers = {}
-        verdict_tasks = [
-            ("Mark Cuban", self.shark_mark_cuban_verdict, self.shark_mark_cuban),
-            ("Lori Greiner", self.shark_lori_greiner_verdict, self.shark_lori_greiner),
-            ("Barbara Corcoran", self.shark_barbara_corcoran_verdict, self.shark_barbara_corcoran),
-            ("Robert Herjavec", self.shark_robert_herjavec_verdict, self.shark_robert_herjavec),
-            ("Kevin O'Leary", self.shark_kevin_oleary_verdict, self.shark_kevin_oleary),
-            ("Daymond John", self.shark_daymond_john_verdict, self.shark_daymond_john),
+        conversation_summary = self.session_manager.get_session_summary(session_id)
+        verdict_inputs = self.verdict_inputs(inputs, conversation_summary, session_id)
+
+        engaged = [
+            shark_name for shark_name, _ in SHARKS
+            if shark_name in answered_sharks and not scheduler.is_out(shark_name)
+        ]
+        phase_started = time.perf_counter()
+
+        # In panel mode one call gives every engaged shark's verdict; a shark
+        # whose verdict does not come back valid gets its own call below
+        panel = {}
+        panel_called = self.uses_panel(engaged)
+        if panel_called:
+            panel = self.panel_verdicts(engaged, verdict_inputs, session_id)
+            print(f"\n🧑‍⚖️ Panel verdict: {len(panel)} of {len(engaged)} sharks in one call"
+                  + (f", {len(engaged) - len(panel)} asked on their own" if len(panel) < len(engaged) else ""))
+
+        # Every verdict only reads the same summary, so they can run in parallel
+        verdict_jobs = [
+            (
+                shark_name,
+                lambda shark_name=shark_name: self.give_verdict(shark_name, verdict_inputs, session_id)
+            )
+            for shark_name in engaged
+            if shark_name not in panel
         ]
+        verdicts = self.verdict_executor.start(verdict_jobs)
 
-        conversation_summary = self.session_manager.get_session_summary(session_id)
-        
-        for shark_name, task_fn, agent_fn in verdict_tasks:
-            if shark_name not in answered_sharks:
+        for shark_name, agent_name in SHARKS:
+            if scheduler.is_out(shark_name):
+                offers[shark_name] = scheduler.out_verdict(shark_name)
+                print(f"\n🦈 {shark_name} Shark Verdict: {offers[shark_name]}")
+            elif shark_name not in answered_sharks:
                 offers[shark_name] = "No"
                 print(f"\n🦈 {shark_name} Shark Verdict: No (skipped Q&A)")
+            elif shark_name in panel:
+                offers[shark_name] = panel[shark_name]
+                print(f"\n🦈 {shark_name} Shark Verdict: {offers[shark_name]}")
             else:
-                verdict_inputs = {
-                    **inputs,
-                    'conversation_summary': conversation_summary['conversation_summary'],
-                    'total_qa_rounds': conversation_summary['total_qa_rounds'],
-                    'session_id': session_id
-                }
-                
-                verdict = agent_fn().execute_task(task_fn(), verdict_inputs)
-                offers[shark_name] = verdict
-                print(f"\n🦈 {shark_name} Shark Verdict: {verdict}")
+                with self.console.show(
+                    f"{agent_name}_verdict", f"\n🦈 {shark_name} Shark Verdict: ", 'verdict'
+                ) as shown:
+                    offers[shark_name] = verdicts.result(shark_name)
+                    shown.finish(offers[shark_name])
+        verdicts.close()
+        record('verdicts', phase_started)
 
         # Step 4: Moderator Summary
-        inputs["offers"] = offers
-        inputs["conversation_summary"] = conversation_summary['conversation_summary']
-        inputs["session_id"] = session_id
-        
-        verdict_output = self.moderator().execute_task(
-            self.moderator_summary(),
-            inputs
-        )
-        print("\n📢 Final Recap:")
-        print(verdict_output)
+        with self.console.show('moderator_summary', "\n📢 Final Recap:\n", 'recap') as shown:
+            phase_started = time.perf_counter()
+            verdict_output = self.run_recap(inputs, offers, conversation_summary, session_id)
+            record('recap', phase_started)
+            shown.finish(verdict_output)
 
-        # Cleanup
+        # Store the verdicts as structured offers, with the recap
+        try:
+            if 'pitch_session' in locals():
+                stored = self.db_manager.record_outcome(pitch_session.id, offers, str(verdict_output))
+                print(f"💾 {sum(row['invest'] for row in stored)} offers stored in database")
+        except Exception as e:
+            print(f"⚠️ Warning: Failed to store offers in database: {e}")
+
+        if self.registry.cache is not None:
+            cache_stats = self.registry.cache.stats()
+            print(f"\n🗄️ Response cache: {cache_stats['memory_hits'] + cache_stats['disk_hits']} hits "
+                  f"({cache_stats['memory_hits']} memory, {cache_stats['disk_hits']} disk), "
+                  f"{cache_stats['misses']} misses")
+
+        prompts = self.registry.prompts.pop(session_id)
+        print(f"\n📏 Prompts: {prompts['calls']} calls, {prompts['prompt_tokens']:,} tokens; "
+              f"{prompts['prefix_tokens']:,} repeat an earlier prompt's prefix, "
+              f"{prompts['cached_tokens']:,} of them long enough for the provider's prompt cache")
+
+        if self.console.enabled:
+            print("\n⏱️ Time-to-first-token:")
+            for phase, stats in self.console.latency_stats().items():
+                print(f"  {phase}: avg {stats['avg_ttft']:.2f}s, max {stats['max_ttft']:.2f}s "
+                      f"(complete after avg {stats['avg_total']:.2f}s, {stats['count']} outputs)")
+
+        # Cleanup; the question threads and database stay up for the next round until close()
         self.session_manager.cleanup_session(session_id)
-        self.db_manager.close()
+        record('session', session_started)
+        session_span.end()
+
+        return {
+            'session_id': session_id,
+            'pitch': str(pitch_result),
+            'qa_rounds': [
+                {
+                    'shark_name': qa['shark_name'],
+                    'question': str(qa['question']),
+                    'answer': qa['answer'],
+                    'round_number': qa['round_number']
+                }
+                for qa in conversation_summary['qa_rounds']
+            ],
+            'offers': {shark_name: str(offer) for shark_name, offer in offers.items()},
+            'recap': str(verdict_output),
+            'scheduler': schedule,
+            'verdicts': {
+                'mode': self.verdict_mode,
+                'llm_calls': len(verdict_jobs) + int(panel_called),
+                'panel_sharks': len(panel),
+                'fallbacks': len(verdict_jobs) if panel_called else 0
+            },
+            'prompts': prompts,
+            'timings': timings
+        }
 
     # --- Crew definition for normal auto mode ---
     @crew
@@ -363,3 +620,12 @@ class SharkTank:
             process=Process.sequential,
             verbose=True
         )
+
+
+def _load_yaml(config_path):
+    """CrewBase's YAML loader, served from the config snapshot instead of re-parsing"""
+    return get_config_loader(REQUIRED_TASKS).load_yaml(config_path)
+
+
+# CrewBase loads agents.yaml and tasks.yaml again on every construction
+SharkTank.load_yaml = staticmethod(_load_yaml)
@@ -4,25 +4,43 @@ Database module for Shark Tank application
 Handles PostgreSQL connection and data models for storing pitch and Q&A data
 """
 
+import atexit
 import os
-from datetime import datetime
-from pickle import TRUE
-from typing import Dict, List, Optional
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, ForeignKey, JSON
+import sys
+import threading
+from collections import Counter, OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import (create_engine, BigInteger, Boolean, Column, Date, Float, Integer, String, Text, DateTime,
+                        ForeignKey, Index, JSON, delete, func, insert, inspect, select, text, true, tuple_, update)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection, Engine, make_url
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, relationship
+from sqlalchemy.orm import sessionmaker, relationship, selectinload
 from sqlalchemy.exc import SQLAlchemyError
 import json
 
-# Try to load .env file if python-dotenv is available
-try:
-    from dotenv import load_dotenv
-    load_dotenv(override=TRUE)
-except ImportError:
-    pass
+from .context_builder import ConversationContext
+from .env import load_env
+from .offers import parse_offer
+from .profiling import get_tracer
 
 Base = declarative_base()
 
+# Bump whenever the models change; stored in the schema_version table so a
+# matching database can skip the DDL checks on startup
+SCHEMA_VERSION = 4
+# Advisory lock key serializing schema checks across processes on PostgreSQL
+SCHEMA_LOCK_KEY = 0x5348524B
+
+class SchemaVersion(Base):
+    """Model for storing the schema version the database was created with"""
+    __tablename__ = 'schema_version'
+    
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
 class PitchSession(Base):
     """Model for storing pitch sessions"""
     __tablename__ = 'pitch_sessions'
@@ -32,11 +50,26 @@ class PitchSession(Base):
     pitch_text = Column(Text, nullable=False)
     amount_invested = Column(Integer, nullable=False)
     percentage_equity = Column(Integer, nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Moderator's closing recap, stored once the verdicts are in
+    recap = Column(Text, nullable=True)
     
-    # Relationship to Q&A entries
-    qa_entries = relationship("QAEntry", back_populates="pitch_session", cascade="all, delete-orphan")
+    # Relationship to Q&A entries, in conversation order
+    qa_entries = relationship(
+        "QAEntry",
+        back_populates="pitch_session",
+        cascade="all, delete-orphan",
+        order_by="(QAEntry.round_number, QAEntry.created_at, QAEntry.id)"
+    )
+    
+    # Relationship to the sharks' offers, in shark order
+    offers = relationship(
+        "Offer",
+        back_populates="pitch_session",
+        cascade="all, delete-orphan",
+        order_by="Offer.id"
+    )
     
     def to_dict(self) -> Dict:
         """Convert pitch session to dictionary"""
@@ -47,12 +80,17 @@ class PitchSession(Base):
             'amount_invested': self.amount_invested,
             'percentage_equity': self.percentage_equity,
             'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'recap': self.recap
         }
 
 class QAEntry(Base):
     """Model for storing Q&A entries"""
     __tablename__ = 'qa_entries'
+    __table_args__ = (
+        # Serves the per-session history query and its conversation ordering
+        Index('ix_qa_entries_session_round_created', 'pitch_session_id', 'round_number', 'created_at'),
+    )
     
     id = Column(Integer, primary_key=True)
     pitch_session_id = Column(Integer, ForeignKey('pitch_sessions.id'), nullable=False)
@@ -77,31 +115,351 @@ class QAEntry(Base):
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
 
+class Offer(Base):
+    """Model for storing a shark's verdict, parsed into offer terms"""
+    __tablename__ = 'offers'
+    __table_args__ = (
+        # Deal rate per shark, and valuations per shark in order (median, percentiles)
+        Index('ix_offers_shark_invest_valuation', 'shark_name', 'invest', 'valuation'),
+        # Valuations of every deal in order
+        Index('ix_offers_invest_valuation', 'invest', 'valuation'),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    pitch_session_id = Column(Integer, ForeignKey('pitch_sessions.id'), nullable=False, index=True)
+    shark_name = Column(String(100), nullable=False)
+    invest = Column(Boolean, nullable=False)
+    amount = Column(Integer, nullable=True)
+    equity = Column(Float, nullable=True)
+    royalty = Column(Float, nullable=True)
+    terms = Column(Text, nullable=True)
+    valuation = Column(BigInteger, nullable=True)
+    # The verdict as the shark gave it
+    raw_text = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    # Relationship to pitch session
+    pitch_session = relationship("PitchSession", back_populates="offers")
+    
+    def to_dict(self) -> Dict:
+        """Convert offer to dictionary"""
+        return {
+            'id': self.id,
+            'pitch_session_id': self.pitch_session_id,
+            'shark_name': self.shark_name,
+            'invest': self.invest,
+            'amount': self.amount,
+            'equity': self.equity,
+            'royalty': self.royalty,
+            'terms': self.terms,
+            'valuation': self.valuation,
+            'raw_text': self.raw_text,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
+class DailyStats(Base):
+    """Rollup of the pitch sessions created each day (UTC), kept up to date on every write"""
+    __tablename__ = 'daily_stats'
+    
+    day = Column(Date, primary_key=True)
+    sessions = Column(Integer, nullable=False, default=0)
+    # Sums of the founders' asks; divided by sessions for the averages
+    ask_amount_total = Column(BigInteger, nullable=False, default=0)
+    ask_equity_total = Column(BigInteger, nullable=False, default=0)
+
+class SharkDailyStats(Base):
+    """Rollup of the questions each shark asked each day (UTC), kept up to date on every write"""
+    __tablename__ = 'shark_daily_stats'
+    
+    day = Column(Date, primary_key=True)
+    shark_name = Column(String(100), primary_key=True)
+    questions = Column(Integer, nullable=False, default=0)
+
+# Conversation summaries kept per DatabaseManager
+SUMMARY_CACHE_SIZE = 128
+
+# Q&A history order: round, then time, with the id breaking ties between
+# entries written in the same batch
+QA_ORDER = (QAEntry.round_number, QAEntry.created_at, QAEntry.id)
+
+# Position in a Q&A history page: (round_number, created_at, id) of the last entry
+QACursor = Tuple[int, datetime, int]
+
+# One engine (and connection pool) per connection string, shared by every
+# DatabaseManager in the process
+_engines: Dict[str, Engine] = {}
+_engine_users: Dict[str, int] = {}
+_schema_checked = set()
+_engines_lock = threading.Lock()
+
+def _env_bool(name: str, default: bool) -> bool:
+    """Read a boolean flag from the environment"""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+def default_connection_string() -> str:
+    """Build the connection string from environment variables"""
+    load_env()
+    # Check for custom connection string first
+    custom_connection = os.getenv('DB_CONNECTION_STRING')
+    if custom_connection:
+        return custom_connection
+    
+    # Build connection string from individual environment variables
+    host = os.getenv('DB_HOST', 'localhost')
+    port = os.getenv('DB_PORT', '5432')
+    database = os.getenv('DB_NAME', 'shark_tank')
+    username = os.getenv('DB_USERNAME', 'postgres')
+    password = os.getenv('DB_PASSWORD', 'password')
+    
+    return f"postgresql://{username}:{password}@{host}:{port}/{database}"
+
+def _create_engine(connection_string: str) -> Engine:
+    """Create an engine with pool settings taken from the environment"""
+    load_env()
+    options = {
+        'pool_pre_ping': _env_bool('DB_POOL_PRE_PING', True),
+        'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', '1800')),
+    }
+    # SQLite picks its own pool class, which does not take size settings
+    if make_url(connection_string).get_backend_name() != 'sqlite':
+        options['pool_size'] = int(os.getenv('DB_POOL_SIZE', '5'))
+        options['max_overflow'] = int(os.getenv('DB_MAX_OVERFLOW', '10'))
+    return create_engine(connection_string, **options)
+
+def _add_missing_columns(conn: Connection):
+    """Add model columns an older database lacks; every column added since version 1 is nullable"""
+    inspector = inspect(conn)
+    quote = conn.dialect.identifier_preparer.quote
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing:
+                column_type = column.type.compile(dialect=conn.dialect)
+                conn.execute(text(f"ALTER TABLE {quote(table.name)} ADD COLUMN {quote(column.name)} {column_type}"))
+
+def _rollup_insert(dialect_name: str, table, rows: List[Dict[str, Any]], keys: Tuple[str, ...]):
+    """INSERT .. ON CONFLICT statement adding the rows' counters to a rollup table
+
+    Both PostgreSQL and SQLite apply the increment atomically, so concurrent
+    writers never lose a count.
+    """
+    dialect = postgresql if dialect_name == 'postgresql' else sqlite
+    statement = dialect.insert(table).values(rows)
+    return statement.on_conflict_do_update(
+        index_elements=list(keys),
+        set_={name: table.c[name] + statement.excluded[name] for name in rows[0] if name not in keys}
+    )
+
+def session_rollup(dialect_name: str, sessions: List[Dict[str, Any]]):
+    """Rollup statement counting new pitch sessions (with created_at, amount_invested and
+    percentage_equity) per day; run it in the sessions' transaction"""
+    days: Dict[Any, Dict[str, Any]] = {}
+    for row in sessions:
+        day = row['created_at'].date()
+        totals = days.setdefault(day, {'day': day, 'sessions': 0, 'ask_amount_total': 0, 'ask_equity_total': 0})
+        totals['sessions'] += 1
+        totals['ask_amount_total'] += row['amount_invested']
+        totals['ask_equity_total'] += row['percentage_equity']
+    return _rollup_insert(dialect_name, DailyStats.__table__, list(days.values()), ('day',))
+
+def qa_rollup(dialect_name: str, qa_rows: List[Dict[str, Any]]):
+    """Rollup statement counting new Q&A rows (with created_at and shark_name) per shark and day"""
+    counts = Counter((row['created_at'].date(), row['shark_name']) for row in qa_rows)
+    return _rollup_insert(dialect_name, SharkDailyStats.__table__, [
+        {'day': day, 'shark_name': shark_name, 'questions': questions}
+        for (day, shark_name), questions in counts.items()
+    ], ('day', 'shark_name'))
+
+def rebuild_rollups(conn: Connection):
+    """Recompute the rollup tables from every stored pitch session and Q&A entry"""
+    conn.execute(delete(DailyStats.__table__))
+    conn.execute(delete(SharkDailyStats.__table__))
+    day = func.date(PitchSession.created_at)
+    conn.execute(insert(DailyStats.__table__).from_select(
+        ['day', 'sessions', 'ask_amount_total', 'ask_equity_total'],
+        select(day, func.count(), func.coalesce(func.sum(PitchSession.amount_invested), 0),
+               func.coalesce(func.sum(PitchSession.percentage_equity), 0))
+        .where(PitchSession.created_at.isnot(None))
+        .group_by(day)
+    ))
+    day = func.date(QAEntry.created_at)
+    conn.execute(insert(SharkDailyStats.__table__).from_select(
+        ['day', 'shark_name', 'questions'],
+        select(day, QAEntry.shark_name, func.count())
+        .where(QAEntry.created_at.isnot(None))
+        .group_by(day, QAEntry.shark_name)
+    ))
+
+def _lock_schema(conn: Connection):
+    """Hold off other processes checking the schema until this transaction ends
+
+    PostgreSQL takes a transaction-scoped advisory lock. SQLite starts the
+    transaction with BEGIN IMMEDIATE, which takes the database's write lock
+    up front and makes the DDL that follows part of the transaction.
+    """
+    if conn.dialect.name == 'postgresql':
+        conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {'key': SCHEMA_LOCK_KEY})
+    elif conn.dialect.name == 'sqlite':
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+def ensure_schema_on(conn: Connection):
+    """Create or upgrade tables on a connection unless the stored schema version matches
+
+    Must be the first statement of its transaction: it locks out other
+    processes first, so the version is read and bumped by one of them at a time.
+    """
+    _lock_schema(conn)
+    version = None
+    inspector = inspect(conn)
+    if inspector.has_table(SchemaVersion.__tablename__):
+        version = conn.execute(select(SchemaVersion.version)).scalar()
+    if version == SCHEMA_VERSION:
+        return
+    # Databases created before schema_version existed have tables but no version row
+    existing = inspector.has_table(PitchSession.__tablename__)
+    # Sessions stored before the rollups existed are counted into them once
+    backfill = existing and not inspector.has_table(DailyStats.__tablename__)
+    
+    Base.metadata.create_all(bind=conn)
+    # create_all skips existing tables, so columns and indexes added since are created here
+    if existing:
+        _add_missing_columns(conn)
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=conn, checkfirst=True)
+    if backfill:
+        rebuild_rollups(conn)
+    
+    values = {'version': SCHEMA_VERSION, 'updated_at': datetime.utcnow()}
+    if version is None:
+        conn.execute(insert(SchemaVersion.__table__).values(**values))
+    else:
+        conn.execute(update(SchemaVersion.__table__).values(**values))
+
+def _ensure_schema(engine: Engine):
+    """Create or upgrade tables unless the stored schema version already matches"""
+    with engine.begin() as conn:
+        ensure_schema_on(conn)
+
+def acquire_engine(connection_string: str) -> Engine:
+    """Get the shared engine for a connection string and register a user of it"""
+    with _engines_lock:
+        engine = _engines.get(connection_string)
+        if engine is None:
+            engine = _create_engine(connection_string)
+            _engines[connection_string] = engine
+            _engine_users[connection_string] = 0
+        _engine_users[connection_string] += 1
+        
+        if connection_string not in _schema_checked:
+            try:
+                _ensure_schema(engine)
+            except Exception:
+                _engine_users[connection_string] -= 1
+                raise
+            _schema_checked.add(connection_string)
+        return engine
+
+def mark_schema_checked(connection_string: str):
+    """Skip the schema check for a database another process has just checked, e.g. in pool workers"""
+    with _engines_lock:
+        _schema_checked.add(connection_string)
+
+def release_engine(connection_string: str):
+    """Unregister a user of a shared engine, disposing its pool after the last one"""
+    with _engines_lock:
+        if connection_string not in _engine_users:
+            return
+        _engine_users[connection_string] -= 1
+        if _engine_users[connection_string] <= 0:
+            _engine_users[connection_string] = 0
+            _engines[connection_string].dispose()
+
+@atexit.register
+def dispose_engines():
+    """Dispose every shared engine, used on process exit"""
+    # Pending write-behind batches go out before the pools are torn down
+    write_behind = sys.modules.get(f"{__package__}.write_behind")
+    if write_behind is not None:
+        write_behind.close_all_queues()
+    with _engines_lock:
+        for engine in _engines.values():
+            engine.dispose()
+
+def offer_rows(pitch_session_id: int, offers: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Offers table rows for a session's verdicts, keyed by shark name"""
+    now = datetime.utcnow()
+    return [
+        {
+            'pitch_session_id': pitch_session_id,
+            'shark_name': shark_name,
+            **parse_offer(verdict),
+            'raw_text': str(verdict),
+            'created_at': now
+        }
+        for shark_name, verdict in offers.items()
+    ]
+
+class ConversationSummaries:
+    """Conversation summaries of recently fetched pitch sessions
+
+    Contexts are cached per pitch session, so a later call only appends the
+    Q&A entries added since the previous one.
+    """
+    
+    def __init__(self, size: int = SUMMARY_CACHE_SIZE):
+        """Initialize with the number of pitch sessions to keep"""
+        self.size = size
+        # Pitch session id -> (entries seen, context), most recently used last
+        self._contexts: "OrderedDict[int, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def summarize(self, pitch_session: Dict[str, Any], qa_entries: List[Dict[str, Any]]) -> str:
+        """Summary of a pitch session (as dicts) and its Q&A entries in order"""
+        header_lines = [
+            f"Pitch: {pitch_session['pitch_text']}",
+            f"Investment Request: ${pitch_session['amount_invested']:,} for {pitch_session['percentage_equity']}% equity"
+        ]
+        
+        with self._lock:
+            cached = self._contexts.pop(pitch_session['id'], None)
+            if cached is None or cached[0] > len(qa_entries):
+                cached = (0, ConversationContext(header_lines))
+            seen, context = cached
+            context.set_header(header_lines)
+            for qa in qa_entries[seen:]:
+                context.add_qa(qa['shark_name'], qa['round_number'], qa['question'], qa['answer'])
+            
+            # The oldest contexts are dropped
+            self._contexts[pitch_session['id']] = (len(qa_entries), context)
+            while len(self._contexts) > self.size:
+                self._contexts.popitem(last=False)
+            return context.render()
+
 class DatabaseManager:
     """Manages database connections and operations"""
     
     def __init__(self, connection_string: Optional[str] = None):
         """Initialize database manager with connection string"""
         if connection_string is None:
-            # Check for custom connection string first
-            custom_connection = os.getenv('DB_CONNECTION_STRING')
-            if custom_connection:
-                connection_string = custom_connection
-            else:
-                # Build connection string from individual environment variables
-                host = os.getenv('DB_HOST', 'localhost')
-                port = os.getenv('DB_PORT', '5432')
-                database = os.getenv('DB_NAME', 'shark_tank')
-                username = os.getenv('DB_USERNAME', 'postgres')
-                password = os.getenv('DB_PASSWORD', 'password')
-                
-                connection_string = f"postgresql://{username}:{password}@{host}:{port}/{database}"
+            connection_string = default_connection_string()
         
-        self.engine = create_engine(connection_string)
+        # Engines are shared per process; the schema is checked on first use only
+        self.connection_string = connection_string
+        self.engine = acquire_engine(connection_string)
         self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        self._closed = False
         
-        # Create tables if they don't exist
-        Base.metadata.create_all(bind=self.engine)
+        # Write-behind queue, started on first queued write
+        self._write_queue = None
+        
+        # Conversation summaries, updated incrementally per pitch session
+        self._summaries = ConversationSummaries()
     
     def get_session(self):
         """Get a new database session"""
@@ -112,15 +470,22 @@ class DatabaseManager:
         """Create a new pitch session"""
         session = self.get_session()
         try:
-            pitch_session = PitchSession(
-                session_id=session_id,
-                pitch_text=pitch_text,
-                amount_invested=amount_invested,
-                percentage_equity=percentage_equity
-            )
-            session.add(pitch_session)
-            session.commit()
-            session.refresh(pitch_session)
+            with get_tracer().span('db_write', op='create_pitch_session', session_id=session_id):
+                now = datetime.utcnow()
+                pitch_session = PitchSession(
+                    session_id=session_id,
+                    pitch_text=pitch_text,
+                    amount_invested=amount_invested,
+                    percentage_equity=percentage_equity,
+                    created_at=now,
+                    updated_at=now
+                )
+                session.add(pitch_session)
+                session.execute(session_rollup(self.engine.dialect.name, [{
+                    'created_at': now, 'amount_invested': amount_invested, 'percentage_equity': percentage_equity
+                }]))
+                session.commit()
+                session.refresh(pitch_session)
             return pitch_session
         except SQLAlchemyError as e:
             session.rollback()
@@ -133,16 +498,22 @@ class DatabaseManager:
         """Add a new Q&A entry"""
         session = self.get_session()
         try:
-            qa_entry = QAEntry(
-                pitch_session_id=pitch_session_id,
-                shark_name=shark_name,
-                question=question,
-                answer=answer,
-                round_number=round_number
-            )
-            session.add(qa_entry)
-            session.commit()
-            session.refresh(qa_entry)
+            with get_tracer().span('db_write', op='add_qa_entry', shark=shark_name, round=round_number,
+                                   pitch_session_id=pitch_session_id):
+                qa_entry = QAEntry(
+                    pitch_session_id=pitch_session_id,
+                    shark_name=shark_name,
+                    question=question,
+                    answer=answer,
+                    round_number=round_number,
+                    created_at=datetime.utcnow()
+                )
+                session.add(qa_entry)
+                session.execute(qa_rollup(self.engine.dialect.name, [
+                    {'created_at': qa_entry.created_at, 'shark_name': shark_name}
+                ]))
+                session.commit()
+                session.refresh(qa_entry)
             return qa_entry
         except SQLAlchemyError as e:
             session.rollback()
@@ -150,6 +521,34 @@ class DatabaseManager:
         finally:
             session.close()
     
+    def _get_write_queue(self):
+        """Get the write-behind queue, starting it on first use"""
+        if self._write_queue is None:
+            from .write_behind import WriteBehindQueue
+            self._write_queue = WriteBehindQueue(self.engine)
+        return self._write_queue
+    
+    def queue_qa_entry(self, pitch_session_id: int, shark_name: str,
+                       question: str, answer: str, round_number: int = 1):
+        """Queue a Q&A entry to be written in the background with the next batch"""
+        self._get_write_queue().put_qa_entry(
+            pitch_session_id=pitch_session_id,
+            shark_name=shark_name,
+            question=question,
+            answer=answer,
+            round_number=round_number
+        )
+    
+    def flush(self, timeout: Optional[float] = None):
+        """Write all queued entries now; raises if any batch failed"""
+        if self._write_queue is None:
+            return
+        if not self._write_queue.flush(timeout):
+            raise Exception("Timed out flushing queued database writes")
+        errors = self._write_queue.take_errors()
+        if errors:
+            raise Exception("; ".join(errors))
+    
     def get_pitch_session(self, session_id: str) -> Optional[PitchSession]:
         """Get pitch session by session ID"""
         session = self.get_session()
@@ -162,41 +561,209 @@ class DatabaseManager:
         """Get all Q&A entries for a pitch session"""
         session = self.get_session()
         try:
-            return session.query(QAEntry).filter(QAEntry.pitch_session_id == pitch_session_id).order_by(QAEntry.created_at).all()
+            return session.query(QAEntry).filter(QAEntry.pitch_session_id == pitch_session_id).order_by(*QA_ORDER).all()
         finally:
             session.close()
     
-    def get_complete_conversation(self, session_id: str) -> Dict:
-        """Get complete conversation data for a session"""
-        pitch_session = self.get_pitch_session(session_id)
-        if not pitch_session:
-            return None
+    def get_qa_page(self, pitch_session_id: int, limit: int = 100,
+                    after: Optional[QACursor] = None) -> Dict[str, Any]:
+        """Get one page of a session's Q&A history as dicts
+
+        Pages are keyed on the last entry seen rather than an offset, so every
+        page is an index range scan. Pass the returned next_cursor as after
+        to get the following page; it is None on the last page.
+        """
+        query = (
+            select(QAEntry.__table__)
+            .where(QAEntry.pitch_session_id == pitch_session_id)
+            .order_by(*QA_ORDER)
+            .limit(limit + 1)
+        )
+        if after is not None:
+            query = query.where(tuple_(*QA_ORDER) > tuple_(*after))
         
-        qa_entries = self.get_qa_history(pitch_session.id)
+        with self.engine.connect() as conn:
+            rows = conn.execute(query).mappings().all()
+        
+        entries = [self._qa_dict(row) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            last = rows[limit - 1]
+            next_cursor = (last['round_number'], last['created_at'], last['id'])
+        return {'entries': entries, 'next_cursor': next_cursor}
+    
+    @staticmethod
+    def _qa_dict(qa: Any) -> Dict[str, Any]:
+        """Q&A row mapping as a plain dict, shaped like QAEntry.to_dict"""
+        created_at = qa['created_at']
+        return {
+            'id': qa['id'],
+            'pitch_session_id': qa['pitch_session_id'],
+            'shark_name': qa['shark_name'],
+            'question': qa['question'],
+            'answer': qa['answer'],
+            'round_number': qa['round_number'],
+            'created_at': created_at.isoformat() if created_at else None
+        }
+    
+    def get_complete_conversation(self, session_id: str) -> Dict:
+        """Get complete conversation data for a session
+
+        The pitch session and its Q&A entries are loaded in one database
+        session (the entries with a selectin eager load) and returned as dicts.
+        """
+        session = self.get_session()
+        try:
+            pitch_session = session.execute(
+                select(PitchSession)
+                .options(selectinload(PitchSession.qa_entries), selectinload(PitchSession.offers))
+                .where(PitchSession.session_id == session_id)
+            ).scalar_one_or_none()
+            if not pitch_session:
+                return None
+            
+            pitch = pitch_session.to_dict()
+            qa_history = [qa.to_dict() for qa in pitch_session.qa_entries]
+            offers = [offer.to_dict() for offer in pitch_session.offers]
+        finally:
+            session.close()
         
         return {
-            'pitch_session': pitch_session.to_dict(),
-            'qa_history': [qa.to_dict() for qa in qa_entries],
-            'conversation_summary': self._generate_conversation_summary(pitch_session, qa_entries)
+            'pitch_session': pitch,
+            'qa_history': qa_history,
+            'offers': offers,
+            'conversation_summary': self._generate_conversation_summary(pitch, qa_history)
         }
     
-    def _generate_conversation_summary(self, pitch_session: PitchSession, qa_entries: List[QAEntry]) -> str:
-        """Generate a summary of the complete conversation"""
-        summary_parts = [
-            f"Pitch: {pitch_session.pitch_text}",
-            f"Investment Request: ${pitch_session.amount_invested:,} for {pitch_session.percentage_equity}% equity"
+    def record_outcome(self, pitch_session_id: int, offers: Dict[str, Any],
+                       recap: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Store the sharks' verdicts as parsed offers, and the recap, for a pitch session
+
+        Offers stored for the session before are replaced. Returns the rows written.
+        """
+        rows = offer_rows(pitch_session_id, offers)
+        try:
+            with get_tracer().span('db_write', op='record_outcome', pitch_session_id=pitch_session_id):
+                with self.engine.begin() as conn:
+                    conn.execute(delete(Offer.__table__).where(Offer.pitch_session_id == pitch_session_id))
+                    if rows:
+                        conn.execute(insert(Offer.__table__), rows)
+                    if recap is not None:
+                        conn.execute(
+                            update(PitchSession.__table__)
+                            .where(PitchSession.id == pitch_session_id)
+                            .values(recap=recap, updated_at=datetime.utcnow())
+                        )
+            return rows
+        except SQLAlchemyError as e:
+            raise Exception(f"Failed to store offers: {e}")
+    
+    def deal_rate_by_shark(self) -> List[Dict[str, Any]]:
+        """Verdicts, deals and deal rate of every shark, from the offers index alone"""
+        deals = func.count().filter(Offer.invest == true())
+        query = (
+            select(Offer.shark_name, func.count().label('verdicts'), deals.label('deals'))
+            .group_by(Offer.shark_name)
+            .order_by(Offer.shark_name)
+        )
+        with self.engine.connect() as conn:
+            rows = conn.execute(query).all()
+        return [
+            {
+                'shark_name': row.shark_name,
+                'verdicts': row.verdicts,
+                'deals': row.deals,
+                'deal_rate': row.deals / row.verdicts if row.verdicts else 0.0
+            }
+            for row in rows
         ]
+    
+    def valuation_stats(self, shark_name: Optional[str] = None) -> Dict[str, Any]:
+        """Count, median, mean, lowest and highest valuation offered, for one shark or all
+
+        The median is read off the valuation index at the middle position
+        instead of sorting the offers.
+        """
+        conditions = [Offer.invest == true(), Offer.valuation.isnot(None)]
+        if shark_name is not None:
+            conditions.append(Offer.shark_name == shark_name)
+        with self.engine.connect() as conn:
+            summary = conn.execute(
+                select(func.count(), func.avg(Offer.valuation), func.min(Offer.valuation),
+                       func.max(Offer.valuation)).where(*conditions)
+            ).one()
+            deals = summary[0]
+            median = None
+            if deals:
+                middle = conn.execute(
+                    select(Offer.valuation).where(*conditions)
+                    .order_by(Offer.valuation)
+                    .offset((deals - 1) // 2)
+                    .limit(1 if deals % 2 else 2)
+                ).scalars().all()
+                median = sum(middle) / len(middle)
+        return {
+            'shark_name': shark_name,
+            'deals': deals,
+            'median_valuation': median,
+            'mean_valuation': float(summary[1]) if summary[1] is not None else None,
+            'min_valuation': summary[2],
+            'max_valuation': summary[3]
+        }
+    
+    def get_analytics(self, days: int = 14) -> Dict[str, Any]:
+        """Totals over all stored sessions, the last days' counts and questions per shark
+
+        Read from the rollup tables, which hold one row per day (and per shark
+        and day), so the cost does not grow with the number of sessions.
+        """
+        since = datetime.utcnow().date() - timedelta(days=days - 1)
+        with self.engine.connect() as conn:
+            totals = conn.execute(select(
+                func.coalesce(func.sum(DailyStats.sessions), 0),
+                func.coalesce(func.sum(DailyStats.ask_amount_total), 0),
+                func.coalesce(func.sum(DailyStats.ask_equity_total), 0)
+            )).one()
+            recent = conn.execute(
+                select(DailyStats.day, DailyStats.sessions, DailyStats.ask_amount_total, DailyStats.ask_equity_total)
+                .where(DailyStats.day >= since)
+                .order_by(DailyStats.day)
+            ).all()
+            questions = func.sum(SharkDailyStats.questions)
+            sharks = conn.execute(
+                select(SharkDailyStats.shark_name, questions.label('questions'))
+                .group_by(SharkDailyStats.shark_name)
+                .order_by(questions.desc(), SharkDailyStats.shark_name)
+            ).all()
         
-        if qa_entries:
-            summary_parts.append("\nQ&A History:")
-            for qa in qa_entries:
-                summary_parts.append(f"\n{qa.shark_name} (Round {qa.round_number}):")
-                summary_parts.append(f"Q: {qa.question}")
-                summary_parts.append(f"A: {qa.answer}")
+        def averages(sessions: int, amount_total: int, equity_total: int) -> Dict[str, Any]:
+            return {
+                'sessions': sessions,
+                'avg_ask_amount': amount_total / sessions if sessions else None,
+                'avg_ask_equity': equity_total / sessions if sessions else None
+            }
         
-        return "\n".join(summary_parts)
+        return {
+            **averages(*totals),
+            'questions': sum(row.questions for row in sharks),
+            'days': [{'day': row.day.isoformat(), **averages(*row[1:])} for row in recent],
+            'sharks': [{'shark_name': row.shark_name, 'questions': row.questions} for row in sharks]
+        }
+    
+    def rebuild_analytics(self):
+        """Recompute the rollup tables from the stored sessions, e.g. after rows were changed by hand"""
+        with self.engine.begin() as conn:
+            rebuild_rollups(conn)
+    
+    def _generate_conversation_summary(self, pitch_session: Dict[str, Any],
+                                       qa_entries: List[Dict[str, Any]]) -> str:
+        """Generate a token-budgeted summary of the conversation"""
+        return self._summaries.summarize(pitch_session, qa_entries)
     
     def close(self):
-        """Close database connection"""
-        if self.engine:
-            self.engine.dispose()
+        """Release the shared engine; its pool is disposed once no manager uses it"""
+        if not self._closed:
+            self._closed = True
+            if self._write_queue is not None:
+                self._write_queue.close()
+            release_engine(self.connection_string)
@@ -0,0 +1,27 @@
+#!/usr/bin/env python
+"""
+Environment loading for Shark Tank application
+Reads the .env file, if python-dotenv is installed, the first time any
+setting is needed rather than when the package is imported
+"""
+
+import threading
+
+_loaded = False
+_lock = threading.Lock()
+
+
+def load_env():
+    """Load .env into the environment once per process (its values win)"""
+    global _loaded
+    if _loaded:
+        return
+    with _lock:
+        if _loaded:
+            return
+        _loaded = True
+        try:
+            from dotenv import load_dotenv
+        except ImportError:
+            return
+        load_dotenv(override=True)
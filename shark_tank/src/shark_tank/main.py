@@ -1,13 +1,41 @@
 #!/usr/bin/env python
+import argparse
+import importlib
+import sys
+import threading
 import warnings
-from shark_tank.crew import SharkTank
+from shark_tank.profiling import enable_profiling, write_profile
 
 warnings.filterwarnings("ignore", category=SyntaxWarning, module="pysbd")
 
-def run():
+def _preload_crew():
+    """Import crewai and the crew in the background while the founder types
+
+    The import takes seconds, so the prompts appear at once and the crew is
+    usually ready by the time the pitch is entered.
+    """
+    def load():
+        try:
+            importlib.import_module('shark_tank.crew')
+        except Exception:
+            # Reported by the real import in run()
+            pass
+    threading.Thread(target=load, name='shark-tank-preload', daemon=True).start()
+
+def run(argv=None):
     """
     Runs the Shark Tank simulation in interactive mode.
     """
+    parser = argparse.ArgumentParser(description="Run the Shark Tank simulation")
+    parser.add_argument('--profile', action='store_true',
+                        help="Record timing spans and write a trace and Prometheus metrics on exit")
+    parser.add_argument('--profile-out', default='shark_tank_profile',
+                        help="Path prefix for the .jsonl trace and .prom metrics (default: shark_tank_profile)")
+    args, _ = parser.parse_known_args(argv)
+    if args.profile:
+        enable_profiling()
+    _preload_crew()
+
     print("🦈 Welcome to Shark Tank!")
     print("=" * 50)
     
@@ -72,6 +100,7 @@ def run():
     except ValueError:
         print("⚠️  Invalid input, using default values...")
 
+    from shark_tank.crew import SharkTank
     tank = SharkTank()
 
     print("\n🚀 Starting Interactive Shark Tank Round...\n")
@@ -79,6 +108,18 @@ def run():
         tank.interactive_round(inputs)
     except Exception as e:
         raise Exception(f"An error occurred while running the crew: {e}")
+    finally:
+        tank.close()
+        written = write_profile(args.profile_out)
+        if written:
+            print(f"\n📊 Profile written to {written[0]} and {written[1]}")
+
+def test():
+    """
+    Runs the benchmark suite against a stub LLM and saves the results as JSON.
+    """
+    from shark_tank.benchmarks import main as run_benchmarks
+    run_benchmarks(sys.argv[1:])
 
 if __name__ == "__main__":
     run()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+"""
+Offer parsing for Shark Tank application
+Turns a shark's free-text verdict into a typed offer record: whether the
+shark invests, the amount, equity, royalty or other terms, and the implied
+valuation
+"""
+
+import re
+from typing import Any, Dict, List, Optional
+
+from .scheduler import OUT_PATTERN
+
+# Wording of an offer
+OFFER_PATTERN = re.compile(
+    r"^\W*yes\b|\bi['’]?m\s+in\b|\bi['’]?ll\s+(?:offer|invest|make\s+(?:you\s+)?an\s+offer)\b"
+    r"|\bmy\s+offer\b|\bi\s+(?:offer|will\s+invest|would\s+invest|want\s+to\s+invest|am\s+willing\s+to\s+invest)\b"
+    r"|\bi['’]?m\s+willing\s+to\s+invest\b|\b(?:verdict|decision)\s*:\s*(?:yes|invest|in|deal)\b"
+    r"|\boffer\s*:\s*\$",
+    re.IGNORECASE
+)
+
+# Wording of a pass, checked before the offer wording
+PASS_PATTERN = re.compile(
+    r"^\W*no\b|\b(?:verdict|decision)\s*:\s*(?:no|pass|decline|not)\b"
+    r"|\b(?:won['’]?t|will\s+not|wouldn['’]?t|would\s+not|can['’]?t|cannot|not\s+going\s+to|do\s+not|don['’]?t)"
+    r"\s+(?:be\s+)?(?:invest|make\s+(?:you\s+)?an\s+offer|offer)",
+    re.IGNORECASE
+)
+
+# $100,000 / $1.5 million / $250k; per-unit royalties are matched separately
+MONEY_PATTERN = re.compile(
+    r"\$\s*(\d+(?:,\d{3})*(?:\.\d+)?)(?![\d,.]?\d)\s*(k|m|mm|mil|million|thousand)?\b(?!\s*(?:per|a|/|an)\s+(?:unit|item|box|sale|bottle))",
+    re.IGNORECASE
+)
+PER_UNIT_ROYALTY_PATTERN = re.compile(
+    r"\$\s*(\d+(?:\.\d+)?)\s*(?:per|a|/|an)\s+(?:unit|item|box|sale|bottle)",
+    re.IGNORECASE
+)
+PERCENT_PATTERN = re.compile(r"(\d+(?:\.\d+)?)\s*(?:%|percent\b)", re.IGNORECASE)
+EQUITY_PATTERN = re.compile(
+    r"\s*(?:of\s+)?(?:equity|stake|ownership|of\s+(?:the|your)\s+(?:company|business))", re.IGNORECASE
+)
+
+# Sentences holding terms besides cash for equity
+TERMS_PATTERN = re.compile(
+    r"\b(?:royalt|loan|line\s+of\s+credit|debt|convertible|contingent|licens|recoup|advisory|until\s+i)",
+    re.IGNORECASE
+)
+
+MULTIPLIERS = {'k': 1_000, 'thousand': 1_000, 'm': 1_000_000, 'mm': 1_000_000, 'mil': 1_000_000,
+               'million': 1_000_000}
+
+# Longest terms text kept with an offer
+MAX_TERMS_CHARS = 500
+
+
+def _sentences(text: str) -> List[str]:
+    return [sentence.strip() for sentence in re.split(r'(?<=[.!?])\s+|\n+', text) if sentence.strip()]
+
+
+def _amount(text: str) -> Optional[int]:
+    """The first cash amount named in a text, in dollars"""
+    match = MONEY_PATTERN.search(text)
+    if match is None:
+        return None
+    value = float(match.group(1).replace(',', ''))
+    unit = (match.group(2) or '').lower()
+    return int(round(value * MULTIPLIERS.get(unit, 1)))
+
+
+def _percentages(text: str):
+    """(equity, royalty) percentages named in a text
+
+    A percentage next to 'royalty' is the royalty and one next to 'interest'
+    is neither; the equity is the first one followed by 'equity', 'stake' or
+    'of the company', or else the first other percentage.
+    """
+    equity = royalty = fallback = None
+    for match in PERCENT_PATTERN.finditer(text):
+        before = text[max(0, match.start() - 20):match.start()].lower()
+        after = text[match.end():match.end() + 25].lower()
+        value = float(match.group(1))
+        if EQUITY_PATTERN.match(after):
+            if equity is None:
+                equity = value
+        elif 'royalt' in before or re.match(r"\s*(?:in\s+)?royalt", after):
+            if royalty is None:
+                royalty = value
+        elif 'interest' in after or value > 100:
+            continue
+        elif fallback is None:
+            fallback = value
+    return (equity if equity is not None else fallback), royalty
+
+
+def parse_offer(text: str) -> Dict[str, Any]:
+    """Typed offer record of a shark's verdict text
+
+    Keys: invest, amount (dollars), equity and royalty (percent), terms
+    (sentences about royalties, loans and other conditions), valuation
+    (amount / equity). Anything a verdict does not state is None; a shark
+    who does not invest has no amount, equity or valuation.
+    """
+    text = str(text or '').strip()
+    amount = _amount(text)
+    equity, royalty = _percentages(text)
+
+    if PASS_PATTERN.search(text) or OUT_PATTERN.search(text):
+        invest = False
+    else:
+        invest = bool(OFFER_PATTERN.search(text)) or (amount is not None and equity is not None)
+
+    terms = " ".join(sentence for sentence in _sentences(text) if TERMS_PATTERN.search(sentence))
+    if invest and royalty is None:
+        per_unit = PER_UNIT_ROYALTY_PATTERN.search(text)
+        if per_unit is not None and not terms:
+            terms = per_unit.group(0)
+    if not invest:
+        amount = equity = royalty = None
+        terms = ''
+
+    valuation = None
+    if amount is not None and equity:
+        valuation = int(round(amount * 100 / equity))
+    return {
+        'invest': invest,
+        'amount': amount,
+        'equity': equity,
+        'royalty': royalty,
+        'terms': terms[:MAX_TERMS_CHARS] or None,
+        'valuation': valuation
+    }
+
+
+def verdict_decision(verdict: str) -> bool:
+    """Whether a free-text verdict makes an offer"""
+    return parse_offer(verdict)['invest']
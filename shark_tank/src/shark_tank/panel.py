@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+"""
+Panel verdicts for Shark Tank application
+Asks for every participating shark's verdict in one structured LLM call and
+splits the validated response back into per-shark verdicts
+"""
+
+import json
+import os
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, Field, ValidationError, model_validator
+
+VERDICT_MODES = ('per_shark', 'panel')
+
+# tasks.yaml task that gives the panel verdict
+PANEL_TASK = 'panel_verdict'
+
+
+class SharkVerdict(BaseModel):
+    """One shark's verdict in a panel response"""
+
+    shark: str = Field(min_length=1)
+    invest: bool
+    amount: Optional[int] = Field(default=None, ge=0)
+    equity: Optional[float] = Field(default=None, ge=0, le=100)
+    reason: str = Field(min_length=1)
+
+    @model_validator(mode='after')
+    def _offer_is_complete(self) -> "SharkVerdict":
+        if self.invest and (self.amount is None or self.equity is None):
+            raise ValueError("an investing shark needs an amount and equity")
+        return self
+
+    def text(self) -> str:
+        """The verdict worded like a shark's own verdict call"""
+        if self.invest:
+            return f"Yes: ${self.amount:,} for {self.equity:g}% equity. {self.reason.strip()}"
+        return f"No. {self.reason.strip()}"
+
+
+def verdict_mode_from_env() -> str:
+    """Verdict mode named by SHARK_TANK_VERDICT_MODE ('per_shark' by default)"""
+    mode = os.getenv('SHARK_TANK_VERDICT_MODE', 'per_shark').strip().lower()
+    if mode not in VERDICT_MODES:
+        raise ValueError(f"Unknown verdict mode '{mode}', expected one of {VERDICT_MODES}")
+    return mode
+
+
+def panel_personas(agents_config: Dict[str, Dict], agent_names: List[str]) -> str:
+    """The listed sharks' personas from agents.yaml, one line each"""
+    lines = []
+    for agent_name in agent_names:
+        config = agents_config[agent_name]
+        persona = " ".join(f"{config['role']}. {config['backstory']} Goal: {config['goal']}".split())
+        lines.append(f"- {agent_name}: {persona}")
+    return "\n".join(lines)
+
+
+def _json_object(output: str) -> Any:
+    """The JSON object in a model's output, allowing code fences or text around it"""
+    text = str(output)
+    start, end = text.find('{'), text.rfind('}')
+    if start < 0 or end < start:
+        raise ValueError("no JSON object in the output")
+    return json.loads(text[start:end + 1])
+
+
+def parse_panel_verdicts(output: str, sharks: Dict[str, str]) -> Dict[str, str]:
+    """Verdict texts of the sharks whose entry in a panel response is valid
+
+    sharks maps each listed shark's display name to its agents.yaml name;
+    an entry may name the shark by either. A shark that is missing, listed
+    twice or whose entry fails validation is left out of the result, so the
+    caller can ask it on its own.
+    """
+    try:
+        data = _json_object(output)
+    except ValueError:
+        return {}
+    entries = data.get('verdicts') if isinstance(data, dict) else None
+    if not isinstance(entries, list):
+        return {}
+
+    names = {}
+    for shark_name, agent_name in sharks.items():
+        names[shark_name.lower()] = shark_name
+        names[agent_name.lower()] = shark_name
+
+    verdicts: Dict[str, Optional[str]] = {}
+    for entry in entries:
+        try:
+            verdict = SharkVerdict.model_validate(entry)
+        except ValidationError:
+            continue
+        shark_name = names.get(verdict.shark.strip().lower())
+        if shark_name is None:
+            continue
+        # Two verdicts for one shark cannot both be right
+        verdicts[shark_name] = None if shark_name in verdicts else verdict.text()
+    return {shark_name: text for shark_name, text in verdicts.items() if text is not None}
+
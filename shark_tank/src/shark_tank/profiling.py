@@ -0,0 +1,186 @@
+#!/usr/bin/env python
+"""
+Profiling for Shark Tank application
+Timing spans around the pitch, questions, founder think time, verdicts,
+recap and database writes, exported as a JSON-lines trace and as
+Prometheus text metrics
+"""
+
+import json
+import math
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+# Quantiles reported per span in the Prometheus export
+QUANTILES = (0.5, 0.95, 0.99)
+
+# Span attributes that become Prometheus labels; the rest stay in the trace
+METRIC_LABELS = ('shark', 'op')
+
+
+class _NoopSpan:
+    """Stand-in returned while profiling is off"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **attrs):
+        """Ignore attributes"""
+
+    def end(self):
+        """Nothing to record"""
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Span:
+    """One timed operation; recorded on its tracer when the block exits"""
+
+    __slots__ = ('tracer', 'name', 'attrs', 'start', '_started')
+
+    def __init__(self, tracer: "Tracer", name: str, attrs: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+        self.start = 0.0
+        self._started = 0.0
+
+    def __enter__(self):
+        self.start = time.time()
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter() - self._started
+        if exc_type is not None:
+            self.attrs['error'] = exc_type.__name__
+        self.tracer._record(self.name, self.start, duration, self.attrs)
+        return False
+
+    def set(self, **attrs):
+        """Add attributes known only once the operation has run, e.g. a row count"""
+        self.attrs.update(attrs)
+
+    def end(self):
+        """Record a span opened with Tracer.start_span"""
+        self.__exit__(None, None, None)
+
+
+class Tracer:
+    """Collects spans from every thread of the process"""
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.spans: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def span(self, name: str, **attrs):
+        """Time a block: `with tracer.span('verdict', shark=..., session_id=...):`
+
+        While profiling is off this returns a shared no-op object, so an
+        instrumented block costs one attribute check.
+        """
+        if not self.enabled:
+            return _NOOP_SPAN
+        return Span(self, name, attrs)
+
+    def start_span(self, name: str, **attrs):
+        """Open a span that is closed by calling its end()"""
+        return self.span(name, **attrs).__enter__()
+
+    def _record(self, name: str, start: float, duration: float, attrs: Dict[str, Any]):
+        record = {'span': name, 'start': start, 'duration': duration}
+        record.update((key, value) for key, value in attrs.items() if value is not None)
+        with self._lock:
+            self.spans.append(record)
+
+    def export_jsonl(self, path: str):
+        """Write every span as one JSON line, in the order they finished"""
+        with self._lock:
+            spans = list(self.spans)
+        with open(path, 'w', encoding='utf-8') as f:
+            for record in spans:
+                f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+
+    def export_prometheus(self, path: str):
+        """Write per-span latency summaries and throughput in Prometheus text format"""
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(self.prometheus_text())
+
+    def prometheus_text(self) -> str:
+        """Latency summary (quantiles, sum, count) and rate per span name and shark"""
+        with self._lock:
+            spans = list(self.spans)
+
+        groups: Dict[Tuple, List[float]] = {}
+        for record in spans:
+            labels = (('span', record['span']),) + tuple(
+                (label, str(record[label])) for label in METRIC_LABELS if label in record
+            )
+            groups.setdefault(labels, []).append(record['duration'])
+
+        window = 0.0
+        if spans:
+            window = (max(record['start'] + record['duration'] for record in spans)
+                      - min(record['start'] for record in spans))
+
+        lines = [
+            "# HELP shark_tank_span_seconds Time spent per span.",
+            "# TYPE shark_tank_span_seconds summary"
+        ]
+        for labels, durations in sorted(groups.items()):
+            ordered = sorted(durations)
+            for quantile in QUANTILES:
+                value = ordered[max(1, math.ceil(quantile * len(ordered))) - 1]
+                lines.append(f"shark_tank_span_seconds{_labels(labels + (('quantile', str(quantile)),))} {value:.6f}")
+            lines.append(f"shark_tank_span_seconds_sum{_labels(labels)} {sum(ordered):.6f}")
+            lines.append(f"shark_tank_span_seconds_count{_labels(labels)} {len(ordered)}")
+
+        lines += [
+            "# HELP shark_tank_span_rate_per_minute Spans completed per minute over the trace.",
+            "# TYPE shark_tank_span_rate_per_minute gauge"
+        ]
+        for labels, durations in sorted(groups.items()):
+            rate = len(durations) / window * 60 if window else 0.0
+            lines.append(f"shark_tank_span_rate_per_minute{_labels(labels)} {rate:.3f}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    """Escape a Prometheus label value"""
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(labels: Tuple) -> str:
+    """Render Prometheus labels"""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+# Process-wide tracer, off unless profiling is requested
+_tracer = Tracer()
+
+
+def get_tracer() -> Tracer:
+    """The process-wide tracer"""
+    return _tracer
+
+
+def enable_profiling() -> Tracer:
+    """Start recording spans on the process-wide tracer"""
+    _tracer.enabled = True
+    return _tracer
+
+
+def write_profile(prefix: str) -> Optional[Tuple[str, str]]:
+    """Export the recorded spans to <prefix>.jsonl and <prefix>.prom"""
+    if not _tracer.enabled:
+        return None
+    trace_path, metrics_path = f"{prefix}.jsonl", f"{prefix}.prom"
+    _tracer.export_jsonl(trace_path)
+    _tracer.export_prometheus(metrics_path)
+    return trace_path, metrics_path
@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+"""
+Prompt layout for Shark Tank application
+Orders each agent prompt so the parts shared between calls come first, where
+a provider's prompt cache can reuse them, and counts the tokens every session
+sends and shares
+"""
+
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from crewai.utilities.i18n import I18N
+
+from .context_builder import CHARS_PER_TOKEN, estimate_tokens
+
+PROMPT_LAYOUTS = ('crewai', 'shared')
+
+# crewai opens every prompt with the agent's persona, so no two sharks share a
+# prefix. The shared layout leaves the system message to the answer format,
+# which is the same for every agent, and moves the persona after the context
+# and the task description.
+SHARED_PREFIX_SLICES = {
+    'role_playing': "",
+    'task_with_context': "This is the context you're working with:\n{context}\n\nCurrent Task: {task}",
+    'task': (
+        "\n{input}\n\nYou are {role}. {backstory}\nYour personal goal is: {goal}"
+        "\n\nBegin! This is VERY important to you, use the tools available and give your best "
+        "Final Answer, your job depends on it!\n\nThought:"
+    ),
+}
+
+# Name each task's calls are grouped under, by task name or its last word
+TASK_KINDS = {'pitch_task': 'pitch', 'moderator_summary': 'recap'}
+
+
+class SharedPrefixI18N(I18N):
+    """crewai's prompt slices with the shared-prefix layout"""
+
+    def slice(self, slice: str) -> str:
+        if slice in SHARED_PREFIX_SLICES:
+            return SHARED_PREFIX_SLICES[slice]
+        return super().slice(slice)
+
+
+def layout_from_env() -> str:
+    """Prompt layout named by SHARK_TANK_PROMPT_LAYOUT ('crewai' by default, or 'shared')"""
+    layout = os.getenv('SHARK_TANK_PROMPT_LAYOUT', 'crewai').strip().lower()
+    if layout not in PROMPT_LAYOUTS:
+        raise ValueError(f"Unknown prompt layout '{layout}', expected one of {PROMPT_LAYOUTS}")
+    return layout
+
+
+def render_prompt(agent: Any, task: Any, context: str) -> Tuple[str, str]:
+    """System and user message crewai sends for a task, as built from the agent's slices"""
+    i18n = agent.i18n
+
+    def persona(text: str) -> str:
+        return text.replace('{goal}', agent.goal).replace('{role}', agent.role).replace('{backstory}', agent.backstory)
+
+    task_prompt = task.prompt()
+    if context:
+        task_prompt = i18n.slice('task_with_context').format(task=task_prompt, context=context)
+    system = persona(i18n.slice('role_playing') + i18n.slice('no_tools'))
+    user = persona(i18n.slice('task')).replace('{input}', task_prompt)
+    return system, user
+
+
+def common_prefix_length(a: str, b: str) -> int:
+    """Length of the longest common prefix of two strings"""
+    low, high = 0, min(len(a), len(b))
+    # Binary search on slices compares in C instead of character by character
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[:middle] == b[:middle]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+class PromptLedger:
+    """Prompt tokens each session sends, and how many repeat an earlier prompt's prefix
+
+    Providers cache prompt prefixes, so a prefix already sent in the session
+    is billed and processed at a discount on the next call. Only prefixes of
+    at least min_prefix_tokens are counted as cached, since that is the
+    smallest prefix providers cache.
+    """
+
+    def __init__(self, min_prefix_tokens: Optional[int] = None, max_prompts: int = 64):
+        """Initialize ledger
+
+        min_prefix_tokens defaults to SHARK_TANK_PROMPT_CACHE_MIN (1024);
+        max_prompts is how many of a session's latest prompts are compared
+        with each new one.
+        """
+        if min_prefix_tokens is None:
+            min_prefix_tokens = int(os.getenv('SHARK_TANK_PROMPT_CACHE_MIN', '1024'))
+        self.min_prefix_tokens = min_prefix_tokens
+        self.max_prompts = max_prompts
+        self._sessions: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, session_id: str, task_name: str, system: str, user: str):
+        """Account for one prompt sent on behalf of a session"""
+        prompt = f"{system}\n{user}"
+        tokens = estimate_tokens(system) + estimate_tokens(user)
+        kind = TASK_KINDS.get(task_name, task_name.rsplit('_', 1)[-1])
+        with self._lock:
+            session = self._sessions.setdefault(session_id, {
+                'prompts': [], 'calls': 0, 'prompt_tokens': 0, 'prefix_tokens': 0,
+                'cached_tokens': 0, 'output_tokens': 0, 'by_kind': {}
+            })
+            earlier: List[str] = list(session['prompts'])
+        # Compared outside the lock; the prompts are immutable strings
+        shared = max((common_prefix_length(prompt, other) for other in earlier), default=0)
+        prefix_tokens = min(shared // CHARS_PER_TOKEN, tokens)
+        with self._lock:
+            session['prompts'].append(prompt)
+            del session['prompts'][:-self.max_prompts]
+            session['calls'] += 1
+            session['prompt_tokens'] += tokens
+            session['prefix_tokens'] += prefix_tokens
+            if prefix_tokens >= self.min_prefix_tokens:
+                session['cached_tokens'] += prefix_tokens
+            by_kind = session['by_kind'].setdefault(kind, {'calls': 0, 'prompt_tokens': 0})
+            by_kind['calls'] += 1
+            by_kind['prompt_tokens'] += tokens
+
+    def record_output(self, session_id: str, output: str):
+        """Account for the output of a prompt recorded for a session"""
+        tokens = estimate_tokens(str(output))
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is not None:
+                session['output_tokens'] += tokens
+
+    def stats(self, session_id: str) -> Dict[str, Any]:
+        """Calls, prompt tokens, shared prefix tokens, cacheable tokens and output tokens of a session"""
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return {'calls': 0, 'prompt_tokens': 0, 'prefix_tokens': 0, 'cached_tokens': 0,
+                        'output_tokens': 0, 'by_kind': {}}
+            return {
+                'calls': session['calls'],
+                'prompt_tokens': session['prompt_tokens'],
+                'prefix_tokens': session['prefix_tokens'],
+                'cached_tokens': session['cached_tokens'],
+                'output_tokens': session['output_tokens'],
+                'by_kind': {kind: dict(counts) for kind, counts in session['by_kind'].items()}
+            }
+
+    def pop(self, session_id: str) -> Dict[str, Any]:
+        """A session's stats, forgetting its prompts"""
+        stats = self.stats(session_id)
+        with self._lock:
+            self._sessions.pop(session_id, None)
+        return stats
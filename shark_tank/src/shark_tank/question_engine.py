@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+"""
+Question engine for Shark Tank application
+Generates shark questions concurrently so the founder never waits on an LLM
+round-trip between answers
+"""
+
+import os
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+PREFETCH_MODES = ('round', 'next', 'off')
+
+
+class QuestionEngine:
+    """Runs shark question calls on a thread pool ahead of the founder's answers"""
+
+    def __init__(self, prefetch: Optional[str] = None, max_workers: Optional[int] = None):
+        """Initialize question engine
+
+        prefetch is one of:
+          'round' - generate every question of a round up front (default)
+          'next'  - generate the next shark's question while the founder types
+          'off'   - generate each question only when it is needed
+        """
+        if prefetch is None:
+            prefetch = os.getenv('SHARK_TANK_QUESTION_PREFETCH', 'round')
+        prefetch = prefetch.strip().lower()
+        if prefetch not in PREFETCH_MODES:
+            raise ValueError(f"Unknown prefetch mode '{prefetch}', expected one of {PREFETCH_MODES}")
+
+        self.prefetch = prefetch
+        self.max_workers = max_workers or int(os.getenv('SHARK_TANK_QUESTION_WORKERS', '6'))
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+        # Seconds from "founder is ready" to "question is on screen", per question
+        self.time_to_next_question: List[float] = []
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Create the thread pool on first use"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix='shark-question'
+            )
+        return self._executor
+
+    def iter_pending(self, jobs: List[Tuple[str, Callable[[], str]]]) -> Iterator[Tuple[str, Callable[[], str]]]:
+        """Yield (shark_name, get_question) for one round, in the given order
+
+        Each job is a (shark_name, generate_fn) pair. Questions are generated
+        ahead of time according to the prefetch mode; get_question() blocks
+        until the shark's question is ready. Closing the iterator early
+        cancels questions not yet started.
+        """
+        futures: Dict[int, Future] = {}
+
+        def submit(index: int):
+            if index < len(jobs) and index not in futures:
+                futures[index] = self._get_executor().submit(jobs[index][1])
+
+        def getter(index: int) -> Callable[[], str]:
+            def get_question() -> str:
+                started = time.perf_counter()
+                if self.prefetch == 'off':
+                    question_text = jobs[index][1]()
+                else:
+                    submit(index)
+                    if self.prefetch == 'next':
+                        submit(index + 1)
+                    question_text = futures.pop(index).result()
+                self.time_to_next_question.append(time.perf_counter() - started)
+                return question_text
+            return get_question
+
+        try:
+            if self.prefetch == 'round':
+                for index in range(len(jobs)):
+                    submit(index)
+
+            for index, (shark_name, generate_fn) in enumerate(jobs):
+                yield shark_name, getter(index)
+        finally:
+            for future in futures.values():
+                future.cancel()
+
+    def latency_stats(self) -> Dict[str, float]:
+        """Summarize time-to-next-question over all questions asked so far"""
+        samples = self.time_to_next_question
+        if not samples:
+            return {'count': 0, 'avg': 0.0, 'max': 0.0}
+        return {
+            'count': len(samples),
+            'avg': sum(samples) / len(samples),
+            'max': max(samples)
+        }
+
+    def shutdown(self):
+        """Stop the worker threads, dropping any questions not yet started"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,268 @@
+#!/usr/bin/env python
+"""
+Agent registry for Shark Tank application
+Builds each crewai Agent and Task once per process and reuses them across
+turns, rounds, refreshed sessions and new SharkTank instances
+"""
+
+import os
+import queue
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from crewai import Agent, Task
+from crewai.utilities.i18n import I18N
+
+from .prompts import PromptLedger, SharedPrefixI18N, layout_from_env, render_prompt
+
+
+def render_inputs(inputs: Optional[Dict[str, Any]]) -> str:
+    """Render task inputs as the plain-text context handed to the agent"""
+    if not inputs:
+        return ""
+    return "\n".join(f"{key}: {value}" for key, value in inputs.items() if value is not None)
+
+
+class AgentRegistry:
+    """Process-wide store of built agents and tasks, keyed by their YAML names"""
+
+    def __init__(self, agents_config: Dict[str, Dict], tasks_config: Dict[str, Dict],
+                 pool_size: Optional[int] = None):
+        """Initialize registry with the raw agents.yaml and tasks.yaml contents
+
+        pool_size is how many copies of each agent may run tasks at the same
+        time (SHARK_TANK_AGENT_POOL, 1 by default).
+        """
+        self.agents_config = agents_config
+        self.tasks_config = tasks_config
+        self.pool_size = pool_size or int(os.getenv('SHARK_TANK_AGENT_POOL', '1'))
+        self._agents: Dict[str, Agent] = {}
+        self._tasks: Dict[str, Task] = {}
+        self._lock = threading.Lock()
+        # An Agent keeps per-call executor state, so one copy never runs two
+        # tasks at once. Extra copies, each with its own tasks, are built on
+        # demand up to pool_size and handed out from a queue of idle ones.
+        self._idle: Dict[str, "queue.LifoQueue[Tuple[Agent, Dict[str, Task]]]"] = {}
+        self._copies: Dict[str, List[Tuple[Agent, Dict[str, Task]]]] = {}
+        # ConfigSnapshot the agents and tasks were built from, if any
+        self.snapshot = None
+        self.stream = False
+        # Optional ResponseCache consulted before every LLM call
+        self.cache = None
+        # LLM used by every agent instead of the configured model, e.g. a stub
+        self.llm = None
+        # 'shared' (opt-in) puts the context before the persona so prompts share a prefix
+        self.prompt_layout = layout_from_env()
+        self._i18n = SharedPrefixI18N()
+        # Prompt tokens sent per session
+        self.prompts = PromptLedger()
+
+    def agent(self, name: str) -> Agent:
+        """Get the agent for an agents.yaml entry, building it on first use"""
+        agent = self._agents.get(name)
+        if agent is None:
+            with self._lock:
+                agent = self._agents.get(name)
+                if agent is None:
+                    agent = self._build_agent(name)
+                    self._agents[name] = agent
+                    copy = (agent, {})
+                    self._copies[name] = [copy]
+                    self._idle[name] = queue.LifoQueue()
+                    self._idle[name].put(copy)
+        return agent
+
+    def _build_agent(self, name: str) -> Agent:
+        """Build an agent from its config with the registry's LLM settings"""
+        agent = Agent(config=self.agents_config[name], verbose=True)
+        if self.prompt_layout == 'shared':
+            agent.i18n = self._i18n
+        if self.llm is not None:
+            agent.llm = self.llm
+        agent.llm.stream = self.stream
+        return agent
+
+    def task(self, name: str) -> Task:
+        """Get the task for a tasks.yaml entry, building it on first use"""
+        task = self._tasks.get(name)
+        if task is None:
+            config = dict(self.tasks_config[name])
+            agent = self.agent(config.pop('agent'))
+            with self._lock:
+                task = self._tasks.get(name)
+                if task is None:
+                    task = Task(config=config, agent=agent)
+                    if not task.name:
+                        task.name = name
+                    self._tasks[name] = task
+        return task
+
+    def _all_agents(self) -> List[Agent]:
+        """Every built agent, including pooled copies"""
+        return [agent for copies in self._copies.values() for agent, _ in copies]
+
+    def set_streaming(self, enabled: bool):
+        """Turn token streaming on or off for every agent's LLM"""
+        with self._lock:
+            self.stream = enabled
+            for agent in self._all_agents():
+                agent.llm.stream = enabled
+
+    def set_llm(self, llm):
+        """Make every agent use this LLM (None keeps agents built later on their configured model)"""
+        with self._lock:
+            self.llm = llm
+            if llm is not None:
+                llm.stream = self.stream
+                for agent in self._all_agents():
+                    agent.llm = llm
+
+    def set_prompt_layout(self, layout: str):
+        """Switch every agent to the 'shared' or 'crewai' prompt layout"""
+        with self._lock:
+            self.prompt_layout = layout
+            for agent in self._all_agents():
+                agent.i18n = self._i18n if layout == 'shared' else I18N()
+
+    def set_pool_size(self, pool_size: int):
+        """Allow up to pool_size copies of each agent to run at once"""
+        with self._lock:
+            self.pool_size = max(1, pool_size)
+
+    def _checkout(self, agent_name: str):
+        """Take an idle copy of an agent, building one if the pool has room
+
+        Returns the copy and the idle queue it goes back to. A copy taken
+        before a reload goes back to its old queue, so it finishes its call
+        and is then dropped with the rest of the old agent.
+        """
+        while True:
+            self.agent(agent_name)
+            with self._lock:
+                idle = self._idle.get(agent_name)
+                copies = self._copies.get(agent_name)
+            if idle is not None:
+                break
+        try:
+            return idle.get_nowait(), idle
+        except queue.Empty:
+            pass
+        with self._lock:
+            if len(copies) < self.pool_size:
+                copy = (self._build_agent(agent_name), {})
+                copies.append(copy)
+                return copy, idle
+        return idle.get(), idle
+
+    def _copy_task(self, copy: Tuple[Agent, Dict[str, Task]], task_name: str) -> Task:
+        """The task bound to one copy of its agent"""
+        agent, tasks = copy
+        if agent is self._agents.get(self.agent_name_for(task_name)):
+            return self.task(task_name)
+        task = tasks.get(task_name)
+        if task is None:
+            config = dict(self.tasks_config[task_name])
+            config.pop('agent')
+            task = Task(config=config, agent=agent)
+            if not task.name:
+                task.name = task_name
+            tasks[task_name] = task
+        return task
+
+    def set_cache(self, cache):
+        """Use a ResponseCache for task outputs (None turns caching off)"""
+        self.cache = cache
+
+    def agent_name_for(self, task_name: str) -> str:
+        """Get the agents.yaml name of the agent a task belongs to"""
+        return self.tasks_config[task_name]['agent']
+
+    def execute(self, task_name: str, inputs: Optional[Dict[str, Any]] = None,
+                session_id: Optional[str] = None) -> str:
+        """Run a task with its own agent and return the agent's output
+
+        With a session_id, the prompt is counted in that session's prompt stats.
+        """
+        agent_name = self.agent_name_for(task_name)
+        agent = self.agent(agent_name)
+        context = render_inputs(inputs)
+
+        cache_key = None
+        if self.cache is not None and self.cache.is_cacheable(task_name):
+            cache_key = self.cache.make_key(
+                self.agents_config[agent_name], self.tasks_config[task_name],
+                str(getattr(agent.llm, 'model', '')), inputs,
+                layout=self.prompt_layout
+            )
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        copy, idle = self._checkout(agent_name)
+        try:
+            task = self._copy_task(copy, task_name)
+            if session_id is not None:
+                self.prompts.record(session_id, task_name, *render_prompt(copy[0], task, context))
+            output = copy[0].execute_task(task, context)
+        finally:
+            idle.put(copy)
+
+        if session_id is not None:
+            self.prompts.record_output(session_id, str(output))
+        if cache_key is not None:
+            self.cache.put(cache_key, str(output))
+        return output
+
+    def reconfigure(self, agents_config: Dict[str, Dict], tasks_config: Dict[str, Dict],
+                    changed_agents: Iterable[str], changed_tasks: Iterable[str]):
+        """Switch to new configs, dropping only the agents and tasks that changed
+
+        They are rebuilt from the new configs on next use. Calls already
+        running finish on the agents they started with, so sessions in
+        progress are not interrupted.
+        """
+        changed_tasks = set(changed_tasks)
+        with self._lock:
+            self.agents_config = agents_config
+            self.tasks_config = tasks_config
+            for name in changed_agents:
+                self._agents.pop(name, None)
+                self._copies.pop(name, None)
+                self._idle.pop(name, None)
+            for name in changed_tasks:
+                self._tasks.pop(name, None)
+            for copies in self._copies.values():
+                for _, tasks in copies:
+                    for name in changed_tasks & tasks.keys():
+                        tasks.pop(name, None)
+
+    def apply_snapshot(self, snapshot) -> Tuple[set, set]:
+        """Bring the registry up to a ConfigSnapshot; returns the changed agents and tasks"""
+        with self._lock:
+            current = self.snapshot
+            if current is None or current.fingerprint == snapshot.fingerprint:
+                self.snapshot = snapshot
+                return set(), set()
+            self.snapshot = snapshot
+        changed_agents, changed_tasks = current.diff(snapshot)
+        self.reconfigure(snapshot.agents, snapshot.tasks, changed_agents, changed_tasks)
+        return changed_agents, changed_tasks
+
+    def built_count(self) -> int:
+        """Number of agents and tasks built so far, pooled copies included"""
+        return (len(self._agents) + len(self._tasks)
+                + sum(len(tasks) + 1 for copies in self._copies.values() for _, tasks in copies[1:]))
+
+
+_registry: Optional[AgentRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_registry(agents_config: Dict[str, Dict], tasks_config: Dict[str, Dict]) -> AgentRegistry:
+    """Get the process-wide registry, creating it from the given configs the first time"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = AgentRegistry(agents_config, tasks_config)
+    return _registry
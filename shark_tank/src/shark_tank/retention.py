@@ -0,0 +1,468 @@
+#!/usr/bin/env python
+"""
+Retention for Shark Tank application
+Purges pitch sessions, Q&A entries and offers older than their configured
+age in short batched transactions, optionally archiving them first, and
+maintains monthly partitions on PostgreSQL
+"""
+
+import argparse
+import os
+import re
+import time
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import delete, func, select, text, tuple_
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import OperationalError
+
+from .database import DatabaseManager, Offer, PitchSession, QAEntry
+from .transfer import _JsonlWriter, session_query, session_records
+
+# Tables with a configurable age, purged in this order; Q&A entries and offers
+# go with their session when the session expires first
+RETAINED_TABLES = ('pitch_sessions', 'qa_entries', 'offers')
+CHILD_TABLES = {'qa_entries': QAEntry.__table__, 'offers': Offer.__table__}
+
+# Tables that can be range-partitioned on created_at; pitch_sessions is
+# referenced by foreign keys, which PostgreSQL only allows on a partitioned
+# table through a key that includes the partition column
+PARTITIONABLE_TABLES = ('qa_entries', 'offers')
+
+# How often a batch that timed out waiting for a lock is retried
+LOCK_RETRIES = 3
+
+PARTITION_BOUND = re.compile(r"FROM \((.+?)\) TO \((.+?)\)")
+
+
+def retention_from_env() -> Dict[str, Optional[int]]:
+    """Days each table's rows are kept, from DB_RETENTION_<TABLE>_DAYS (unset keeps them forever)"""
+    ttl_days = {}
+    for table in RETAINED_TABLES:
+        value = os.getenv(f"DB_RETENTION_{table.upper()}_DAYS", '').strip()
+        ttl_days[table] = int(value) if value else None
+        if ttl_days[table] is not None and ttl_days[table] < 1:
+            raise ValueError(f"DB_RETENTION_{table.upper()}_DAYS must be at least 1, got {value}")
+    return ttl_days
+
+
+def _month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def _next_month(day: date) -> date:
+    return (day.replace(day=1) + timedelta(days=32)).replace(day=1)
+
+
+def partition_name(table: str, month: date) -> str:
+    """Name of a table's partition for the month starting on the given day"""
+    return f"{table}_p{month:%Y_%m}"
+
+
+def partition_conversion_sql(table: str, today: Optional[date] = None, months_ahead: int = 3) -> List[str]:
+    """PostgreSQL statements that turn a table into one range-partitioned by month on created_at
+
+    The existing rows become one partition covering everything before next
+    month. The slow steps (building an index, validating a constraint) run
+    first without blocking writes; the swap itself only renames and
+    attaches, so its lock is held for moments. Run the statements in order,
+    outside a transaction, with a lock_timeout set.
+    """
+    if table not in PARTITIONABLE_TABLES:
+        raise ValueError(f"Only {PARTITIONABLE_TABLES} can be partitioned, not '{table}'")
+    today = today or datetime.utcnow().date()
+    cutover = _next_month(today)
+    legacy = f"{table}_legacy"
+    indexes = sorted(CHILD_TABLES[table].indexes, key=lambda index: index.name)
+
+    statements = [
+        "-- Online: the partitioned primary key (id, created_at) needs a matching unique index",
+        f"CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS {legacy}_id_created_at ON {table} (id, created_at);",
+        "-- Online: rows without a timestamp take their session's",
+        f"UPDATE {table} AS t SET created_at = COALESCE(p.created_at, TIMESTAMP '1970-01-01') "
+        f"FROM pitch_sessions AS p WHERE t.pitch_session_id = p.id AND t.created_at IS NULL;",
+        "-- Online: a validated constraint lets the attach below skip its scan",
+        f"ALTER TABLE {table} ADD CONSTRAINT {legacy}_range "
+        f"CHECK (created_at IS NOT NULL AND created_at < '{cutover}') NOT VALID;",
+        f"ALTER TABLE {table} VALIDATE CONSTRAINT {legacy}_range;",
+        "-- Swap: renames and attaches only",
+        "BEGIN;",
+        f"ALTER TABLE {table} RENAME TO {legacy};",
+        f"ALTER TABLE {legacy} ALTER COLUMN created_at SET NOT NULL;",
+    ]
+    # Index names are unique per schema, so the old table's make way for the new table's
+    statements.append(f"ALTER INDEX {table}_pkey RENAME TO {legacy}_pkey;")
+    statements += [f"ALTER INDEX {index.name} RENAME TO {index.name}_legacy;" for index in indexes]
+    statements += [
+        f"CREATE TABLE {table} (LIKE {legacy} INCLUDING DEFAULTS) PARTITION BY RANGE (created_at);",
+        f"ALTER TABLE {table} ADD PRIMARY KEY (id, created_at);",
+        f"ALTER TABLE {table} ADD FOREIGN KEY (pitch_session_id) REFERENCES pitch_sessions (id);",
+    ]
+    statements += [
+        f"CREATE INDEX {index.name} ON {table} ({', '.join(column.name for column in index.columns)});"
+        for index in indexes
+    ]
+    statements += [
+        f"ALTER TABLE {table} ATTACH PARTITION {legacy} FOR VALUES FROM (MINVALUE) TO ('{cutover}');",
+        f"ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id;",
+    ]
+    month = cutover
+    for _ in range(months_ahead + 1):
+        statements.append(f"CREATE TABLE {partition_name(table, month)} PARTITION OF {table} "
+                          f"FOR VALUES FROM ('{month}') TO ('{_next_month(month)}');")
+        month = _next_month(month)
+    statements.append("COMMIT;")
+    return statements
+
+
+class RetentionJob:
+    """Deletes rows past their table's age in bounded batches
+
+    Each batch is one short transaction: it selects up to batch_size
+    expired sessions by the pitch_sessions created_at index, writes them to
+    the archive if one is configured, and deletes them with set-based
+    statements. Child tables are purged per batch of sessions as well, since
+    a Q&A entry or offer is never older than its session. Batches are
+    separated by a pause so live writes are never queued behind the purge
+    for long, and on PostgreSQL every batch gives up on locks it cannot get
+    within lock_timeout_ms.
+    """
+
+    def __init__(self, engine: Engine, ttl_days: Optional[Dict[str, Optional[int]]] = None,
+                 batch_size: Optional[int] = None, pause: Optional[float] = None,
+                 archive_dir: Optional[str] = None, lock_timeout_ms: Optional[int] = None):
+        """Initialize job
+
+        Settings default to DB_RETENTION_<TABLE>_DAYS, DB_PURGE_BATCH_SIZE
+        (1000), DB_PURGE_PAUSE (0.05 seconds), DB_ARCHIVE_DIR (no archive)
+        and DB_PURGE_LOCK_TIMEOUT_MS (2000). A table whose TTL is None or 0
+        is never purged.
+        """
+        self.engine = engine
+        self.ttl_days = retention_from_env() if ttl_days is None else ttl_days
+        self.batch_size = batch_size or int(os.getenv('DB_PURGE_BATCH_SIZE', '1000'))
+        self.pause = float(os.getenv('DB_PURGE_PAUSE', '0.05')) if pause is None else pause
+        self.archive_dir = archive_dir if archive_dir is not None else (os.getenv('DB_ARCHIVE_DIR') or None)
+        self.lock_timeout_ms = lock_timeout_ms or int(os.getenv('DB_PURGE_LOCK_TIMEOUT_MS', '2000'))
+        self.postgres = engine.dialect.name == 'postgresql'
+
+    def cutoffs(self, now: Optional[datetime] = None) -> Dict[str, datetime]:
+        """Creation time before which each table's rows are expired"""
+        now = now or datetime.utcnow()
+        return {table: now - timedelta(days=days) for table, days in self.ttl_days.items() if days}
+
+    @contextmanager
+    def _batch(self) -> Iterator[Connection]:
+        """One batch transaction, with a lock timeout on PostgreSQL"""
+        with self.engine.begin() as conn:
+            if self.postgres:
+                conn.exec_driver_sql(f"SET LOCAL lock_timeout = '{int(self.lock_timeout_ms)}ms'")
+            yield conn
+
+    def _run_batch(self, work) -> Any:
+        """Run a batch, retrying after a pause when it timed out waiting for a lock"""
+        for attempt in range(LOCK_RETRIES + 1):
+            try:
+                with self._batch() as conn:
+                    return work(conn)
+            except OperationalError:
+                if attempt == LOCK_RETRIES:
+                    raise
+                time.sleep(max(self.pause, 0.1) * (attempt + 1))
+
+    def _archive(self, table: str, stamp: str) -> Optional[_JsonlWriter]:
+        if not self.archive_dir:
+            return None
+        os.makedirs(self.archive_dir, exist_ok=True)
+        return _JsonlWriter(self._archive_path(table, stamp))
+
+    def _archive_path(self, table: str, stamp: str) -> str:
+        return os.path.join(self.archive_dir, f"{table}-{stamp}.jsonl.gz")
+
+    def _close_archive(self, archive: Optional[_JsonlWriter], table: str, stamp: str, archived: int):
+        """Close an archive, removing it when the purge found nothing to put in it"""
+        if archive is None:
+            return
+        archive.close()
+        if not archived:
+            os.remove(self._archive_path(table, stamp))
+
+    def _expired_sessions(self, conn: Connection, cutoff: datetime, after: Optional[Tuple[datetime, int]],
+                          floor: Optional[datetime] = None, records: bool = False) -> List[Any]:
+        """The next batch of sessions created before cutoff (and at or after floor), in index order"""
+        sessions = PitchSession.__table__
+        query = session_query(floor, cutoff) if records else \
+            select(sessions.c.id, sessions.c.created_at).order_by(sessions.c.created_at, sessions.c.id)
+        if not records:
+            query = query.where(sessions.c.created_at < cutoff)
+            if floor is not None:
+                query = query.where(sessions.c.created_at >= floor)
+        if after is not None:
+            query = query.where(tuple_(sessions.c.created_at, sessions.c.id) > tuple_(*after))
+        return conn.execute(query.limit(self.batch_size)).all()
+
+    def purge_sessions(self, cutoff: datetime, stamp: str) -> Dict[str, Any]:
+        """Delete sessions created before cutoff, with their Q&A entries and offers"""
+        stats = {'sessions': 0, 'qa_entries': 0, 'offers': 0, 'batches': 0, 'max_batch_ms': 0.0}
+        archive = self._archive('pitch_sessions', stamp)
+        position: Dict[str, Any] = {'after': None}
+
+        def work(conn: Connection):
+            rows = self._expired_sessions(conn, cutoff, position['after'], records=True)
+            if not rows:
+                return None
+            ids = [row.id for row in rows]
+            if archive is not None:
+                archive.write(session_records(conn, rows))
+                archive.flush()
+            stats['qa_entries'] += conn.execute(
+                delete(QAEntry.__table__).where(QAEntry.pitch_session_id.in_(ids))).rowcount
+            stats['offers'] += conn.execute(
+                delete(Offer.__table__).where(Offer.pitch_session_id.in_(ids))).rowcount
+            stats['sessions'] += conn.execute(
+                delete(PitchSession.__table__).where(PitchSession.id.in_(ids))).rowcount
+            return rows[-1].created_at, rows[-1].id
+
+        try:
+            self._loop(work, stats, lambda last: position.update(after=last))
+        finally:
+            self._close_archive(archive, 'pitch_sessions', stamp, stats['sessions'])
+        return stats
+
+    def purge_children(self, table: str, cutoff: datetime, floor: Optional[datetime],
+                       stamp: str) -> Dict[str, Any]:
+        """Delete a child table's rows created before cutoff, walking the sessions created before it
+
+        floor skips sessions the session purge has already removed.
+        """
+        child = CHILD_TABLES[table]
+        stats = {table: 0, 'batches': 0, 'max_batch_ms': 0.0}
+        archive = self._archive(table, stamp)
+        position: Dict[str, Any] = {'after': None}
+
+        def work(conn: Connection):
+            sessions = self._expired_sessions(conn, cutoff, position['after'], floor)
+            if not sessions:
+                return None
+            expired = (child.c.pitch_session_id.in_([row.id for row in sessions]), child.c.created_at < cutoff)
+            if archive is not None:
+                archive.write([dict(row._mapping) for row in conn.execute(
+                    select(child).where(*expired).order_by(child.c.id))])
+                archive.flush()
+            stats[table] += conn.execute(delete(child).where(*expired)).rowcount
+            return sessions[-1].created_at, sessions[-1].id
+
+        try:
+            self._loop(work, stats, lambda last: position.update(after=last))
+        finally:
+            self._close_archive(archive, table, stamp, stats[table])
+        return stats
+
+    def _loop(self, work, stats: Dict[str, Any], advance):
+        """Run batches until one finds nothing, pausing between them"""
+        while True:
+            started = time.perf_counter()
+            last = self._run_batch(work)
+            if last is None:
+                return
+            stats['batches'] += 1
+            stats['max_batch_ms'] = max(stats['max_batch_ms'], (time.perf_counter() - started) * 1000)
+            advance(last)
+            if self.pause:
+                time.sleep(self.pause)
+
+    def partitions(self, conn: Connection, table: str) -> List[Tuple[str, Optional[datetime], Optional[datetime]]]:
+        """(name, lower bound, upper bound) of a partitioned table's partitions; MINVALUE gives None"""
+        rows = conn.execute(text(
+            "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) FROM pg_inherits AS i "
+            "JOIN pg_class AS c ON c.oid = i.inhrelid WHERE i.inhparent = CAST(:table AS regclass)"
+        ), {'table': table}).all()
+        partitions = []
+        for name, bound in rows:
+            match = PARTITION_BOUND.search(bound or '')
+            if match is None:
+                continue
+            lower, upper = (None if value == 'MINVALUE' else datetime.fromisoformat(value.strip("'"))
+                            for value in match.groups())
+            partitions.append((name, lower, upper))
+        return sorted(partitions, key=lambda partition: partition[2] or datetime.max)
+
+    def is_partitioned(self, conn: Connection, table: str) -> bool:
+        """Whether a table is range-partitioned (PostgreSQL only)"""
+        if not self.postgres:
+            return False
+        return conn.execute(text(
+            "SELECT 1 FROM pg_partitioned_table WHERE partrelid = CAST(:table AS regclass)"
+        ), {'table': table}).first() is not None
+
+    def maintain_partitions(self, table: str, cutoff: Optional[datetime], stamp: str,
+                            months_ahead: Optional[int] = None) -> Dict[str, Any]:
+        """Create the coming months' partitions and drop the ones wholly before cutoff
+
+        An expired partition is archived in batches, detached CONCURRENTLY
+        (PostgreSQL 14+) so writes to the table carry on, and dropped.
+        """
+        if months_ahead is None:
+            months_ahead = int(os.getenv('DB_PARTITION_MONTHS_AHEAD', '3'))
+        stats = {'partitions_created': 0, 'partitions_dropped': 0, 'archived': 0}
+        autocommit = self.engine.connect().execution_options(isolation_level='AUTOCOMMIT')
+        try:
+            # New partitions start where the existing ones end, so they never overlap
+            uppers = [upper.date() for _, _, upper in self.partitions(autocommit, table) if upper is not None]
+            this_month = _month_start(datetime.utcnow().date())
+            last = this_month
+            for _ in range(months_ahead):
+                last = _next_month(last)
+            month = max([this_month] + uppers)
+            while month <= last:
+                autocommit.exec_driver_sql(
+                    f"CREATE TABLE IF NOT EXISTS {partition_name(table, month)} PARTITION OF {table} "
+                    f"FOR VALUES FROM ('{month}') TO ('{_next_month(month)}')"
+                )
+                stats['partitions_created'] += 1
+                month = _next_month(month)
+
+            if cutoff is None:
+                return stats
+            for name, _, upper in self.partitions(autocommit, table):
+                if upper is None or upper > cutoff:
+                    continue
+                archive, archived = self._archive(name, stamp), 0
+                try:
+                    if archive is not None:
+                        archived = self._archive_partition(name, archive)
+                finally:
+                    self._close_archive(archive, name, stamp, archived)
+                stats['archived'] += archived
+                autocommit.exec_driver_sql(f"SET lock_timeout = '{int(self.lock_timeout_ms)}ms'")
+                autocommit.exec_driver_sql(f"ALTER TABLE {table} DETACH PARTITION {name} CONCURRENTLY")
+                autocommit.exec_driver_sql(f"DROP TABLE {name}")
+                stats['partitions_dropped'] += 1
+        finally:
+            autocommit.close()
+        return stats
+
+    def _archive_partition(self, name: str, archive: _JsonlWriter) -> int:
+        """Copy a partition's rows to the archive in id order, batch_size at a time"""
+        archived, after = 0, None
+        with self.engine.connect() as conn:
+            while True:
+                query = f"SELECT * FROM {name}" + (" WHERE id > :after" if after is not None else "") + \
+                    " ORDER BY id LIMIT :limit"
+                rows = [dict(row._mapping) for row in conn.execute(
+                    text(query), {'after': after, 'limit': self.batch_size})]
+                if not rows:
+                    return archived
+                archive.write(rows)
+                archived += len(rows)
+                after = rows[-1]['id']
+
+    def count_expired(self, now: Optional[datetime] = None) -> Dict[str, int]:
+        """Rows each table would lose in a purge now, without deleting anything"""
+        cutoffs = self.cutoffs(now)
+        counts = {}
+        with self.engine.connect() as conn:
+            for table, cutoff in cutoffs.items():
+                source = PitchSession.__table__ if table == 'pitch_sessions' else CHILD_TABLES[table]
+                counts[table] = conn.execute(
+                    select(func.count()).select_from(source).where(source.c.created_at < cutoff)
+                ).scalar()
+        return counts
+
+    def run(self, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """Purge every table with an age set; returns per-table counts, batches and timings"""
+        cutoffs = self.cutoffs(now)
+        stamp = (now or datetime.utcnow()).strftime('%Y%m%dT%H%M%S')
+        started = time.perf_counter()
+        results: Dict[str, Any] = {'cutoffs': {table: cutoff.isoformat() for table, cutoff in cutoffs.items()}}
+
+        sessions_cutoff = cutoffs.get('pitch_sessions')
+        if sessions_cutoff is not None:
+            results['pitch_sessions'] = self.purge_sessions(sessions_cutoff, stamp)
+        for table in PARTITIONABLE_TABLES:
+            with self.engine.connect() as conn:
+                partitioned = self.is_partitioned(conn, table)
+            if partitioned:
+                results[f"{table}_partitions"] = self.maintain_partitions(table, cutoffs.get(table), stamp)
+            cutoff = cutoffs.get(table)
+            # Rows of expired sessions are already gone with their session
+            if cutoff is not None and (sessions_cutoff is None or cutoff > sessions_cutoff):
+                results[table] = self.purge_children(table, cutoff, sessions_cutoff, stamp)
+
+        results['deleted_rows'] = sum(
+            stats.get(table, 0) for name, stats in results.items() if name in RETAINED_TABLES
+            for table in ('sessions',) + tuple(CHILD_TABLES)
+        )
+        results['elapsed_s'] = time.perf_counter() - started
+        results['rows_per_s'] = results['deleted_rows'] / results['elapsed_s'] if results['elapsed_s'] else 0.0
+        return results
+
+
+def main(argv: Optional[List[str]] = None):
+    """Command-line entry point for the retention purge"""
+    parser = argparse.ArgumentParser(description="Purge stored Shark Tank sessions past their retention age")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    purge_parser = commands.add_parser('purge', help="Delete (and optionally archive) expired rows")
+    purge_parser.add_argument('--archive-dir', default=None,
+                              help="Write purged rows here as .jsonl.gz first (default: DB_ARCHIVE_DIR)")
+    purge_parser.add_argument('--dry-run', action='store_true', help="Only count the rows that would go")
+    purge_parser.add_argument('--database', default=None,
+                              help="Connection string (default: DB_CONNECTION_STRING or the DB_* settings)")
+    for table in RETAINED_TABLES:
+        purge_parser.add_argument(f"--{table.replace('_', '-')}-days", type=int, default=None, dest=table,
+                                  help=f"Keep {table} this many days (default: DB_RETENTION_{table.upper()}_DAYS)")
+
+    sql_parser = commands.add_parser('partition-sql',
+                                     help="Print the PostgreSQL statements that partition a table by month")
+    sql_parser.add_argument('table', choices=PARTITIONABLE_TABLES)
+    sql_parser.add_argument('--months-ahead', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    if args.command == 'partition-sql':
+        print("\n".join(partition_conversion_sql(args.table, months_ahead=args.months_ahead)))
+        return
+
+    ttl_days = retention_from_env()
+    for table in RETAINED_TABLES:
+        if getattr(args, table) is not None:
+            if getattr(args, table) < 1:
+                parser.error(f"--{table.replace('_', '-')}-days must be at least 1")
+            ttl_days[table] = getattr(args, table)
+    if not any(ttl_days.values()):
+        print("⚠️ Warning: No retention age set; nothing to purge")
+        return
+
+    db_manager = DatabaseManager(args.database)
+    try:
+        job = RetentionJob(db_manager.engine, ttl_days, archive_dir=args.archive_dir)
+        if args.dry_run:
+            for table, count in job.count_expired().items():
+                print(f"🗑️ {table}: {count:,} rows older than {ttl_days[table]} days")
+            return
+        print(f"🧹 Purging rows older than: " + ", ".join(
+            f"{table} {days} days" for table, days in ttl_days.items() if days))
+        results = job.run()
+        for table in RETAINED_TABLES:
+            if table in results:
+                stats = results[table]
+                counts = ", ".join(f"{stats[name]:,} {name}" for name in ('sessions',) + tuple(CHILD_TABLES)
+                                   if name in stats)
+                print(f"  {table}: {counts} in {stats['batches']} batches "
+                      f"(longest {stats['max_batch_ms']:.0f} ms)")
+            if f"{table}_partitions" in results:
+                stats = results[f"{table}_partitions"]
+                print(f"  {table} partitions: {stats['partitions_created']} created, "
+                      f"{stats['partitions_dropped']} dropped")
+        print(f"✅ Deleted {results['deleted_rows']:,} rows in {results['elapsed_s']:.1f}s "
+              f"({results['rows_per_s']:,.0f} rows/s)")
+        if job.archive_dir:
+            print(f"💾 Archived to {job.archive_dir}")
+    finally:
+        db_manager.close()
+
+
+if __name__ == "__main__":
+    main()
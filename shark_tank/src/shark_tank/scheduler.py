@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+"""
+Q&A scheduler for Shark Tank application
+Decides which sharks ask in each round: sharks who declare they are out
+stop being asked, and every shark asks at most a fixed number of rounds
+"""
+
+import os
+import re
+from typing import Dict, List, Optional
+
+# Phrases a shark uses to drop out ("I'm out", "count me out", "I'll pass", ...)
+OUT_PATTERN = re.compile(
+    r"\b(?:i['’]?m|i\s+am)\s+(?:definitely\s+|officially\s+|sadly\s+)?out\b"
+    r"|\bcount\s+me\s+out\b"
+    r"|\bi['’]?(?:ll|\s+will)\s+(?:have\s+to\s+)?pass\b"
+    r"|\bi['’]?m\s+not\s+(?:interested|investing)\b"
+    r"|\bi\s+am\s+not\s+(?:interested|investing)\b",
+    re.IGNORECASE
+)
+
+# Phrases that show a shark is still keen
+INTEREST_PATTERN = re.compile(
+    r"\b(?:i\s+love|i['’]?m\s+(?:very\s+)?interested|i\s+like\s+(?:this|it|you)|impressed|make\s+(?:you\s+)?an\s+offer)\b",
+    re.IGNORECASE
+)
+
+SCHEDULER_MODES = ('adaptive', 'off')
+
+
+def find_out_signal(text: str) -> Optional[str]:
+    """The sentence in which a shark says they are out, or None"""
+    for sentence in re.split(r'(?<=[.!?])\s+', str(text)):
+        if OUT_PATTERN.search(sentence):
+            return sentence.strip()
+    return None
+
+
+class SharkState:
+    """What the scheduler knows about one shark"""
+
+    __slots__ = ('name', 'rounds_asked', 'interest', 'out_round', 'out_reason')
+
+    def __init__(self, name: str):
+        self.name = name
+        self.rounds_asked = 0
+        # +1 per keen turn; only reported, never used to drop a shark
+        self.interest = 0
+        self.out_round: Optional[int] = None
+        self.out_reason: Optional[str] = None
+
+    @property
+    def out(self) -> bool:
+        return self.out_round is not None
+
+
+class QAScheduler:
+    """Chooses each round's sharks and tracks who has dropped out"""
+
+    def __init__(self, sharks: List[str], mode: Optional[str] = None,
+                 max_rounds_per_shark: Optional[int] = None):
+        """Initialize scheduler
+
+        mode is 'adaptive' (default, SHARK_TANK_SCHEDULER) or 'off', which
+        asks every shark every round like before. max_rounds_per_shark
+        (SHARK_TANK_MAX_SHARK_ROUNDS, 3 by default, 0 for no cap) limits how
+        many questions one shark asks in adaptive mode.
+        """
+        if mode is None:
+            mode = os.getenv('SHARK_TANK_SCHEDULER', 'adaptive')
+        mode = mode.strip().lower()
+        if mode not in SCHEDULER_MODES:
+            raise ValueError(f"Unknown scheduler mode '{mode}', expected one of {SCHEDULER_MODES}")
+        if max_rounds_per_shark is None:
+            max_rounds_per_shark = int(os.getenv('SHARK_TANK_MAX_SHARK_ROUNDS', '3'))
+
+        self.sharks = list(sharks)
+        self.mode = mode
+        self.max_rounds_per_shark = max_rounds_per_shark if mode == 'adaptive' else 0
+        self.reset()
+
+    def reset(self):
+        """Forget every shark's state, e.g. when the session is refreshed"""
+        self.states: Dict[str, SharkState] = {name: SharkState(name) for name in self.sharks}
+        self.questions_skipped = 0
+
+    def is_active(self, shark_name: str) -> bool:
+        """Whether a shark will still be asked questions"""
+        state = self.states[shark_name]
+        if state.out:
+            return False
+        return not self.max_rounds_per_shark or state.rounds_asked < self.max_rounds_per_shark
+
+    def round_sharks(self) -> List[str]:
+        """Sharks that ask in the next round, in speaking order (empty when Q&A is over)"""
+        active = [name for name in self.sharks if self.is_active(name)]
+        self.questions_skipped += len(self.sharks) - len(active) if active else 0
+        return active
+
+    def observe_question(self, shark_name: str, question: str, question_round: int) -> bool:
+        """Read a shark's turn; returns False if the shark has just dropped out
+
+        A shark that drops out is not waiting for an answer, so the founder
+        is not asked to give one.
+        """
+        state = self.states[shark_name]
+        state.rounds_asked += 1
+        if INTEREST_PATTERN.search(str(question)):
+            state.interest += 1
+        if self.mode == 'adaptive':
+            reason = find_out_signal(question)
+            if reason is not None:
+                state.out_round = question_round
+                state.out_reason = reason
+                return False
+        return True
+
+    def is_out(self, shark_name: str) -> bool:
+        """Whether a shark dropped out during the Q&A"""
+        return self.states[shark_name].out
+
+    def out_verdict(self, shark_name: str) -> str:
+        """Verdict for a shark who dropped out, without an LLM call"""
+        state = self.states[shark_name]
+        reason = state.out_reason if len(state.out_reason) <= 120 else state.out_reason[:117] + "..."
+        return f"No (out in round {state.out_round}: \"{reason}\")"
+
+    def stats(self) -> Dict[str, int]:
+        """Sharks out, questions asked and LLM calls the scheduler avoided"""
+        sharks_out = sum(1 for state in self.states.values() if state.out)
+        return {
+            'questions_asked': sum(state.rounds_asked for state in self.states.values()),
+            'sharks_out': sharks_out,
+            'questions_skipped': self.questions_skipped,
+            'verdicts_skipped': sharks_out
+        }
@@ -0,0 +1,565 @@
+#!/usr/bin/env python
+"""
+HTTP service for Shark Tank application
+Hosts many founders' sessions in one process behind a plain ASGI app. Every
+founder shares the process's SharkTank agents, SessionManager and database;
+LLM, session store and database calls run on a thread pool so the event loop
+stays free.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+import traceback
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Set
+
+from .config_loader import ConfigSnapshot, ConfigWatcher, get_config_loader
+from .crew import REQUIRED_TASKS, SHARKS, SharkTank
+from .scheduler import QAScheduler
+
+
+class ServiceError(Exception):
+    """A request the service refuses, answered with an HTTP status and a JSON error"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class FounderSession:
+    """Where one founder is in the pitch -> Q&A -> verdicts flow"""
+
+    def __init__(self, session_id: str, inputs: Dict[str, Any]):
+        self.session_id = session_id
+        self.inputs = inputs
+        self.pitch_session_id: Optional[int] = None
+        self.pitch_result: Any = None
+        self.round = 1
+        self.position = 0
+        self.answered: List[str] = []
+        self.scheduler = QAScheduler([shark_name for shark_name, _ in SHARKS])
+        # Sharks asking in the current round, and their questions, generated
+        # while the founder answers; observed holds those already read
+        self.round_sharks: List[str] = []
+        self.questions: Dict[str, asyncio.Future] = {}
+        self.observed: Dict[str, str] = {}
+        # 'qa' until the founder exits or verdicts are requested, then 'done'
+        self.status = 'qa'
+        self.result: Optional[Dict[str, Any]] = None
+        self.lock = asyncio.Lock()
+        self.last_seen = time.monotonic()
+
+    @property
+    def shark_name(self) -> Optional[str]:
+        """The shark whose turn it is"""
+        if self.position < len(self.round_sharks):
+            return self.round_sharks[self.position]
+        return None
+
+    def state(self) -> Dict[str, Any]:
+        """Public view of the session"""
+        return {
+            'session_id': self.session_id,
+            'status': self.status,
+            'round': self.round,
+            'next_shark': self.shark_name if self.status == 'qa' else None,
+            'answered_sharks': list(dict.fromkeys(self.answered)),
+            'sharks_out': [name for name, _ in SHARKS if self.scheduler.is_out(name)],
+            'qa_count': len(self.answered)
+        }
+
+
+class SharkTankService:
+    """Runs founders' sessions step by step, one HTTP request per step"""
+
+    def __init__(self, tank: Optional[SharkTank] = None, workers: Optional[int] = None,
+                 max_results: Optional[int] = None, idle_timeout: Optional[float] = None):
+        """Initialize the service
+
+        workers is how many LLM and database calls may run at once
+        (SHARK_TANK_SERVICE_WORKERS, 64 by default); max_results is how many
+        finished sessions are kept for GET requests (SHARK_TANK_SERVICE_RESULTS);
+        idle_timeout is how many seconds a running session may go without a
+        request before it is dropped (SHARK_TANK_SERVICE_IDLE_TIMEOUT, 1800).
+        """
+        self.tank = tank or SharkTank()
+        workers = workers or int(os.getenv('SHARK_TANK_SERVICE_WORKERS', '64'))
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='shark-tank-service')
+        # Without an explicit pool every worker may run any agent at the same time
+        if not os.getenv('SHARK_TANK_AGENT_POOL'):
+            self.tank.registry.set_pool_size(workers)
+        self.max_results = max_results or int(os.getenv('SHARK_TANK_SERVICE_RESULTS', '1000'))
+        self.idle_timeout = idle_timeout or float(os.getenv('SHARK_TANK_SERVICE_IDLE_TIMEOUT', '1800'))
+        self.expired = 0
+        self.founders: Dict[str, FounderSession] = {}
+        # Sessions being continued or refreshed while the session store call runs
+        self.starting: Set[str] = set()
+        self.finished: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        # Edits to agents.yaml and tasks.yaml apply without a restart
+        self.config_watcher = ConfigWatcher(get_config_loader(REQUIRED_TASKS), self._reload_config).start()
+
+    def _reload_config(self, previous: ConfigSnapshot, snapshot: ConfigSnapshot):
+        """Rebuild only the agents and tasks an edit changed"""
+        changed_agents, changed_tasks = self.tank.registry.apply_snapshot(snapshot)
+        print(f"🔄 Config reloaded: rebuilding {len(changed_agents)} agents and {len(changed_tasks)} tasks")
+
+    async def _run(self, fn, *args):
+        """Run a blocking call on the service's thread pool"""
+        return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+
+    def _founder(self, session_id: str) -> FounderSession:
+        founder = self.founders.get(session_id)
+        if founder is None:
+            if session_id in self.finished:
+                raise ServiceError(409, f"Session {session_id} has finished")
+            raise ServiceError(404, f"Session {session_id} not found")
+        founder.last_seen = time.monotonic()
+        return founder
+
+    async def _expire_idle(self):
+        """Drop running sessions whose founder has sent no request for idle_timeout
+
+        Founders who disconnect never reach the verdicts, which is where a
+        session is otherwise cleaned up. Sessions in the middle of a request
+        are left alone.
+        """
+        cutoff = time.monotonic() - self.idle_timeout
+        idle = [
+            founder for founder in self.founders.values()
+            if founder.last_seen < cutoff and not founder.lock.locked()
+        ]
+        for founder in idle:
+            self.founders.pop(founder.session_id, None)
+            for pending in founder.questions.values():
+                pending.cancel()
+            self.tank.registry.prompts.pop(founder.session_id)
+            try:
+                await self._run(self.tank.session_manager.cleanup_session, founder.session_id)
+            except Exception as e:
+                print(f"⚠️ Warning: Failed to clean up idle session {founder.session_id}: {e}")
+            self.expired += 1
+
+    def _start_round(self, founder: FounderSession):
+        """Start generating the questions of the founder's current round
+
+        When no shark is left to ask, the Q&A is over.
+        """
+        founder.round_sharks = founder.scheduler.round_sharks()
+        founder.position = 0
+        founder.observed = {}
+        founder.questions = {
+            shark_name: self._submit_question(founder, shark_name)
+            for shark_name in founder.round_sharks
+        }
+        if not founder.round_sharks:
+            founder.status = 'verdicts'
+
+    def _submit_question(self, founder: FounderSession, shark_name: str) -> asyncio.Future:
+        """Generate the shark's question for the founder's current round in the executor"""
+        return asyncio.get_running_loop().run_in_executor(
+            self.executor, self.tank.ask_question,
+            shark_name, founder.pitch_result, founder.round, founder.session_id
+        )
+
+    def _advance(self, founder: FounderSession):
+        """Move to the next shark, starting the next round after the last one"""
+        founder.position += 1
+        if founder.position >= len(founder.round_sharks):
+            founder.round += 1
+            self._start_round(founder)
+
+    async def _current_question(self, founder: FounderSession):
+        """(shark_name, question) waiting for an answer, passing sharks who drop out
+
+        Returns None once the Q&A is over. The caller holds the founder's lock.
+        """
+        while founder.status == 'qa':
+            shark_name = founder.shark_name
+            if shark_name in founder.observed:
+                return shark_name, founder.observed[shark_name]
+            future = founder.questions[shark_name]
+            try:
+                question = str(await asyncio.shield(future))
+            except Exception:
+                # Resubmit so the next request retries instead of re-raising the same failure
+                if founder.questions.get(shark_name) is future:
+                    founder.questions[shark_name] = self._submit_question(founder, shark_name)
+                raise
+            if founder.scheduler.observe_question(shark_name, question, founder.round):
+                founder.observed[shark_name] = question
+                return shark_name, question
+            self._advance(founder)
+        return None
+
+    @staticmethod
+    def _inputs(payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Validate the pitch fields of a request body"""
+        pitch_text = str(payload.get('pitch_text') or '').strip()
+        if not pitch_text:
+            raise ServiceError(400, "pitch_text is required")
+        try:
+            amount_invested = int(str(payload.get('amount_invested') or 100000).replace('$', '').replace(',', ''))
+            percentage_equity = int(str(payload.get('percentage_equity') or 10).replace('%', ''))
+        except ValueError:
+            raise ServiceError(400, "amount_invested and percentage_equity must be whole numbers")
+        return {
+            'pitch_text': pitch_text,
+            'amount_invested': amount_invested,
+            'percentage_equity': percentage_equity
+        }
+
+    async def start(self, payload: Dict[str, Any], session_id: Optional[str] = None,
+                    refresh: bool = False) -> Dict[str, Any]:
+        """Create, continue or refresh a session, store and present the pitch"""
+        inputs = self._inputs(payload)
+        # Sessions only ever accumulate here, so this is where idle ones are dropped
+        await self._expire_idle()
+        sessions = self.tank.session_manager
+        if session_id is None:
+            session_id = await self._run(sessions.create_session, inputs)
+        else:
+            if session_id in self.founders or session_id in self.starting:
+                raise ServiceError(409, f"Session {session_id} is already running")
+            self.starting.add(session_id)
+            try:
+                if refresh:
+                    new_session_id = await self._run(sessions.refresh_session_by_id, session_id, inputs)
+                else:
+                    new_session_id = await self._run(sessions.continue_session, session_id, inputs)
+            finally:
+                self.starting.discard(session_id)
+            session_id = new_session_id
+        inputs['session_id'] = session_id
+
+        founder = FounderSession(session_id, inputs)
+        self.founders[session_id] = founder
+        async with founder.lock:
+            try:
+                pitch_session = await self._run(
+                    lambda: self.tank.db_manager.create_pitch_session(
+                        session_id=session_id,
+                        pitch_text=inputs['pitch_text'],
+                        amount_invested=inputs['amount_invested'],
+                        percentage_equity=inputs['percentage_equity']
+                    )
+                )
+                founder.pitch_session_id = pitch_session.id
+            except Exception as e:
+                print(f"⚠️ Warning: Failed to store pitch in database: {e}")
+
+            try:
+                founder.pitch_result = await self._run(self.tank.run_pitch, inputs, session_id)
+            except Exception:
+                self.founders.pop(session_id, None)
+                self.tank.registry.prompts.pop(session_id)
+                await self._run(sessions.cleanup_session, session_id)
+                raise
+            self._start_round(founder)
+
+        session = await self._run(sessions.get_session, session_id) or {}
+        return {
+            **founder.state(),
+            'session_number': session.get('session_number'),
+            'pitch': str(founder.pitch_result)
+        }
+
+    async def get(self, session_id: str) -> Dict[str, Any]:
+        """State of a running session, or the outcome of a finished one"""
+        if session_id in self.finished:
+            return self.finished[session_id]
+        return self._founder(session_id).state()
+
+    async def question(self, session_id: str) -> Dict[str, Any]:
+        """The question of the shark whose turn it is; sharks who drop out are passed over"""
+        founder = self._founder(session_id)
+        async with founder.lock:
+            current = await self._current_question(founder)
+            if current is None:
+                raise ServiceError(409, "Q&A is over; request the verdicts")
+            shark_name, question = current
+            return {'shark_name': shark_name, 'round': founder.round, 'question': question}
+
+    async def answer(self, session_id: str, answer: str) -> Dict[str, Any]:
+        """Record the founder's answer to the current question; 'exit' ends the Q&A"""
+        founder = self._founder(session_id)
+        answer = str(answer or '').strip()
+        if not answer:
+            raise ServiceError(400, "answer is required")
+        async with founder.lock:
+            if founder.status != 'qa':
+                raise ServiceError(409, "Q&A is over; request the verdicts")
+            if answer.lower() == 'exit':
+                founder.status = 'verdicts'
+                return founder.state()
+
+            current = await self._current_question(founder)
+            if current is None:
+                raise ServiceError(409, "Q&A is over; request the verdicts")
+            shark_name, question = current
+            await self._run(self.tank.session_manager.add_qa_round, session_id, shark_name, question, answer)
+            if founder.pitch_session_id is not None:
+                try:
+                    self.tank.db_manager.queue_qa_entry(
+                        pitch_session_id=founder.pitch_session_id,
+                        shark_name=shark_name,
+                        question=question,
+                        answer=answer,
+                        round_number=founder.round
+                    )
+                except Exception as e:
+                    print(f"⚠️ Warning: Failed to store Q&A in database: {e}")
+            founder.answered.append(shark_name)
+            self._advance(founder)
+            return founder.state()
+
+    async def _verdict(self, shark_name: str, verdict_inputs: Dict[str, Any], session_id: str) -> str:
+        """One shark's verdict; failures and timeouts become a "No" verdict"""
+        timeout = self.tank.verdict_executor.timeout
+        try:
+            return str(await asyncio.wait_for(
+                self._run(self.tank.give_verdict, shark_name, verdict_inputs, session_id), timeout
+            ))
+        except asyncio.TimeoutError:
+            return f"No (verdict timed out after {timeout:g}s)"
+        except Exception as e:
+            return f"No (verdict failed: {e})"
+
+    async def verdicts(self, session_id: str) -> Dict[str, Any]:
+        """End the Q&A, collect every shark's verdict and the recap, and finish the session"""
+        if session_id in self.finished:
+            return self.finished[session_id]
+        founder = self._founder(session_id)
+        async with founder.lock:
+            if founder.result is not None:
+                return founder.result
+            founder.status = 'verdicts'
+            for pending in founder.questions.values():
+                pending.cancel()
+
+            try:
+                await self._run(self.tank.db_manager.flush)
+            except Exception as e:
+                print(f"⚠️ Warning: Failed to store Q&A in database: {e}")
+
+            sessions = self.tank.session_manager
+            conversation_summary = await self._run(sessions.get_session_summary, session_id)
+            verdict_inputs = self.tank.verdict_inputs(founder.inputs, conversation_summary, session_id)
+            scheduler = founder.scheduler
+            # Sharks who dropped out get their verdict without an LLM call
+            engaged = [
+                shark_name for shark_name, _ in SHARKS
+                if shark_name in founder.answered and not scheduler.is_out(shark_name)
+            ]
+            # In panel mode one call covers every engaged shark; the rest are asked on their own
+            panel = {}
+            panel_called = self.tank.uses_panel(engaged)
+            if panel_called:
+                try:
+                    panel = await asyncio.wait_for(
+                        self._run(self.tank.panel_verdicts, engaged, verdict_inputs, session_id),
+                        self.tank.verdict_executor.timeout
+                    )
+                except asyncio.TimeoutError:
+                    print("⚠️ Warning: Panel verdict timed out, asking each shark instead")
+            asked = [shark_name for shark_name in engaged if shark_name not in panel]
+            given = await asyncio.gather(*(
+                self._verdict(shark_name, verdict_inputs, session_id) for shark_name in asked
+            ))
+            verdicts = {**panel, **dict(zip(asked, given))}
+            offers = {
+                shark_name: (scheduler.out_verdict(shark_name) if scheduler.is_out(shark_name)
+                             else verdicts.get(shark_name, "No"))
+                for shark_name, _ in SHARKS
+            }
+            recap = await self._run(
+                self.tank.run_recap, founder.inputs, offers, conversation_summary, session_id
+            )
+            if founder.pitch_session_id is not None:
+                try:
+                    await self._run(self.tank.db_manager.record_outcome,
+                                    founder.pitch_session_id, offers, str(recap))
+                except Exception as e:
+                    print(f"⚠️ Warning: Failed to store offers in database: {e}")
+
+            founder.result = {
+                'session_id': session_id,
+                'status': 'done',
+                'pitch': str(founder.pitch_result),
+                'qa_rounds': [
+                    {
+                        'shark_name': qa['shark_name'],
+                        'question': str(qa['question']),
+                        'answer': qa['answer'],
+                        'round_number': qa['round_number']
+                    }
+                    for qa in conversation_summary['qa_rounds']
+                ],
+                'offers': offers,
+                'recap': str(recap),
+                'scheduler': scheduler.stats(),
+                'verdicts': {
+                    'mode': self.tank.verdict_mode,
+                    'llm_calls': len(asked) + int(panel_called),
+                    'panel_sharks': len(panel),
+                    'fallbacks': len(asked) if panel_called else 0
+                },
+                'prompts': self.tank.registry.prompts.pop(session_id)
+            }
+            founder.status = 'done'
+            await self._run(sessions.cleanup_session, session_id)
+            self.founders.pop(session_id, None)
+            self.finished[session_id] = founder.result
+            while len(self.finished) > self.max_results:
+                self.finished.popitem(last=False)
+            return founder.result
+
+    def health(self) -> Dict[str, Any]:
+        """Liveness and how many sessions the process holds"""
+        return {
+            'status': 'ok',
+            'active_sessions': len(self.founders),
+            'finished_sessions': len(self.finished),
+            'expired_sessions': self.expired
+        }
+
+    def close(self):
+        """Stop the thread pool and config watcher and close the database"""
+        self.config_watcher.stop()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.tank.close()
+
+
+async def _read_json(receive) -> Dict[str, Any]:
+    """Read a request body as a JSON object (empty bodies are {})"""
+    body = b''
+    more = True
+    while more:
+        message = await receive()
+        body += message.get('body', b'')
+        more = message.get('more_body', False)
+    if not body.strip():
+        return {}
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        raise ServiceError(400, "Request body must be JSON")
+    if not isinstance(payload, dict):
+        raise ServiceError(400, "Request body must be a JSON object")
+    return payload
+
+
+async def _send_json(send, status: int, payload: Dict[str, Any]):
+    body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', b'application/json'), (b'content-length', str(len(body)).encode())]
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+class ServiceApp:
+    """ASGI app exposing SharkTankService
+
+    POST /sessions                      create a session from a pitch
+    POST /sessions/{id}/continue        continue an existing session with a new pitch
+    POST /sessions/{id}/refresh         refresh a session (new ID, Q&A reset)
+    GET  /sessions/{id}                 session state, or its outcome once finished
+    GET  /sessions/{id}/question        the current shark's question
+    POST /sessions/{id}/answer          {"answer": "..."}; "exit" ends the Q&A
+    POST /sessions/{id}/verdicts        verdicts and recap; finishes the session
+    GET  /health
+    """
+
+    def __init__(self, service: Optional[SharkTankService] = None):
+        self._service = service
+
+    @property
+    def service(self) -> SharkTankService:
+        # Built on first use so importing the app does not connect to the database
+        if self._service is None:
+            self._service = SharkTankService()
+        return self._service
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            return
+        try:
+            payload = await self._route(scope['method'], scope['path'].rstrip('/'), receive)
+            await _send_json(send, 200, payload)
+        except ServiceError as e:
+            await _send_json(send, e.status, {'error': e.message})
+        except Exception as e:
+            print(f"❌ Error handling {scope['method']} {scope['path']}: {type(e).__name__}: {e}")
+            traceback.print_exc()
+            await _send_json(send, 500, {'error': 'Internal server error'})
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                if self._service is not None:
+                    self._service.close()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _route(self, method: str, path: str, receive) -> Dict[str, Any]:
+        parts = [part for part in path.split('/') if part]
+        if parts == ['health'] and method == 'GET':
+            return self.service.health()
+        if not parts or parts[0] != 'sessions' or len(parts) > 3:
+            raise ServiceError(404, f"No route for {path or '/'}")
+
+        if len(parts) == 1:
+            if method == 'POST':
+                return await self.service.start(await _read_json(receive))
+        elif len(parts) == 2:
+            if method == 'GET':
+                return await self.service.get(parts[1])
+        else:
+            session_id, action = parts[1], parts[2]
+            if method == 'GET' and action == 'question':
+                return await self.service.question(session_id)
+            if method == 'POST' and action in ('continue', 'refresh'):
+                return await self.service.start(
+                    await _read_json(receive), session_id=session_id, refresh=action == 'refresh'
+                )
+            if method == 'POST' and action == 'answer':
+                return await self.service.answer(session_id, (await _read_json(receive)).get('answer'))
+            if method == 'POST' and action == 'verdicts':
+                return await self.service.verdicts(session_id)
+            if action not in ('question', 'continue', 'refresh', 'answer', 'verdicts'):
+                raise ServiceError(404, f"No route for {path}")
+        raise ServiceError(405, f"{method} not allowed on {path}")
+
+
+# ASGI entry point, e.g. `uvicorn shark_tank.service:app`
+app = ServiceApp()
+
+
+def main(argv: Optional[List[str]] = None):
+    """Serve the ASGI app with uvicorn"""
+    parser = argparse.ArgumentParser(description="Serve Shark Tank sessions over HTTP")
+    parser.add_argument('--host', default=os.getenv('SHARK_TANK_HOST', '127.0.0.1'))
+    parser.add_argument('--port', type=int, default=int(os.getenv('SHARK_TANK_PORT', '8000')))
+    args = parser.parse_args(argv)
+
+    try:
+        import uvicorn
+    except ImportError:
+        raise SystemExit("❌ The service needs uvicorn: pip install 'shark_tank[service]'")
+    uvicorn.run(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,15 +6,34 @@ Handles unique session ID generation and session tracking
 
 import uuid
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
+
+from .context_builder import ConversationContext
+from .session_store import SessionBackend, StripedLock, backend_from_env
 
 class SessionManager:
-    """Manages session creation and tracking"""
+    """Manages session creation and tracking
+
+    Safe to share between threads. Operations on one session (appending Q&A,
+    refreshing, summarizing) hold that session's stripe of a StripedLock, so
+    different sessions rarely wait on each other.
+    """
+    
+    def __init__(self, backend: Optional[SessionBackend] = None):
+        """Initialize session manager
+
+        backend stores the sessions; by default SHARK_TANK_SESSION_BACKEND
+        picks process memory ('memory', the default) or a shared SQLite file
+        ('sqlite').
+        """
+        self.backend = backend if backend is not None else backend_from_env()
+        self.contexts = {}  # Incrementally built conversation context per session
+        self._locks = StripedLock()
     
-    def __init__(self):
-        """Initialize session manager"""
-        self.active_sessions = {}
-        self.session_counter = 1  # Track session numbers
+    @property
+    def session_counter(self) -> int:
+        """Number the next new session will get"""
+        return self.backend.peek_session_number()
     
     def create_session(self, pitch_data: Dict[str, Any]) -> str:
         """Create a new session with unique ID"""
@@ -22,163 +41,167 @@ class SessionManager:
         
         session_data = {
             'session_id': session_id,
-            'session_number': self.session_counter,  # Add session number
+            'session_number': self.backend.allocate_session_number(),
             'created_at': datetime.utcnow(),
             'pitch_data': pitch_data,
             'qa_rounds': [],
             'current_round': 1
         }
         
-        self.active_sessions[session_id] = session_data
-        self.session_counter += 1  # Increment counter
+        self.backend.insert(session_data)
         return session_id
     
     def continue_session(self, session_id: str, pitch_data: Dict[str, Any]) -> str:
         """Continue with an existing session ID, updating pitch data if needed"""
-        if session_id in self.active_sessions:
-            # Update existing session with new pitch data
-            existing_session = self.active_sessions[session_id]
-            existing_session['pitch_data'].update(pitch_data)
-            existing_session['updated_at'] = datetime.utcnow()
-            print(f"✅ Continuing with existing session #{existing_session['session_number']}")
-            return session_id
-        else:
-            # Session not found, create new one
-            print(f"⚠️  Session {session_id} not found, creating new session...")
-            return self.create_session(pitch_data)
+        with self._locks(session_id):
+            if self.backend.update_pitch_data(session_id, pitch_data):
+                existing_session = self.backend.get(session_id)
+                print(f"✅ Continuing with existing session #{existing_session['session_number']}")
+                return session_id
+        # Session not found, create new one
+        print(f"⚠️  Session {session_id} not found, creating new session...")
+        return self.create_session(pitch_data)
     
     def refresh_session(self, session_id: str) -> str:
-        """Refresh/reset an existing session to start over"""
-        if session_id not in self.active_sessions:
-            raise ValueError(f"Session {session_id} not found")
-        
-        # Get the original session data
-        original_session = self.active_sessions[session_id]
-        
-        # Create a new session with the same pitch data but fresh Q&A
-        new_session_id = str(uuid.uuid4())
-        
-        session_data = {
-            'session_id': new_session_id,
-            'session_number': self.session_counter,  # New session number
-            'created_at': datetime.utcnow(),
-            'pitch_data': original_session['pitch_data'],  # Keep original pitch
-            'qa_entries': [],  # Fresh Q&A rounds
-            'current_round': 1  # Reset to round 1
-        }
-        
-        # Remove old session and add new one
-        del self.active_sessions[session_id]
-        self.active_sessions[new_session_id] = session_data
-        self.session_counter += 1
-        
-        return new_session_id
+        """Refresh/reset an existing session to start over
+
+        Only one of several concurrent refreshes of a session succeeds; the
+        others find it gone and raise ValueError.
+        """
+        with self._locks(session_id):
+            original_session = self.backend.get(session_id)
+            if original_session is None:
+                raise ValueError(f"Session {session_id} not found")
+            
+            # Remove old session and create a new one with the same pitch data but fresh Q&A
+            self.backend.delete(session_id)
+            self.contexts.pop(session_id, None)
+        return self.create_session(original_session['pitch_data'])
     
     def refresh_session_by_id(self, session_id: str, pitch_data: Dict[str, Any]) -> str:
         """Refresh a session by ID, keeping the pitch data"""
-        if session_id in self.active_sessions:
+        try:
             # Refresh existing session
             new_session_id = self.refresh_session(session_id)
-            # Update pitch data if provided
-            if pitch_data:
-                self.active_sessions[new_session_id]['pitch_data'].update(pitch_data)
-            return new_session_id
-        else:
+        except ValueError:
             # Session not found, create new one
             print(f"⚠️  Session {session_id} not found, creating new session...")
             return self.create_session(pitch_data)
+        # Update pitch data if provided
+        if pitch_data:
+            self.backend.update_pitch_data(new_session_id, pitch_data)
+        return new_session_id
     
     def reset_to_session_1(self) -> str:
         """Reset completely and start from session 1"""
-        # Clear all active sessions
-        self.active_sessions.clear()
-        
-        # Reset session counter
-        self.session_counter = 1
+        with self._locks.all():
+            # Clear all active sessions
+            self.backend.clear()
+            self.contexts.clear()
+            
+            # Reset session counter
+            self.backend.reset_session_numbers()
         
         # Create a fresh session 1
         return self.create_session({})
     
     def get_session(self, session_id: str) -> Dict[str, Any]:
         """Get session data by ID"""
-        return self.active_sessions.get(session_id)
+        return self.backend.get(session_id)
     
     def get_session_by_number(self, session_number: int) -> Dict[str, Any]:
         """Get session data by session number"""
-        for session in self.active_sessions.values():
-            if session['session_number'] == session_number:
-                return session
-        return None
+        return self.backend.get_by_number(session_number)
     
     def add_qa_round(self, session_id: str, shark_name: str, question: str, answer: str):
         """Add a Q&A round to the session"""
-        if session_id in self.active_sessions:
-            qa_round = {
+        with self._locks(session_id):
+            # Fetch the context first so a freshly built one does not count this round twice
+            context = self._get_context(session_id)
+            if context is None:
+                return
+            qa_round = self.backend.append_qa_round(session_id, {
                 'shark_name': shark_name,
                 'question': question,
                 'answer': answer,
-                'round_number': self.active_sessions[session_id]['current_round'],
                 'timestamp': datetime.utcnow()
-            }
-            
-            self.active_sessions[session_id]['qa_rounds'].append(qa_round)
-            self.active_sessions[session_id]['current_round'] += 1
+            })
+            if qa_round is not None:
+                context.add_qa(shark_name, qa_round['round_number'], question, answer)
     
-    def get_session_summary(self, session_id: str) -> Dict[str, Any]:
-        """Get a summary of the session for the sharks to make decisions"""
-        if session_id not in self.active_sessions:
-            return None
-        
-        session = self.active_sessions[session_id]
-        
-        # Build conversation summary
-        summary_parts = [
+    def _summary_header(self, session: Dict[str, Any]) -> List[str]:
+        """Session and pitch lines at the top of the conversation summary"""
+        return [
             f"Session #{session['session_number']}",
             f"Pitch: {session['pitch_data'].get('pitch_text', 'N/A')}",
             f"Investment Request: ${session['pitch_data'].get('amount_invested', 0):,} for {session['pitch_data'].get('percentage_equity', 0)}% equity"
         ]
-        
-        if session['qa_rounds']:
-            summary_parts.append("\nQ&A History:")
+    
+    def _get_context(self, session_id: str, session: Optional[Dict[str, Any]] = None) -> Optional[ConversationContext]:
+        """Get a session's conversation context, building it from its Q&A if missing
+
+        Callers hold the session's lock.
+        """
+        context = self.contexts.get(session_id)
+        if context is None:
+            session = session or self.backend.get(session_id)
+            if session is None:
+                return None
+            context = ConversationContext(self._summary_header(session))
             for qa in session['qa_rounds']:
-                summary_parts.append(f"\n{qa['shark_name']} (Round {qa['round_number']}):")
-                summary_parts.append(f"Q: {qa['question']}")
-                summary_parts.append(f"A: {qa['answer']}")
-        
-        return {
-            'session_id': session_id,
-            'session_number': session['session_number'],
-            'pitch_data': session['pitch_data'],
-            'qa_rounds': session['qa_rounds'],
-            'conversation_summary': "\n".join(summary_parts),
-            'total_qa_rounds': len(session['qa_rounds'])
-        }
+                context.add_qa(qa['shark_name'], qa['round_number'], qa['question'], qa['answer'])
+            self.contexts[session_id] = context
+        return context
+    
+    def get_session_summary(self, session_id: str) -> Dict[str, Any]:
+        """Get a summary of the session for the sharks to make decisions"""
+        with self._locks(session_id):
+            session = self.backend.get(session_id)
+            if session is None:
+                return None
+            
+            # The summary is appended to as Q&A arrives and kept within a token
+            # budget, so it is not rebuilt here
+            context = self._get_context(session_id, session)
+            context.set_header(self._summary_header(session))
+            
+            return {
+                'session_id': session_id,
+                'session_number': session['session_number'],
+                'pitch_data': session['pitch_data'],
+                'qa_rounds': list(session['qa_rounds']),
+                'conversation_summary': context.render(),
+                'total_qa_rounds': len(session['qa_rounds'])
+            }
     
     def cleanup_session(self, session_id: str):
         """Clean up session data"""
-        if session_id in self.active_sessions:
-            del self.active_sessions[session_id]
+        with self._locks(session_id):
+            self.backend.delete(session_id)
+            self.contexts.pop(session_id, None)
     
-    def list_active_sessions(self) -> list:
-        """List all active session IDs with their numbers"""
+    def list_active_sessions(self, created_after: Optional[datetime] = None,
+                             limit: Optional[int] = None) -> list:
+        """List active session IDs with their numbers, oldest first"""
         return [
             {
-                'session_id': session_id,
+                'session_id': session['session_id'],
                 'session_number': session['session_number'],
                 'created_at': session['created_at'],
                 'pitch_text': session['pitch_data'].get('pitch_text', 'N/A')[:50] + '...'
             }
-            for session_id, session in self.active_sessions.items()
+            for session in self.backend.list_headers(created_after=created_after, limit=limit)
         ]
     
-    def get_session_stats(self) -> Dict[str, Any]:
-        """Get statistics about all sessions"""
-        total_sessions = len(self.active_sessions)
-        total_qa_rounds = sum(len(session['qa_rounds']) for session in self.active_sessions.values())
-        
+    def get_session_stats(self, include_sessions: bool = True) -> Dict[str, Any]:
+        """Get statistics about all sessions
+
+        The totals are counters kept by the backend; include_sessions=False
+        skips listing every session.
+        """
         return {
-            'total_active_sessions': total_sessions,
-            'total_qa_rounds': total_qa_rounds,
-            'next_session_number': self.session_counter,
-            'sessions': self.list_active_sessions()
+            'total_active_sessions': self.backend.count(),
+            'total_qa_rounds': self.backend.total_qa_rounds(),
+            'next_session_number': self.backend.peek_session_number(),
+            'sessions': self.list_active_sessions() if include_sessions else []
         }
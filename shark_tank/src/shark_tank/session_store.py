@@ -0,0 +1,530 @@
+#!/usr/bin/env python
+"""
+Session storage backends for Shark Tank application
+In-memory storage with secondary indexes, and an SQLite file that separate
+processes (the app, view_sessions.py, manage_sessions.py) can share
+"""
+
+import bisect
+import contextlib
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+from .env import load_env
+
+DEFAULT_SESSION_DB = os.path.join(os.path.expanduser('~'), '.shark_tank', 'sessions.sqlite3')
+
+
+def session_header(session: Dict[str, Any]) -> Dict[str, Any]:
+    """Lightweight view of a session used for listings"""
+    return {
+        'session_id': session['session_id'],
+        'session_number': session['session_number'],
+        'created_at': session['created_at'],
+        'pitch_data': session['pitch_data'],
+        'qa_count': len(session['qa_rounds'])
+    }
+
+
+class StripedLock:
+    """A fixed set of re-entrant locks, each key always mapping to the same one
+
+    Sessions on different stripes never wait for each other, and the number
+    of locks stays the same however many sessions there are.
+    """
+
+    def __init__(self, stripes: Optional[int] = None):
+        """Initialize with SHARK_TANK_SESSION_LOCK_STRIPES (64 by default) locks"""
+        if stripes is None:
+            stripes = int(os.getenv('SHARK_TANK_SESSION_LOCK_STRIPES', '64'))
+        self._locks = [threading.RLock() for _ in range(max(1, stripes))]
+
+    def __len__(self) -> int:
+        return len(self._locks)
+
+    def index(self, key: Any) -> int:
+        """Stripe a key belongs to"""
+        return hash(key) % len(self._locks)
+
+    def __call__(self, key: Any) -> threading.RLock:
+        """Lock guarding a key"""
+        return self._locks[self.index(key)]
+
+    @contextlib.contextmanager
+    def all(self) -> Iterator[None]:
+        """Hold every stripe, always taken in the same order, e.g. to clear everything"""
+        with contextlib.ExitStack() as stack:
+            for lock in self._locks:
+                stack.enter_context(lock)
+            yield
+
+
+class SessionBackend:
+    """Storage interface used by SessionManager
+
+    Sessions are dicts with session_id, session_number, created_at,
+    pitch_data, qa_rounds and current_round keys.
+    """
+
+    def allocate_session_number(self) -> int:
+        """Reserve and return the next session number"""
+        raise NotImplementedError
+
+    def peek_session_number(self) -> int:
+        """Next session number, without reserving it"""
+        raise NotImplementedError
+
+    def reset_session_numbers(self):
+        """Start numbering from 1 again"""
+        raise NotImplementedError
+
+    def insert(self, session: Dict[str, Any]):
+        """Store a new session"""
+        raise NotImplementedError
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Get a session by ID"""
+        raise NotImplementedError
+
+    def get_by_number(self, session_number: int) -> Optional[Dict[str, Any]]:
+        """Get a session by its session number"""
+        raise NotImplementedError
+
+    def delete(self, session_id: str) -> bool:
+        """Remove a session; returns whether it existed"""
+        raise NotImplementedError
+
+    def clear(self):
+        """Remove every session"""
+        raise NotImplementedError
+
+    def update_pitch_data(self, session_id: str, pitch_data: Dict[str, Any]) -> bool:
+        """Merge pitch data into a session; returns whether it existed"""
+        raise NotImplementedError
+
+    def append_qa_round(self, session_id: str, qa_round: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Append a Q&A round numbered with the session's current round
+
+        Returns the stored round (with round_number set), or None if the
+        session does not exist.
+        """
+        raise NotImplementedError
+
+    def list_headers(self, created_after: Optional[datetime] = None,
+                     limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Session headers in creation order, optionally from a point in time"""
+        raise NotImplementedError
+
+    def count(self) -> int:
+        """Number of stored sessions"""
+        raise NotImplementedError
+
+    def total_qa_rounds(self) -> int:
+        """Number of Q&A rounds across all stored sessions"""
+        raise NotImplementedError
+
+    def close(self):
+        """Release any resources held by the backend"""
+
+
+class InMemorySessionBackend(SessionBackend):
+    """Sessions in process memory, indexed by ID, number and creation time
+
+    Safe to share between threads: a session's own data is guarded by its
+    stripe of a StripedLock, the shared indexes by a short index lock and
+    session numbers by their own lock.
+    """
+
+    def __init__(self, stripes: Optional[int] = None):
+        self._sessions: Dict[str, Dict[str, Any]] = {}
+        self._by_number: Dict[int, str] = {}
+        # (created_at, sequence, session_id), sorted; deleted IDs are skipped
+        # lazily and compacted away once they make up half the index
+        self._by_created: List[tuple] = []
+        self._sequence = 0
+        self._deleted_in_index = 0
+        self._next_number = 1
+        self._stripes = StripedLock(stripes)
+        self._index_lock = threading.Lock()
+        self._number_lock = threading.Lock()
+        # Q&A rounds counted per stripe, so appends only take their session's lock
+        self._qa_rounds = [0] * len(self._stripes)
+
+    def allocate_session_number(self) -> int:
+        with self._number_lock:
+            number = self._next_number
+            self._next_number += 1
+            return number
+
+    def peek_session_number(self) -> int:
+        return self._next_number
+
+    def reset_session_numbers(self):
+        with self._number_lock:
+            self._next_number = 1
+
+    def insert(self, session: Dict[str, Any]):
+        session_id = session['session_id']
+        stripe = self._stripes.index(session_id)
+        with self._stripes(session_id):
+            self._remove(session_id)
+            with self._index_lock:
+                self._sessions[session_id] = session
+                self._by_number[session['session_number']] = session_id
+                self._sequence += 1
+                entry = (session['created_at'], self._sequence, session_id)
+                if not self._by_created or entry >= self._by_created[-1]:
+                    self._by_created.append(entry)
+                else:
+                    bisect.insort(self._by_created, entry)
+            self._qa_rounds[stripe] += len(session['qa_rounds'])
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        return self._sessions.get(session_id)
+
+    def get_by_number(self, session_number: int) -> Optional[Dict[str, Any]]:
+        session_id = self._by_number.get(session_number)
+        return self._sessions.get(session_id) if session_id else None
+
+    def _remove(self, session_id: str) -> bool:
+        """Delete a session; the caller holds its stripe"""
+        with self._index_lock:
+            session = self._sessions.pop(session_id, None)
+            if session is None:
+                return False
+            if self._by_number.get(session['session_number']) == session_id:
+                del self._by_number[session['session_number']]
+            self._deleted_in_index += 1
+            if self._deleted_in_index * 2 > len(self._by_created):
+                self._by_created = [entry for entry in self._by_created if entry[2] in self._sessions]
+                self._deleted_in_index = 0
+        self._qa_rounds[self._stripes.index(session_id)] -= len(session['qa_rounds'])
+        return True
+
+    def delete(self, session_id: str) -> bool:
+        with self._stripes(session_id):
+            return self._remove(session_id)
+
+    def clear(self):
+        with self._stripes.all(), self._index_lock:
+            self._sessions.clear()
+            self._by_number.clear()
+            self._by_created = []
+            self._deleted_in_index = 0
+            self._qa_rounds = [0] * len(self._stripes)
+
+    def update_pitch_data(self, session_id: str, pitch_data: Dict[str, Any]) -> bool:
+        with self._stripes(session_id):
+            session = self._sessions.get(session_id)
+            if session is None:
+                return False
+            session['pitch_data'].update(pitch_data)
+            session['updated_at'] = datetime.utcnow()
+            return True
+
+    def append_qa_round(self, session_id: str, qa_round: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        with self._stripes(session_id):
+            session = self._sessions.get(session_id)
+            if session is None:
+                return None
+            qa_round = dict(qa_round, round_number=session['current_round'])
+            session['qa_rounds'].append(qa_round)
+            session['current_round'] += 1
+            self._qa_rounds[self._stripes.index(session_id)] += 1
+            return qa_round
+
+    def list_headers(self, created_after: Optional[datetime] = None,
+                     limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        with self._index_lock:
+            start = 0
+            if created_after is not None:
+                start = bisect.bisect_right(self._by_created, (created_after, float('inf'), ''))
+            entries = self._by_created[start:]
+        headers = []
+        for _, _, session_id in entries:
+            session = self._sessions.get(session_id)
+            if session is not None and session['session_id'] == session_id:
+                headers.append(session_header(session))
+                if limit is not None and len(headers) >= limit:
+                    break
+        return headers
+
+    def count(self) -> int:
+        return len(self._sessions)
+
+    def total_qa_rounds(self) -> int:
+        return sum(self._qa_rounds)
+
+
+class SQLiteSessionBackend(SessionBackend):
+    """Sessions in an SQLite file, shared between processes"""
+
+    def __init__(self, path: Optional[str] = None):
+        """Open (and create if needed) the session database at path"""
+        if path is None:
+            path = os.getenv('SHARK_TANK_SESSION_DB', DEFAULT_SESSION_DB)
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        if path != ':memory:':
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS sessions (
+                session_id TEXT PRIMARY KEY,
+                session_number INTEGER NOT NULL,
+                created_at TEXT NOT NULL,
+                updated_at TEXT,
+                pitch_data TEXT NOT NULL,
+                current_round INTEGER NOT NULL,
+                qa_count INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE INDEX IF NOT EXISTS ix_sessions_number ON sessions (session_number);
+            CREATE INDEX IF NOT EXISTS ix_sessions_created_at ON sessions (created_at);
+            CREATE TABLE IF NOT EXISTS session_qa_rounds (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                session_id TEXT NOT NULL REFERENCES sessions (session_id) ON DELETE CASCADE,
+                shark_name TEXT NOT NULL,
+                question TEXT NOT NULL,
+                answer TEXT NOT NULL,
+                round_number INTEGER NOT NULL,
+                timestamp TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS ix_session_qa_rounds_session ON session_qa_rounds (session_id, id);
+            CREATE TABLE IF NOT EXISTS session_counters (
+                name TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            );
+            INSERT OR IGNORE INTO session_counters (name, value) VALUES
+                ('next_session_number', 1), ('session_count', 0), ('total_qa_rounds', 0);
+            """
+        )
+        self._conn.execute("PRAGMA foreign_keys=ON")
+
+    def _transaction(self):
+        """Exclusive write transaction (other processes wait on the file lock)"""
+        backend = self
+
+        class _Transaction:
+            def __enter__(self):
+                backend._lock.acquire()
+                backend._conn.execute("BEGIN IMMEDIATE")
+                return backend._conn
+
+            def __exit__(self, exc_type, exc, tb):
+                try:
+                    backend._conn.execute("ROLLBACK" if exc_type else "COMMIT")
+                finally:
+                    backend._lock.release()
+                return False
+
+        return _Transaction()
+
+    def _counter(self, conn, name: str) -> int:
+        return conn.execute("SELECT value FROM session_counters WHERE name = ?", (name,)).fetchone()[0]
+
+    def _bump(self, conn, name: str, delta: int):
+        conn.execute("UPDATE session_counters SET value = value + ? WHERE name = ?", (delta, name))
+
+    @staticmethod
+    def _encode_time(value: Optional[datetime]) -> Optional[str]:
+        return value.isoformat() if value else None
+
+    @staticmethod
+    def _decode_time(value: Optional[str]) -> Optional[datetime]:
+        return datetime.fromisoformat(value) if value else None
+
+    def allocate_session_number(self) -> int:
+        with self._transaction() as conn:
+            number = self._counter(conn, 'next_session_number')
+            self._bump(conn, 'next_session_number', 1)
+            return number
+
+    def peek_session_number(self) -> int:
+        with self._lock:
+            return self._counter(self._conn, 'next_session_number')
+
+    def reset_session_numbers(self):
+        with self._transaction() as conn:
+            conn.execute("UPDATE session_counters SET value = 1 WHERE name = 'next_session_number'")
+
+    def insert(self, session: Dict[str, Any]):
+        with self._transaction() as conn:
+            self._delete(conn, session['session_id'])
+            conn.execute(
+                "INSERT INTO sessions (session_id, session_number, created_at, updated_at,"
+                " pitch_data, current_round, qa_count) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    session['session_id'],
+                    session['session_number'],
+                    self._encode_time(session['created_at']),
+                    self._encode_time(session.get('updated_at')),
+                    json.dumps(session['pitch_data'], default=str),
+                    session['current_round'],
+                    len(session['qa_rounds'])
+                )
+            )
+            for qa_round in session['qa_rounds']:
+                self._insert_qa_round(conn, session['session_id'], qa_round)
+            self._bump(conn, 'session_count', 1)
+            self._bump(conn, 'total_qa_rounds', len(session['qa_rounds']))
+
+    def _insert_qa_round(self, conn, session_id: str, qa_round: Dict[str, Any]):
+        conn.execute(
+            "INSERT INTO session_qa_rounds (session_id, shark_name, question, answer, round_number, timestamp)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                session_id,
+                qa_round['shark_name'],
+                str(qa_round['question']),
+                str(qa_round['answer']),
+                qa_round['round_number'],
+                self._encode_time(qa_round['timestamp'])
+            )
+        )
+
+    def _load(self, row: Optional[sqlite3.Row]) -> Optional[Dict[str, Any]]:
+        """Turn a sessions row (plus its Q&A rounds) into a session dict"""
+        if row is None:
+            return None
+        qa_rows = self._conn.execute(
+            "SELECT shark_name, question, answer, round_number, timestamp FROM session_qa_rounds"
+            " WHERE session_id = ? ORDER BY id",
+            (row['session_id'],)
+        ).fetchall()
+        session = {
+            'session_id': row['session_id'],
+            'session_number': row['session_number'],
+            'created_at': self._decode_time(row['created_at']),
+            'pitch_data': json.loads(row['pitch_data']),
+            'qa_rounds': [
+                {
+                    'shark_name': qa['shark_name'],
+                    'question': qa['question'],
+                    'answer': qa['answer'],
+                    'round_number': qa['round_number'],
+                    'timestamp': self._decode_time(qa['timestamp'])
+                }
+                for qa in qa_rows
+            ],
+            'current_round': row['current_round']
+        }
+        if row['updated_at']:
+            session['updated_at'] = self._decode_time(row['updated_at'])
+        return session
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+            return self._load(row)
+
+    def get_by_number(self, session_number: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM sessions WHERE session_number = ? ORDER BY created_at DESC LIMIT 1",
+                (session_number,)
+            ).fetchone()
+            return self._load(row)
+
+    def _delete(self, conn, session_id: str) -> bool:
+        row = conn.execute("SELECT qa_count FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+        if row is None:
+            return False
+        conn.execute("DELETE FROM session_qa_rounds WHERE session_id = ?", (session_id,))
+        conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+        self._bump(conn, 'session_count', -1)
+        self._bump(conn, 'total_qa_rounds', -row['qa_count'])
+        return True
+
+    def delete(self, session_id: str) -> bool:
+        with self._transaction() as conn:
+            return self._delete(conn, session_id)
+
+    def clear(self):
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM session_qa_rounds")
+            conn.execute("DELETE FROM sessions")
+            conn.execute("UPDATE session_counters SET value = 0 WHERE name IN ('session_count', 'total_qa_rounds')")
+
+    def update_pitch_data(self, session_id: str, pitch_data: Dict[str, Any]) -> bool:
+        with self._transaction() as conn:
+            row = conn.execute("SELECT pitch_data FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+            if row is None:
+                return False
+            merged = json.loads(row['pitch_data'])
+            merged.update(pitch_data)
+            conn.execute(
+                "UPDATE sessions SET pitch_data = ?, updated_at = ? WHERE session_id = ?",
+                (json.dumps(merged, default=str), self._encode_time(datetime.utcnow()), session_id)
+            )
+            return True
+
+    def append_qa_round(self, session_id: str, qa_round: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        with self._transaction() as conn:
+            row = conn.execute("SELECT current_round FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+            if row is None:
+                return None
+            qa_round = dict(qa_round, round_number=row['current_round'])
+            self._insert_qa_round(conn, session_id, qa_round)
+            conn.execute(
+                "UPDATE sessions SET current_round = current_round + 1, qa_count = qa_count + 1"
+                " WHERE session_id = ?",
+                (session_id,)
+            )
+            self._bump(conn, 'total_qa_rounds', 1)
+            return qa_round
+
+    def list_headers(self, created_after: Optional[datetime] = None,
+                     limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        query = "SELECT session_id, session_number, created_at, pitch_data, qa_count FROM sessions"
+        params: List[Any] = []
+        if created_after is not None:
+            query += " WHERE created_at > ?"
+            params.append(self._encode_time(created_after))
+        query += " ORDER BY created_at"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [
+            {
+                'session_id': row['session_id'],
+                'session_number': row['session_number'],
+                'created_at': self._decode_time(row['created_at']),
+                'pitch_data': json.loads(row['pitch_data']),
+                'qa_count': row['qa_count']
+            }
+            for row in rows
+        ]
+
+    def count(self) -> int:
+        with self._lock:
+            return self._counter(self._conn, 'session_count')
+
+    def total_qa_rounds(self) -> int:
+        with self._lock:
+            return self._counter(self._conn, 'total_qa_rounds')
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def backend_from_env() -> SessionBackend:
+    """Create the backend named by SHARK_TANK_SESSION_BACKEND ('memory' by default, or 'sqlite')"""
+    load_env()
+    name = os.getenv('SHARK_TANK_SESSION_BACKEND', 'memory').strip().lower()
+    if name == 'memory':
+        return InMemorySessionBackend()
+    if name == 'sqlite':
+        return SQLiteSessionBackend()
+    raise ValueError(f"Unknown session backend '{name}', expected 'sqlite' or 'memory'")
@@ -0,0 +1,193 @@
+#!/usr/bin/env python
+"""
+Token streaming for Shark Tank application
+Prints shark questions, verdicts and the moderator recap to the terminal as
+the LLM generates them, and records time-to-first-token per phase
+"""
+
+import os
+import sys
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+# crewai agents answer in "Thought: ... Final Answer: ..." form; only the
+# final answer is shown to the founder
+FINAL_ANSWER_MARKER = "Final Answer:"
+
+# Consoles that receive LLM stream events. crewai's event bus cannot remove a
+# handler, so one pair of handlers per process dispatches to the live consoles
+_live_consoles: "weakref.WeakSet[StreamingConsole]" = weakref.WeakSet()
+_handlers_lock = threading.Lock()
+_handlers_registered = False
+
+
+def _register_handlers():
+    """Subscribe to crewai's LLM events (once per process)"""
+    global _handlers_registered
+    with _handlers_lock:
+        if _handlers_registered:
+            return
+        from crewai.events import LLMCallStartedEvent, LLMStreamChunkEvent, crewai_event_bus
+
+        @crewai_event_bus.on(LLMCallStartedEvent)
+        def on_call_started(source, event):
+            for console in list(_live_consoles):
+                console._on_call_started(event.task_name)
+
+        @crewai_event_bus.on(LLMStreamChunkEvent)
+        def on_chunk(source, event):
+            if event.tool_call is None:
+                for console in list(_live_consoles):
+                    console._on_chunk(event.task_name, event.chunk)
+
+        _handlers_registered = True
+
+
+class _TaskStream:
+    """Raw tokens of the current LLM call for one task"""
+
+    def __init__(self):
+        self.raw = ""
+        self.printed = 0
+        self.attached = False
+        self.first_token_at: Optional[float] = None
+
+    def visible_text(self) -> str:
+        """Text after the final answer marker, or nothing until it appears"""
+        index = self.raw.rfind(FINAL_ANSWER_MARKER)
+        if index < 0:
+            return ""
+        return self.raw[index + len(FINAL_ANSWER_MARKER):].lstrip()
+
+
+class ShownStream:
+    """Handle for one streamed output while it is on screen"""
+
+    def __init__(self, task_name: str, header: str):
+        self.task_name = task_name
+        self.header = header
+        self.full_text: Optional[str] = None
+
+    def finish(self, full_text: str):
+        """Record the complete text; printed in full if nothing was streamed"""
+        self.full_text = str(full_text)
+
+
+class StreamingConsole:
+    """Routes LLM stream chunks to the terminal, one task at a time"""
+
+    def __init__(self, enabled: Optional[bool] = None, out=None):
+        """Initialize console; streaming defaults to the SHARK_TANK_STREAM env var"""
+        if enabled is None:
+            enabled = os.getenv('SHARK_TANK_STREAM', '').strip().lower() in ('1', 'true', 'yes', 'on')
+        self.enabled = enabled
+        self.out = out or sys.stdout
+        self._streams: Dict[str, _TaskStream] = {}
+        self._lock = threading.Lock()
+
+        # Seconds from "founder starts waiting" to "first token on screen", per phase
+        self.time_to_first_token: Dict[str, List[float]] = {}
+        # Seconds from "founder starts waiting" to "output complete", per phase
+        self.total_time: Dict[str, List[float]] = {}
+
+        if self.enabled:
+            _register_handlers()
+            _live_consoles.add(self)
+
+    def close(self):
+        """Stop receiving stream events"""
+        _live_consoles.discard(self)
+
+    def _on_call_started(self, task_name: Optional[str]):
+        """A new LLM call starts over a task's stream unless it is already on screen"""
+        if not task_name:
+            return
+        with self._lock:
+            stream = self._streams.get(task_name)
+            if stream is None or not stream.attached or stream.printed == 0:
+                attached = stream.attached if stream else False
+                stream = _TaskStream()
+                stream.attached = attached
+                self._streams[task_name] = stream
+
+    def _on_chunk(self, task_name: Optional[str], chunk: str):
+        """Buffer a chunk and print it right away if its task is on screen"""
+        if not task_name or not chunk:
+            return
+        with self._lock:
+            stream = self._streams.setdefault(task_name, _TaskStream())
+            stream.raw += chunk
+            if stream.attached:
+                self._print_new_text(stream)
+
+    def _print_new_text(self, stream: _TaskStream):
+        """Print the part of a stream's final answer not shown yet"""
+        visible = stream.visible_text()
+        if len(visible) > stream.printed:
+            if stream.first_token_at is None:
+                stream.first_token_at = time.perf_counter()
+            self.out.write(visible[stream.printed:])
+            self.out.flush()
+            stream.printed = len(visible)
+
+    @contextmanager
+    def show(self, task_name: str, header: str, phase: str) -> Iterator[ShownStream]:
+        """Put a task's output on screen under a header
+
+        Tokens generated before this call (e.g. by prefetching) are printed
+        at once, later ones as they arrive. Call finish() on the yielded
+        handle with the complete text before leaving the block.
+        """
+        shown = ShownStream(task_name, header)
+        started = time.perf_counter()
+
+        if not self.enabled:
+            yield shown
+            elapsed = time.perf_counter() - started
+            self._record(phase, elapsed, elapsed)
+            self.out.write(f"{header}{shown.full_text}\n")
+            return
+
+        self.out.write(header)
+        self.out.flush()
+        with self._lock:
+            stream = self._streams.setdefault(task_name, _TaskStream())
+            stream.attached = True
+            self._print_new_text(stream)
+
+        try:
+            yield shown
+        finally:
+            with self._lock:
+                stream = self._streams.pop(task_name, None) or _TaskStream()
+            finished = time.perf_counter()
+            if stream.printed == 0 and shown.full_text is not None:
+                # Nothing streamed (e.g. the call failed or was not an LLM call)
+                self.out.write(shown.full_text)
+            self.out.write("\n")
+            self.out.flush()
+            first_token = max(stream.first_token_at or finished, started)
+            self._record(phase, first_token - started, finished - started)
+
+    def _record(self, phase: str, time_to_first_token: float, total_time: float):
+        """Store time-to-first-token and total time for one output"""
+        with self._lock:
+            self.time_to_first_token.setdefault(phase, []).append(time_to_first_token)
+            self.total_time.setdefault(phase, []).append(total_time)
+
+    def latency_stats(self) -> Dict[str, Dict[str, float]]:
+        """Summarize time-to-first-token and total time per phase"""
+        stats = {}
+        with self._lock:
+            for phase, samples in self.time_to_first_token.items():
+                totals = self.total_time.get(phase, [])
+                stats[phase] = {
+                    'count': len(samples),
+                    'avg_ttft': sum(samples) / len(samples),
+                    'max_ttft': max(samples),
+                    'avg_total': sum(totals) / len(totals) if totals else 0.0
+                }
+        return stats
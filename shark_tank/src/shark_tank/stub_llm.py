@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+"""
+Stub LLM for Shark Tank application
+A deterministic local stand-in for the agents' model, used by the benchmark
+suite to measure the simulation without network calls or API costs
+"""
+
+import hashlib
+import json
+import time
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from crewai.llms.base_llm import BaseLLM
+
+# Words the stub builds its answers from
+VOCABULARY = (
+    "market revenue customers margin growth equity valuation traction product "
+    "scale brand team royalty licensing retail channel profit deal risk"
+).split()
+
+
+class StubLLM(BaseLLM):
+    """Answers every prompt after a fixed delay with text derived from the prompt
+
+    The same prompt always gets the same answer, so runs are repeatable.
+    """
+
+    def __init__(self, latency: float = 0.0, output_chars: int = 400, model: str = "stub",
+                 signals: Optional[Dict[str, str]] = None,
+                 responders: Optional[Dict[str, Callable[[str], str]]] = None):
+        """Initialize with the seconds each call takes and the answer length in characters
+
+        signals maps prompt substrings to a sentence appended to the answer
+        whenever the prompt contains them, e.g. to make one shark say he is out.
+        responders maps prompt substrings to a function that builds the whole
+        answer from the prompt instead, e.g. a structured response.
+        """
+        super().__init__(model=model)
+        self.latency = latency
+        self.output_chars = output_chars
+        self.signals = signals or {}
+        self.responders = responders or {}
+        self.stream = False
+        self.calls = 0
+
+    def call(self, messages: Union[str, List[Dict[str, str]]], tools: Optional[List[dict]] = None,
+             callbacks: Optional[List[Any]] = None, available_functions: Optional[Dict[str, Any]] = None,
+             from_task: Optional[Any] = None, from_agent: Optional[Any] = None) -> str:
+        """Return a 'Final Answer:' built deterministically from the messages"""
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+        prompt = messages if isinstance(messages, str) else json.dumps(messages, sort_keys=True)
+        for marker, respond in self.responders.items():
+            if marker in prompt:
+                return f"Thought: I now know the final answer\nFinal Answer: {respond(prompt)}"
+        digest = hashlib.sha256(prompt.encode('utf-8')).digest()
+        words = []
+        length = 0
+        position = 0
+        while length < self.output_chars:
+            word = VOCABULARY[digest[position % len(digest)] % len(VOCABULARY)]
+            words.append(word)
+            length += len(word) + 1
+            position += 1
+        answer = " ".join(words)[:self.output_chars]
+        for marker, sentence in self.signals.items():
+            if marker in prompt:
+                answer += f". {sentence}"
+        return f"Thought: I now know the final answer\nFinal Answer: {answer}"
+
+    def supports_function_calling(self) -> bool:
+        return False
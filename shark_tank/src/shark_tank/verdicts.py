@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+"""
+Verdict executor for Shark Tank application
+Runs the sharks' verdict calls in parallel with a bounded number in flight
+"""
+
+import math
+import os
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+class VerdictExecutor:
+    """Runs verdict calls concurrently and collects them in shark order"""
+
+    def __init__(self, max_concurrency: Optional[int] = None, timeout: Optional[float] = None):
+        """Initialize verdict executor
+
+        max_concurrency limits how many verdict calls run at once and timeout
+        is the number of seconds each shark gets before its verdict is given up on.
+        """
+        if max_concurrency is None:
+            max_concurrency = int(os.getenv('SHARK_TANK_VERDICT_CONCURRENCY', '3'))
+        if timeout is None:
+            timeout = float(os.getenv('SHARK_TANK_VERDICT_TIMEOUT', '120'))
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+
+    def start(self, jobs: List[Tuple[str, Callable[[], str]]]) -> "VerdictBatch":
+        """Start (shark_name, verdict_fn) jobs and return a handle to their verdicts
+
+        A shark whose call fails or runs past its timeout gets a "No" verdict
+        with the reason attached, and never affects the verdicts of the other
+        sharks.
+        """
+        return VerdictBatch(jobs, self.max_concurrency, self.timeout)
+
+
+class VerdictBatch:
+    """Verdict calls in flight for one session"""
+
+    def __init__(self, jobs: List[Tuple[str, Callable[[], str]]], max_concurrency: int, timeout: float):
+        """Submit every job to a pool of at most max_concurrency workers"""
+        self.timeout = timeout
+        workers = max(1, min(max_concurrency, len(jobs)))
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='shark-verdict')
+        self._started: Dict[str, float] = {}
+        # Hung calls keep their worker busy, so queued sharks also need an upper bound
+        self._deadline = time.monotonic() + timeout * math.ceil(len(jobs) / workers)
+        self._futures: Dict[str, Future] = {
+            shark_name: self._executor.submit(self._timed(shark_name, verdict_fn))
+            for shark_name, verdict_fn in jobs
+        }
+
+    def _timed(self, shark_name: str, verdict_fn: Callable[[], str]) -> Callable[[], str]:
+        """Wrap a job so its timeout clock starts when it starts, not while it is queued"""
+        def call():
+            self._started[shark_name] = time.monotonic()
+            return verdict_fn()
+        return call
+
+    def result(self, shark_name: str) -> str:
+        """Wait for one shark's verdict; failures and timeouts become a "No" verdict"""
+        future = self._futures[shark_name]
+        while not future.done():
+            now = time.monotonic()
+            started = self._started.get(shark_name)
+            if now > self._deadline or (started is not None and now - started > self.timeout):
+                future.cancel()
+                return f"No (verdict timed out after {self.timeout:g}s)"
+            wait([future], timeout=0.1)
+
+        if future.cancelled():
+            return "No (verdict cancelled)"
+        if future.exception() is not None:
+            return f"No (verdict failed: {future.exception()})"
+        return future.result()
+
+    def close(self):
+        """Drop verdict calls that have not started yet"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,192 @@
+#!/usr/bin/env python
+"""
+Write-behind persistence for Shark Tank application
+Collects Q&A rows and writes them in batches on a background thread,
+so the interactive loop never waits on the database
+"""
+
+import os
+import queue
+import threading
+import time
+import weakref
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional
+
+from sqlalchemy import insert, update
+from sqlalchemy.engine import Engine
+
+from .database import PitchSession, QAEntry, qa_rollup
+from .profiling import get_tracer
+
+# Live queues, flushed and stopped on process exit
+_live_queues: "weakref.WeakSet[WriteBehindQueue]" = weakref.WeakSet()
+
+# Most recent errors a queue keeps until they are taken
+ERROR_LIMIT = 100
+
+
+class WriteBehindQueue:
+    """Batches database writes on a background thread"""
+
+    def __init__(self, engine: Engine, batch_size: Optional[int] = None,
+                 flush_interval: Optional[float] = None, max_retries: Optional[int] = None):
+        """Initialize queue
+
+        Pending writes are flushed once batch_size Q&A rows are queued, once
+        flush_interval seconds have passed since the last flush, or when
+        flush()/close() is called. A batch that fails max_retries more times
+        is written row by row, and the rows that still fail are set aside in
+        dead_letters so they do not hold up the rows queued after them.
+        """
+        self.engine = engine
+        self.batch_size = batch_size or int(os.getenv('DB_WRITE_BATCH_SIZE', '50'))
+        self.flush_interval = flush_interval or float(os.getenv('DB_WRITE_FLUSH_INTERVAL', '2.0'))
+        self.max_retries = (max_retries if max_retries is not None
+                            else int(os.getenv('DB_WRITE_MAX_RETRIES', '3')))
+        self.dead_letter_limit = int(os.getenv('DB_WRITE_DEAD_LETTER_LIMIT', '10000'))
+
+        self._queue: "queue.Queue" = queue.Queue()
+        self._closed = False
+        self._errors_lock = threading.Lock()
+        self.commits = 0
+        self.rows_written = 0
+        self.rows_dropped = 0
+        self.errors: Deque[str] = deque(maxlen=ERROR_LIMIT)
+        self.dead_letters: List[Dict[str, Any]] = []
+
+        self._thread = threading.Thread(target=self._run, name='shark-write-behind', daemon=True)
+        self._thread.start()
+        _live_queues.add(self)
+
+    def put_qa_entry(self, pitch_session_id: int, shark_name: str, question: str,
+                     answer: str, round_number: int = 1):
+        """Queue a Q&A row; its timestamp is taken now, not when it is written"""
+        self._put('qa', {
+            'pitch_session_id': pitch_session_id,
+            'shark_name': shark_name,
+            'question': question,
+            'answer': answer,
+            'round_number': round_number,
+            'created_at': datetime.utcnow()
+        })
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Write everything queued so far, returning False on timeout"""
+        if self._closed:
+            return True
+        done = threading.Event()
+        self._queue.put(('flush', done))
+        return done.wait(timeout)
+
+    def close(self, timeout: Optional[float] = None):
+        """Flush pending writes and stop the background thread"""
+        if self._closed:
+            return
+        done = threading.Event()
+        self._queue.put(('stop', done))
+        self._closed = True
+        done.wait(timeout)
+        _live_queues.discard(self)
+
+    def take_errors(self) -> List[str]:
+        """Errors since the last call, oldest first"""
+        with self._errors_lock:
+            errors = list(self.errors)
+            self.errors.clear()
+        return errors
+
+    def _error(self, message: str):
+        with self._errors_lock:
+            self.errors.append(message)
+
+    def _put(self, kind: str, payload: Any):
+        """Add an item for the background thread"""
+        if self._closed:
+            raise RuntimeError("Write-behind queue is closed")
+        self._queue.put((kind, payload))
+
+    def _run(self):
+        """Background loop: collect items and write them when a threshold is hit"""
+        qa_rows: List[Dict[str, Any]] = []
+        failures = 0
+        last_flush = time.monotonic()
+
+        while True:
+            wait_for = max(0.0, self.flush_interval - (time.monotonic() - last_flush))
+            try:
+                kind, payload = self._queue.get(timeout=wait_for)
+            except queue.Empty:
+                kind, payload = None, None
+
+            if kind == 'qa':
+                qa_rows.append(payload)
+
+            due = (
+                kind in ('flush', 'stop')
+                or len(qa_rows) >= self.batch_size
+                or time.monotonic() - last_flush >= self.flush_interval
+            )
+            if due:
+                if qa_rows:
+                    if self._write(qa_rows):
+                        qa_rows, failures = [], 0
+                    else:
+                        failures += 1
+                        if failures > self.max_retries or kind == 'stop':
+                            self._write_rows(qa_rows)
+                            qa_rows, failures = [], 0
+                last_flush = time.monotonic()
+
+            if kind in ('flush', 'stop'):
+                payload.set()
+            if kind == 'stop':
+                return
+
+    def _write(self, qa_rows: List[Dict[str, Any]]) -> bool:
+        """Write one batch, returning False if it failed and is kept for a retry"""
+        try:
+            self._write_batch(qa_rows)
+        except Exception as e:
+            self._error(f"Failed to write batch of {len(qa_rows)} Q&A rows: {e}")
+            return False
+        return True
+
+    def _write_rows(self, qa_rows: List[Dict[str, Any]]):
+        """Write a batch that keeps failing one row at a time, setting aside the rows that fail"""
+        failed = []
+        for row in qa_rows:
+            try:
+                self._write_batch([row])
+            except Exception:
+                failed.append(row)
+        if not failed:
+            return
+        kept = failed[:max(0, self.dead_letter_limit - len(self.dead_letters))]
+        self.dead_letters.extend(kept)
+        self.rows_dropped += len(failed) - len(kept)
+        self._error(f"Gave up on {len(failed)} Q&A rows after {self.max_retries} retries "
+                    f"({len(failed) - len(kept)} dropped, the rest kept in dead_letters)")
+
+    def _write_batch(self, qa_rows: List[Dict[str, Any]]):
+        """Write Q&A rows in a single transaction and mark their pitch sessions as updated"""
+        pitch_session_ids = {row['pitch_session_id'] for row in qa_rows}
+        with get_tracer().span('db_write', op='write_batch', rows=len(qa_rows),
+                               pitch_updates=len(pitch_session_ids)), self.engine.begin() as conn:
+            conn.execute(insert(QAEntry.__table__), qa_rows)
+            conn.execute(qa_rollup(conn.dialect.name, qa_rows))
+            conn.execute(
+                update(PitchSession.__table__)
+                .where(PitchSession.__table__.c.id.in_(pitch_session_ids))
+                .values(updated_at=datetime.utcnow())
+            )
+
+        self.commits += 1
+        self.rows_written += len(qa_rows)
+
+
+def close_all_queues():
+    """Flush and stop every live write-behind queue"""
+    for write_queue in list(_live_queues):
+        write_queue.close(timeout=10)